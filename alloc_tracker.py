@@ -0,0 +1,180 @@
+"""
+ALLOC TRACKER - Per-frame allocation and GC instrumentation
+Samples tracemalloc at every stage boundary of a frame (simulation,
+each compositor layer, output, flip) and hooks gc callbacks, so
+allocations and collector pauses can be attributed to a draw stage.
+
+Stages are marked at their end: everything allocated since the previous
+mark belongs to the stage being marked. Only memory from Python's
+allocator is traced; surface pixels allocated by SDL are not.
+"""
+
+import gc
+import time
+import tracemalloc
+
+
+class AllocationTracker:
+    def __init__(self, snapshot_every=120, top_sites=10):
+        self.snapshot_every = snapshot_every  # Frames between allocation-site snapshots (0 = off)
+        self.top_sites = top_sites
+
+        self.started_tracemalloc = not tracemalloc.is_tracing()
+        if self.started_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.last_current = tracemalloc.get_traced_memory()[0]
+
+        # Current frame: stage -> [net bytes, peak bytes above stage start, collections, GC ms]
+        # (entries are reused frame to frame so the tracker itself doesn't allocate)
+        self.frame = {}
+        self.frame_gc = []  # (generation, pause ms) collected since the last mark
+        self.gc_start = None
+
+        # Totals over all frames
+        self.frames = 0
+        self.stage_totals = {}  # stage -> {'net', 'peak', 'peak_max', 'frames', 'gc', 'gc_ms'}
+        self.net_total = 0
+        self.peak_total = 0
+        self.peak_max = 0
+        self.gc_collections = [0, 0, 0]
+        self.gc_pause_total = 0.0
+        self.gc_pause_max = 0.0
+
+        # Where memory grows between snapshots
+        self.snapshot = None
+        self.sites = {}  # 'file:line' -> [bytes, blocks]
+
+        self.last_net = 0
+        self.last_peak = 0
+
+        gc.callbacks.append(self.gc_callback)
+
+    def gc_callback(self, phase, info):
+        """gc hook: time each collection and charge it to the current stage"""
+        if phase == 'start':
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            pause = (time.perf_counter() - self.gc_start) * 1000
+            self.gc_start = None
+            self.frame_gc.append((info['generation'], pause))
+
+    def mark(self, stage):
+        """End a stage: attribute allocations since the previous mark to it"""
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        entry = self.frame.get(stage)
+        if entry is None:
+            entry = self.frame[stage] = [0, 0, 0, 0.0, False]
+        entry[0] += current - self.last_current
+        entry[1] = max(entry[1], peak - self.last_current)
+        entry[4] = True  # Seen this frame
+        if self.frame_gc:
+            for generation, pause in self.frame_gc:
+                entry[2] += 1
+                entry[3] += pause
+                self.gc_collections[generation] += 1
+                self.gc_pause_total += pause
+                self.gc_pause_max = max(self.gc_pause_max, pause)
+            self.frame_gc.clear()
+        self.last_current = current
+
+    def end_frame(self, stage='other'):
+        """Close the frame (anything since the last mark goes to stage)"""
+        self.mark(stage)
+        self.frames += 1
+
+        net = 0
+        peak = 0
+        for name, entry in self.frame.items():
+            if not entry[4]:
+                continue
+            totals = self.stage_totals.get(name)
+            if totals is None:
+                totals = self.stage_totals[name] = {
+                    'net': 0, 'peak': 0, 'peak_max': 0, 'frames': 0, 'gc': 0, 'gc_ms': 0.0}
+            totals['net'] += entry[0]
+            totals['peak'] += entry[1]
+            totals['peak_max'] = max(totals['peak_max'], entry[1])
+            totals['frames'] += 1
+            totals['gc'] += entry[2]
+            totals['gc_ms'] += entry[3]
+            net += entry[0]
+            peak = max(peak, entry[1])
+        self.net_total += net
+        self.peak_total += peak
+        self.peak_max = max(self.peak_max, peak)
+        self.last_net = net
+        self.last_peak = peak
+
+        if self.snapshot_every and self.frames % self.snapshot_every == 0:
+            self.sample_sites()
+
+        # Start the next frame
+        for entry in self.frame.values():
+            entry[0] = entry[1] = entry[2] = 0
+            entry[3] = 0.0
+            entry[4] = False
+
+    def last_frame(self):
+        """Net bytes and largest stage peak of the last finished frame (for live stats)"""
+        return {
+            'net_bytes': self.last_net,
+            'peak_bytes': self.last_peak
+        }
+
+    def sample_sites(self):
+        """Compare with the previous snapshot and accumulate the lines that grew"""
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        if self.snapshot is not None:
+            for stat in snapshot.compare_to(self.snapshot, 'lineno'):
+                if stat.size_diff <= 0:
+                    continue
+                frame = stat.traceback[0]
+                site = self.sites.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                site[0] += stat.size_diff
+                site[1] += stat.count_diff
+        self.snapshot = snapshot
+        # Don't charge the snapshot itself to the next frame
+        tracemalloc.reset_peak()
+        self.last_current = tracemalloc.get_traced_memory()[0]
+
+    def report(self):
+        """Allocation and GC summary, per frame and per stage"""
+        frames = max(1, self.frames)
+        sites = sorted(self.sites.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            'frames': self.frames,
+            'net_bytes_per_frame': round(self.net_total / frames, 1),
+            'peak_bytes_per_frame': round(self.peak_total / frames, 1),
+            'peak_bytes_max': self.peak_max,
+            'stages': {
+                name: {
+                    'net_bytes': round(totals['net'] / totals['frames'], 1),
+                    'peak_bytes': round(totals['peak'] / totals['frames'], 1),
+                    'peak_bytes_max': totals['peak_max'],
+                    'gc_collections': totals['gc'],
+                    'gc_ms': round(totals['gc_ms'], 3)
+                }
+                for name, totals in self.stage_totals.items()
+            },
+            'gc': {
+                'collections': {f"gen{generation}": count
+                                for generation, count in enumerate(self.gc_collections)},
+                'pause_total_ms': round(self.gc_pause_total, 3),
+                'pause_max_ms': round(self.gc_pause_max, 3),
+                'collections_per_frame': round(sum(self.gc_collections) / frames, 3)
+            },
+            'growth_sites': [{'site': name, 'bytes': size, 'blocks': count}
+                             for name, (size, count) in sites[:self.top_sites]]
+        }
+
+    def close(self):
+        """Remove the gc hook and stop tracing (if this tracker started it)"""
+        if self.gc_callback in gc.callbacks:
+            gc.callbacks.remove(self.gc_callback)
+        if self.started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
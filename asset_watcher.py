@@ -0,0 +1,112 @@
+"""
+ASSET WATCHER - Hot reload of artwork while the avatar is running
+A background thread polls the watched folders (a stat per file, every
+`interval` seconds). A file that is new or has changed is decoded on that
+thread once its size and modification time have held still for one more poll,
+so a half-written export is never read, and the decoded image is queued.
+The render thread drains the queue at a frame boundary and swaps the images
+in, so a frame never sees half an update.
+
+Files that disappear are ignored: the last loaded image stays until restart.
+"""
+
+import queue
+import threading
+import time
+from pathlib import Path
+
+
+class AssetChange:
+    __slots__ = ('kind', 'path', 'image', 'new')
+
+    def __init__(self, kind, path, image, new):
+        self.kind = kind  # Watch name ('avatar', 'background', 'emoji')
+        self.path = path
+        self.image = image  # Decoded, not yet converted to the display format
+        self.new = new  # True for a file that wasn't there when watching started
+
+
+class AssetWatcher:
+    def __init__(self, watches, decode, interval=1.0):
+        self.watches = watches  # [(kind, folder, glob pattern)]
+        self.decode = decode  # decode(kind, path) -> image, called on the watcher thread
+        self.interval = interval
+
+        self.known = {}  # path -> (mtime_ns, size) of the version last loaded
+        self.settling = {}  # path -> signature seen on the last poll, waiting to hold still
+        self.changes = queue.SimpleQueue()
+        self.stopping = threading.Event()
+        self.thread = None
+
+        # Stats
+        self.polls = 0
+        self.reloads = 0
+        self.failures = 0
+
+    def scan(self):
+        """(kind, path, signature) of every watched file"""
+        for kind, folder, pattern in self.watches:
+            for path in sorted(Path(folder).glob(pattern)):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue  # Removed while scanning
+                yield kind, path, (stat.st_mtime_ns, stat.st_size)
+
+    def start(self):
+        """Take the files on disk now as already loaded and start polling"""
+        for _, path, signature in self.scan():
+            self.known[path] = signature
+        self.thread = threading.Thread(target=self.watch_loop, name="asset-watcher", daemon=True)
+        self.thread.start()
+        print(f"👀 Watching {len(self.known)} asset files for changes")
+
+    def watch_loop(self):
+        while not self.stopping.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """One pass over the watched files: decode and queue those that changed and settled"""
+        self.polls += 1
+        for kind, path, signature in self.scan():
+            if self.known.get(path) == signature:
+                self.settling.pop(path, None)
+                continue
+            if self.settling.get(path) != signature:
+                self.settling[path] = signature  # Still being written? Check again next poll
+                continue
+            del self.settling[path]
+            new = path not in self.known
+            self.known[path] = signature
+            start = time.perf_counter()
+            try:
+                image = self.decode(kind, path)
+            except Exception as e:
+                self.failures += 1
+                print(f"Warning: Could not reload {path.name}: {e}")
+                continue
+            self.reloads += 1
+            self.changes.put(AssetChange(kind, path, image, new))
+            print(f"🔄 Decoded {path.name} in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def drain(self):
+        """Render thread: the changes decoded since the last call"""
+        changes = []
+        while True:
+            try:
+                changes.append(self.changes.get_nowait())
+            except queue.Empty:
+                return changes
+
+    def close(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+
+    def stats(self):
+        return {
+            'files': len(self.known),
+            'polls': self.polls,
+            'reloads': self.reloads,
+            'failures': self.failures
+        }
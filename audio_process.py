@@ -0,0 +1,232 @@
+"""
+AUDIO PROCESS - Audio capture and analysis outside the render process
+In heavy scenes the render thread holds the GIL for long stretches (chaos and
+psychedelic drawing loops), so an in-process audio callback runs late: the
+microphone overflows and the glow lags behind speech. With --audio-process
+the audio source runs in a child process with its own interpreter, which
+analyses every chunk and publishes the result to a small shared-memory block.
+
+Layout (little endian, 64-byte header then the state):
+    header: magic 'KSAU', version, status (0 starting, 1 running,
+            2 failed, 3 stopped), seq (odd while writing)
+    state:  chunks, overflows, publish time (ns), worst delivery delay (ms),
+            level, smoothed level, voice activity, BANDS spectrum bands (0-1), and a ring of the
+            last RING chunk levels (chunk n at n % RING)
+
+The child bumps seq to odd, writes the state, then bumps it back to even.
+The render loop reads it once per frame without locks, retrying if seq was
+odd or changed, and replays the ring entries it hasn't seen yet as levels.
+"""
+
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from audio_sources import AudioSource, chunk_volume, make_audio_source
+from frame_output import open_shared_memory
+
+MAGIC = b'KSAU'
+VERSION = 1
+BANDS = 8
+RING = 64
+HEADER = struct.Struct('<4sII')
+SEQ = struct.Struct('<Q')
+SEQ_OFFSET = 16
+STATE = struct.Struct(f'<QQqfffI{BANDS}f{RING}f')
+STATE_OFFSET = 64
+STARTING, RUNNING, FAILED, STOPPED = range(4)
+
+
+class AudioAnalyzer:
+    """Child process: per-chunk analysis written to the shared block"""
+
+    def __init__(self, buf, source, threshold, rate):
+        self.buf = buf
+        self.source = source  # For its overflow count
+        self.threshold = threshold  # Voice activity level
+        self.hangover = max(1, int(0.2 * rate / source.chunk))  # Chunks voice stays on after the level drops
+        self.quiet_chunks = self.hangover
+        self.smoothed = 0.0
+        self.levels = [0.0] * RING
+        self.seq = 0
+
+        # Log-spaced bands from 80 Hz to 8 kHz over the chunk's FFT bins
+        bins = np.fft.rfftfreq(source.chunk, 1.0 / rate)
+        edges = np.geomspace(80, min(8000, rate / 2), BANDS + 1)
+        self.band_bins = [np.flatnonzero((bins >= low) & (bins < high)) for low, high in zip(edges, edges[1:])]
+        self.window = np.hanning(source.chunk)
+        self.full_scale = source.chunk * 32768 / 4  # Windowed full-scale sine magnitude
+
+    def analyze(self, samples):
+        """Source thread in the child: analyse one chunk and publish it"""
+        level = chunk_volume(samples)
+        # Fast attack, slow release
+        self.smoothed += (level - self.smoothed) * (0.5 if level > self.smoothed else 0.1)
+        self.quiet_chunks = 0 if level > self.threshold else self.quiet_chunks + 1
+        voice = self.quiet_chunks < self.hangover
+
+        bands = [0.0] * BANDS
+        if len(samples) == len(self.window):
+            spectrum = np.abs(np.fft.rfft(samples * self.window))
+            for i, band in enumerate(self.band_bins):
+                if len(band):
+                    db = 20 * np.log10(spectrum[band].mean() / self.full_scale + 1e-9)
+                    bands[i] = float(min(1.0, max(0.0, (db + 80) / 80)))  # -80..0 dBFS -> 0..1
+
+        chunks = self.source.chunks
+        self.levels[(chunks - 1) % RING] = level
+        SEQ.pack_into(self.buf, SEQ_OFFSET, self.seq + 1)
+        STATE.pack_into(self.buf, STATE_OFFSET, chunks, self.source.overflows, time.perf_counter_ns(),
+                        self.source.max_late_ms, level, self.smoothed, voice, *bands, *self.levels)
+        self.seq += 2
+        SEQ.pack_into(self.buf, SEQ_OFFSET, self.seq)
+
+
+def set_status(buf, status):
+    HEADER.pack_into(buf, 0, MAGIC, VERSION, status)
+
+
+def audio_worker(name, spec, device_index, rate, chunk, threshold, stopping):
+    """Child process: run the audio source until told to stop"""
+    shm = open_shared_memory(name, untrack=False)  # Spawned children share the parent's resource tracker
+    try:
+        try:
+            source = make_audio_source(spec, device_index, rate=rate, chunk=chunk)
+        except Exception as e:
+            print(f"Warning: Audio process could not open '{spec}': {e}")
+            set_status(shm.buf, FAILED)
+            return
+        analyzer = AudioAnalyzer(shm.buf, source, threshold, source.rate)
+        source.samples_callback = analyzer.analyze
+        if not source.start(None):
+            set_status(shm.buf, FAILED)
+            return
+        set_status(shm.buf, RUNNING)
+        stopping.wait()
+        source.stop()
+        set_status(shm.buf, STOPPED)
+    finally:
+        shm.close()
+
+
+class ProcessAudioSource(AudioSource):
+    """Any audio source spec, run in a child process and read through shared memory"""
+    name = 'process'
+
+    def __init__(self, spec='mic', device_index=None, rate=44100, chunk=1024, threshold=300):
+        super().__init__(rate, chunk)
+        self.spec = spec
+        self.device_index = device_index
+        self.threshold = threshold
+        self.shm = None
+        self.process = None
+        self.stopping = None
+        self.status = STARTING
+        self.seen = 0  # Chunks already handed to the render loop
+
+        # Latest published analysis
+        self.level = 0.0
+        self.smoothed = 0.0
+        self.voice = False
+        self.bands = [0.0] * BANDS
+        self.publish_ns = 0
+
+        # Stats
+        self.missed = 0  # Levels overwritten in the ring before the render loop read them
+        self.retries = 0  # Reads that caught the child mid-write
+
+    def start(self, callback):
+        self.callback = callback
+        name = f"kentroid_samurai_audio_{os.getpid()}"
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=STATE_OFFSET + STATE.size)
+        except FileExistsError:
+            stale = open_shared_memory(name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=STATE_OFFSET + STATE.size)
+        set_status(self.shm.buf, STARTING)
+        SEQ.pack_into(self.shm.buf, SEQ_OFFSET, 0)
+
+        # Spawn, not fork: the child must not inherit SDL or the render process's threads
+        context = multiprocessing.get_context('spawn')
+        self.stopping = context.Event()
+        self.process = context.Process(target=audio_worker, name="audio-process", daemon=True,
+                                       args=(name, self.spec, self.device_index, self.rate, self.chunk,
+                                             self.threshold, self.stopping))
+        self.process.start()
+        print(f"🎤 Audio source: {self.spec} in a separate process (pid {self.process.pid})")
+        return True
+
+    def read(self):
+        """Consistent copy of the shared state, or None if the child kept writing over it"""
+        buf = self.shm.buf
+        for _ in range(4):
+            seq = SEQ.unpack_from(buf, SEQ_OFFSET)[0]
+            if seq & 1:
+                self.retries += 1
+                continue
+            state = STATE.unpack_from(buf, STATE_OFFSET)
+            if SEQ.unpack_from(buf, SEQ_OFFSET)[0] == seq:
+                return state
+            self.retries += 1
+        return None
+
+    def poll(self):
+        """Render thread: levels of the chunks published since the last poll, oldest first"""
+        if self.shm is None:
+            return []
+        status = HEADER.unpack_from(self.shm.buf, 0)[2]
+        if status in (STARTING, RUNNING) and not self.process.is_alive():
+            status = FAILED  # Died without saying so
+        if status != self.status:
+            self.status = status
+            if status == FAILED:
+                print("Warning: Audio process failed - continuing without audio")
+        state = self.read()
+        if state is None:
+            return []
+        chunks, self.overflows, self.publish_ns, self.max_late_ms, self.level, self.smoothed, voice = state[:7]
+        self.voice = bool(voice)
+        self.bands = state[7:7 + BANDS]
+        ring = state[7 + BANDS:]
+
+        new = chunks - self.seen
+        if new > RING:
+            self.missed += new - RING
+            new = RING
+        levels = [ring[n % RING] for n in range(chunks - new, chunks)]
+        self.seen = self.chunks = chunks
+        return levels
+
+    def stop(self):
+        if self.process:
+            self.stopping.set()
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.shm:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def stats(self):
+        return {
+            'source': f"process:{self.spec}",
+            'running': self.status == RUNNING,
+            'chunks': self.chunks,
+            'overflows': self.overflows,
+            'max_late_ms': round(self.max_late_ms, 2),
+            'missed': self.missed,
+            'read_retries': self.retries,
+            'smoothed_level': round(self.smoothed, 1),
+            'voice': self.voice,
+            'bands': [round(band, 3) for band in self.bands]
+        }
@@ -0,0 +1,335 @@
+"""
+AUDIO SOURCES - Pluggable inputs for the voice-activity level
+Every source turns 16-bit audio chunks into a volume level (mean absolute
+sample value) and delivers it to a callback from its own thread.
+
+    mic         PyAudio input device (the default)
+    wav:FILE    16-bit WAV file, looped, played in real time
+    speech      Synthetic speech envelope (syllables, words, pauses)
+    tone        Synthetic sine tone
+    noise       Synthetic white noise
+    silence     No audio at all
+
+Generated sources (everything but mic) can also be pulled offline with
+levels_for(seconds), so headless runs get the same levels every time.
+
+Every source counts overflows: chunks the microphone dropped because its
+callback didn't run in time (PyAudio's input overflow flag), or for the
+generated sources, chunks delivered more than a whole chunk late.
+"""
+
+import threading
+import time
+import wave
+
+import numpy as np
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+
+def chunk_volume(samples):
+    """Volume level of a chunk of int16 samples"""
+    return float(np.abs(samples).mean()) if len(samples) else 0.0
+
+
+class AudioSource:
+    name = 'audio'
+
+    def __init__(self, rate=44100, chunk=1024):
+        self.rate = rate
+        self.chunk = chunk  # Samples per level
+        self.callback = None
+        self.samples_callback = None  # Optional: also gets every chunk's raw samples (audio process analysis)
+
+        # Stats
+        self.chunks = 0
+        self.overflows = 0
+        self.max_late_ms = 0.0  # Worst delivery delay behind real time (generated sources)
+
+    def start(self, callback):
+        """Start delivering levels to callback(volume); returns False if the source is unavailable"""
+        self.callback = callback
+        return True
+
+    def deliver(self, samples):
+        """Source thread: hand one chunk on as a level"""
+        self.chunks += 1
+        if self.samples_callback:
+            self.samples_callback(samples)
+        if self.callback:
+            self.callback(chunk_volume(samples))
+
+    def poll(self):
+        """Levels that arrived since the last poll without going through the callback (render thread)"""
+        return []
+
+    def stop(self):
+        """Stop delivering levels"""
+
+    def levels_for(self, seconds):
+        """Levels for the next seconds of audio, generated immediately (offline use)"""
+        return []
+
+    def stats(self):
+        return {'source': self.name, 'chunks': self.chunks, 'overflows': self.overflows,
+                'max_late_ms': round(self.max_late_ms, 2)}
+
+
+class SilenceSource(AudioSource):
+    name = 'silence'
+
+
+class GeneratedSource(AudioSource):
+    """Base for sources that produce their own samples: paced in real time on a thread,
+    or pulled offline with levels_for()"""
+
+    def __init__(self, rate=44100, chunk=1024):
+        super().__init__(rate, chunk)
+        self.thread = None
+        self.stopping = threading.Event()
+        self.pending = 0.0  # Seconds requested by levels_for() but not yet generated
+
+    def next_chunk(self):
+        """Next chunk of int16 samples (None when the source has ended)"""
+        raise NotImplementedError
+
+    def start(self, callback):
+        self.callback = callback
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, name=f"audio-{self.name}", daemon=True)
+        self.thread.start()
+        print(f"🎤 Audio source: {self.describe()}")
+        return True
+
+    def run(self):
+        """Audio thread: deliver one level per chunk at the real-time rate"""
+        chunk_time = self.chunk / self.rate
+        next_time = time.perf_counter()
+        while not self.stopping.is_set():
+            samples = self.next_chunk()
+            if samples is None:
+                return
+            next_time += chunk_time
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                self.stopping.wait(delay)
+            late = time.perf_counter() - next_time  # Includes waiting for the GIL after the wait
+            self.max_late_ms = max(self.max_late_ms, late * 1000)
+            if late > chunk_time:
+                self.overflows += 1  # A one-chunk capture buffer would have been overwritten
+            self.deliver(samples)
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def levels_for(self, seconds):
+        self.pending += seconds
+        chunk_time = self.chunk / self.rate
+        levels = []
+        while self.pending >= chunk_time:
+            self.pending -= chunk_time
+            samples = self.next_chunk()
+            if samples is None:
+                break
+            levels.append(chunk_volume(samples))
+        return levels
+
+    def describe(self):
+        return self.name
+
+
+class SyntheticSource(GeneratedSource):
+    """Deterministic test signal: 'tone', 'noise' or 'speech' (noise shaped like talking)"""
+
+    def __init__(self, kind='speech', amplitude=4000, frequency=220.0, seed=0, rate=44100, chunk=1024):
+        super().__init__(rate, chunk)
+        if kind not in ('tone', 'noise', 'speech'):
+            raise ValueError(f"Unknown synthetic audio kind: {kind}")
+        self.name = kind
+        self.kind = kind
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.rng = np.random.default_rng(seed)
+        self.position = 0  # Samples generated so far
+
+        # Speech envelope: ~4 syllables/sec grouped into words, with pauses between phrases
+        self.syllable_rate = 4.0
+        self.phrase_length = 3.0  # Seconds of talking
+        self.pause_length = 1.5  # Seconds of silence between phrases
+
+    def envelope(self, t):
+        """Speech-like loudness (0-1) at times t (seconds)"""
+        cycle = self.phrase_length + self.pause_length
+        talking = (t % cycle) < self.phrase_length
+        syllables = np.abs(np.sin(np.pi * self.syllable_rate * t)) ** 2
+        words = 0.6 + 0.4 * np.sin(2 * np.pi * 0.7 * t)
+        return np.where(talking, syllables * words, 0.0)
+
+    def next_chunk(self):
+        t = (self.position + np.arange(self.chunk)) / self.rate
+        self.position += self.chunk
+        if self.kind == 'tone':
+            signal = np.sin(2 * np.pi * self.frequency * t)
+        elif self.kind == 'noise':
+            signal = self.rng.uniform(-1.0, 1.0, self.chunk)
+        else:
+            signal = self.rng.uniform(-1.0, 1.0, self.chunk) * self.envelope(t)
+        return (signal * self.amplitude).astype(np.int16)
+
+    def describe(self):
+        return f"synthetic {self.kind} (amplitude {self.amplitude})"
+
+
+class WavFileSource(GeneratedSource):
+    """16-bit PCM WAV file (mixed to mono), looped by default"""
+    name = 'wav'
+
+    def __init__(self, path, loop=True, chunk=1024):
+        with wave.open(str(path), 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+        super().__init__(rate, chunk)
+        samples = np.frombuffer(frames, dtype=np.int16)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        self.path = path
+        self.samples = samples
+        self.loop = loop
+        self.position = 0
+
+    def next_chunk(self):
+        if self.position >= len(self.samples):
+            if not self.loop or not len(self.samples):
+                return None
+            self.position = 0
+        samples = self.samples[self.position:self.position + self.chunk]
+        self.position += self.chunk
+        return samples
+
+    def describe(self):
+        return f"{self.path} ({len(self.samples) / self.rate:.1f}s{', looped' if self.loop else ''})"
+
+
+class PyAudioSource(AudioSource):
+    """Microphone input through PyAudio"""
+    name = 'mic'
+
+    def __init__(self, device_index=None, rate=44100, chunk=1024, channels=1):
+        super().__init__(rate, chunk)
+        self.device_index = device_index
+        self.channels = channels
+        self.audio = None
+        self.stream = None
+
+    def start(self, callback):
+        self.callback = callback
+        if pyaudio is None:
+            print("Warning: Could not initialize audio: PyAudio is not installed")
+            return False
+        try:
+            self.audio = pyaudio.PyAudio()
+
+            # If device index specified, get device info
+            if self.device_index is not None:
+                device_info = self.audio.get_device_info_by_index(self.device_index)
+                print(f"Using audio device: {device_info['name']} (index {self.device_index})")
+            else:
+                print("Using default audio input device")
+
+            self.stream = self.audio.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=self.chunk,
+                stream_callback=self.stream_callback
+            )
+            self.stream.start_stream()
+            print("Audio initialized successfully")
+            return True
+        except Exception as e:
+            print(f"Warning: Could not initialize audio: {e}")
+            self.stop()
+            return False
+
+    def stream_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio thread: turn the chunk into a level"""
+        if status & getattr(pyaudio, 'paInputOverflow', 2):
+            self.overflows += 1  # PortAudio dropped input because this callback ran late
+        try:
+            self.deliver(np.frombuffer(in_data, dtype=np.int16))
+        except Exception as e:
+            print(f"Audio callback error: {e}")
+        return (in_data, pyaudio.paContinue)
+
+    def stop(self):
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.audio:
+            self.audio.terminate()
+            self.audio = None
+
+
+def make_audio_source(spec, device_index=None, rate=44100, chunk=1024):
+    """Build a source from a --audio-source spec: mic, silence, speech, tone, noise or wav:FILE"""
+    spec = spec or 'mic'
+    if spec == 'mic':
+        return PyAudioSource(device_index, rate=rate, chunk=chunk)
+    if spec == 'silence':
+        return SilenceSource(rate, chunk)
+    if spec in ('speech', 'tone', 'noise'):
+        return SyntheticSource(spec, rate=rate, chunk=chunk)
+    if spec.startswith('wav:'):
+        return WavFileSource(spec[4:], chunk=chunk)
+    raise ValueError(f"Unknown audio source '{spec}' (use mic, silence, speech, tone, noise or wav:FILE)")
+
+
+def list_audio_devices():
+    """List all available audio input devices"""
+    if pyaudio is None:
+        print("PyAudio is not installed - no input devices available")
+        return
+    audio = pyaudio.PyAudio()
+    print("\n" + "=" * 60)
+    print("AVAILABLE AUDIO INPUT DEVICES:")
+    print("=" * 60)
+
+    device_count = audio.get_device_count()
+    input_devices = []
+
+    for i in range(device_count):
+        try:
+            device_info = audio.get_device_info_by_index(i)
+            # Only show input devices
+            if device_info['maxInputChannels'] > 0:
+                input_devices.append((i, device_info))
+                print(f"\nDevice Index: {i}")
+                print(f"  Name: {device_info['name']}")
+                print(f"  Channels: {device_info['maxInputChannels']}")
+                print(f"  Sample Rate: {int(device_info['defaultSampleRate'])} Hz")
+                print(f"  Host API: {audio.get_host_api_info_by_index(device_info['hostApi'])['name']}")
+        except Exception as e:
+            print(f"Error reading device {i}: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Total input devices found: {len(input_devices)}")
+    print("=" * 60)
+    print("\nTo use a specific device, run:")
+    print("  python pngtuber.py --device <index>")
+    print("\nExample:")
+    print("  python pngtuber.py --device 3")
+    print()
+
+    audio.terminate()
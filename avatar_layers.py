@@ -0,0 +1,126 @@
+"""
+AVATAR LAYERS - The avatar scene as compositor layers
+Bottom to top: background (B+0-9), visor glow, character (through any
+character effect plugins, like the E+3 psychedelic filter), one layer per
+overlay effect plugin in slot order (E+1 rage, E+2 emoji party, ...), UI
+"""
+
+from compositor import Layer
+
+
+class BackgroundLayer(Layer):
+    name = 'background'
+    opaque = True
+
+    def scale_for(self, host):
+        # Only the procedural backgrounds (rainbow, chaos) are cheaper at low resolution
+        if host.transparent or host.current_background not in (2, 9):
+            return 1.0
+        return self.render_scale
+
+    def cache_key(self, host):
+        size = (host.width, host.height)
+        if host.transparent:
+            return ('transparent', size)
+        if host.current_background == 2:
+            return ('rainbow', host.rainbow_hue, size, self.render_scale)
+        if host.current_background == 9 and host.chaos_effect:
+            return None  # Chaos moves every step
+        return (host.current_background, size, host.background_version)
+
+    def render(self, host, target):
+        if host.transparent:
+            target.fill((0, 0, 0, 0))  # Background layer omitted in transparent mode
+        else:
+            host.draw_background(target)
+
+    def render_textures(self, host, textures):
+        # Black and image backgrounds; rainbow and chaos are drawn by pygame and uploaded
+        return host.draw_background_textures(textures)
+
+
+class GlowLayer(Layer):
+    name = 'glow'
+    cache_standalone = False
+
+    def cache_key(self, host):
+        pose = host.pose
+        return (pose['visor_pos'], pose['scale'], host.glow_intensity, host.glow_base_intensity)
+
+    def render(self, host, target):
+        host.draw_visor_glow(target, host.pose['visor_pos'], host.pose['scale'])
+
+    def render_textures(self, host, textures):
+        host.draw_visor_glow_textures(textures, host.pose['visor_pos'], host.pose['scale'])
+        return True
+
+
+class CharacterLayer(Layer):
+    name = 'character'
+    cache_standalone = False
+
+    def cache_key(self, host):
+        if host.effects.of_kind('character'):
+            return None  # Character effects (psychedelic filter) animate every step
+        pose = host.pose
+        return (pose['scale'], pose['center'], pose['angle'], host.avatar_version)
+
+    def render(self, host, target):
+        host.draw_character(target)
+
+    def render_textures(self, host, textures):
+        host.draw_character_textures(textures)
+        return True
+
+
+class EffectLayer(Layer):
+    """An overlay effect plugin, drawn while it is switched on"""
+
+    def __init__(self, plugin):
+        super().__init__()
+        self.plugin = plugin
+        self.name = plugin.name
+
+    def visible(self, host):
+        return host.effects.is_active(self.plugin)
+
+    def render(self, host, target):
+        host.effects.draw(self.plugin, target)
+
+    def render_textures(self, host, textures):
+        return host.effects.draw_textures(self.plugin, textures)
+
+
+class UILayer(Layer):
+    name = 'ui'
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def visible(self, host):
+        return host.show_ui
+
+    def cache_key(self, host):
+        # Only re-render the overlay when its text changes
+        self.lines = host.ui_lines()
+        return tuple(self.lines)
+
+    def render_size(self, host):
+        return (host.width, min(host.height, 20 + 30 * len(self.lines)))
+
+    def render(self, host, target):
+        host.draw_ui(target, self.lines)
+
+
+def build_avatar_layers(render_scales=None, effect_plugins=()):
+    """Layer stack for SamuraiPNGTuber, bottom to top"""
+    render_scales = render_scales or {}
+    overlays = sorted((plugin for plugin in effect_plugins if plugin.kind == 'overlay'), key=lambda p: p.slot)
+    return [
+        BackgroundLayer(render_scales.get('background', 1.0)),
+        GlowLayer(),
+        CharacterLayer(),
+        *[EffectLayer(plugin) for plugin in overlays],
+        UILayer()
+    ]
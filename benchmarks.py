@@ -0,0 +1,747 @@
+"""
+BENCHMARKS - Headless rendering benchmarks for the avatar
+Renders each scene offline (no window, no audio, config left untouched)
+and reports milliseconds per frame.
+
+    python benchmarks.py render-scale [--frames 120] [--viewport 2]
+    python benchmarks.py alloc [--frames 120] [--viewport 2]
+    python benchmarks.py modes [--frames 120] [--viewport 2]
+    python benchmarks.py sprites [--frames 120] [--viewport 2]
+    python benchmarks.py boids [--frames 120] [--viewport 2]
+    python benchmarks.py voronoi [--frames 120] [--viewport 2]
+    python benchmarks.py loops [--frames 120] [--viewport 2]
+    python benchmarks.py recording [--frames 120] [--viewport 2] [--ffmpeg ffmpeg]
+    python benchmarks.py caches [--frames 120] [--viewport 2] [--budget-mb 24]
+    python benchmarks.py switches [--frames 120] [--viewport 2]
+    python benchmarks.py effects [--frames 120] [--viewport 2]
+    python benchmarks.py audio [--viewport 2] [--seconds 10]
+    python benchmarks.py renderers [--frames 120] [--viewport 2]
+    python benchmarks.py zoom [--viewport 2]
+    python benchmarks.py resize [--frames 120]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+import pygame
+
+from alloc_tracker import AllocationTracker
+from audio_sources import SyntheticSource
+from chaos_effect import ChaosEffect
+from video_recorder import ffmpeg_available
+from voronoi_field import VoronoiField
+from pngtuber import SamuraiPNGTuber
+
+
+VIEWPORT_SIZES = [(800, 800), (1200, 800), (1920, 1080)]  # --viewport presets
+
+# Scenes whose cost is dominated by low-frequency effect layers
+RENDER_SCALE_SCENES = [
+    ('chaos', {'background': 9}, None, 'background'),
+    ('rainbow', {'background': 2}, None, 'background'),
+    ('psychedelic', {'background': 1}, 3, 'psychedelic'),
+]
+
+
+def make_app(viewport, config, bake_patterns=False, audio_source='silence', audio_process=False,
+             renderer='surface'):
+    """Headless avatar with a fixed seed, no audio and no config writes (no pattern baking or asset watching)"""
+    overrides = {'viewport': viewport, 'zoom': 0, 'viewport_x_offset': 0, 'viewport_y_offset': 0}
+    overrides.update(config)
+    return SamuraiPNGTuber(seed=1, chaos_seed=1, headless=True, config_overrides=overrides,
+                           persist_config=False, audio_source=audio_source, bake_patterns=bake_patterns,
+                           watch_assets=False, audio_process=audio_process, renderer=renderer)
+
+
+def run_frames(app, frames, source=None, fps=60):
+    """Render frames offline, feeding levels pulled from an audio source; returns ms per frame"""
+    frame_time = 1.0 / fps
+    frame_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        if source:
+            for volume in source.levels_for(frame_time):
+                app.apply_audio_level(volume)
+        app.advance(frame_time, realtime=False)
+        app.draw()
+        frame_times.append((time.perf_counter() - start) * 1000)
+    return frame_times
+
+
+def time_frames(app, frames):
+    """Render frames offline and return the mean ms per frame"""
+    app.render_offline(5)  # Warm up caches
+    start = time.perf_counter()
+    app.render_offline(frames)
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def bench_render_scale(frames=120, viewport=2):
+    """Frame time and pixels filled for each effect layer at render scale 1.0 / 0.5 / 0.25"""
+    results = {}
+    for scene, config, effect, layer_name in RENDER_SCALE_SCENES:
+        app = make_app(viewport, config)
+        if effect:
+            app.activate_effect(effect)
+        width, height = app.width, app.height
+
+        results[scene] = {}
+        for scale in SamuraiPNGTuber.render_scale_choices:
+            app.set_render_scale(layer_name, scale)
+            ms = time_frames(app, frames)
+            if layer_name == 'psychedelic':
+                sprite = app.get_scaled_image()
+                pixels = int(sprite.get_width() * scale) * int(sprite.get_height() * scale)
+            else:
+                pixels = int(width * scale) * int(height * scale)
+            results[scene][scale] = (ms, pixels)
+        app.cleanup()
+
+    print(f"\nRender scale benchmark ({frames} frames, viewport {width}x{height})")
+    print(f"{'scene':<12} {'scale':>6} {'ms/frame':>10} {'pixels filled':>14} {'saved':>8}")
+    for scene, rows in results.items():
+        full_ms, full_pixels = rows[1.0]
+        for scale, (ms, pixels) in rows.items():
+            saved = (1 - ms / full_ms) * 100 if full_ms else 0.0
+            print(f"{scene:<12} {scale:>6g} {ms:>10.2f} {pixels:>14,} {saved:>7.1f}%")
+    return results
+
+
+# Steady-state scenes and their allocation budgets: transient Python bytes per frame
+# (largest stage high-water mark), net growth per frame (over a second traced window, so
+# one-off growth doesn't depend on --frames), GC collections per frame
+ALLOC_SCENES = [
+    # name, config, effect, audio level, show UI, budget
+    ('idle', {'background': 1}, None, 0, False,
+     {'peak_bytes': 4096, 'net_bytes': 64, 'gc_per_frame': 0.05}),
+    ('talking', {'background': 3}, None, 2000, False,
+     {'peak_bytes': 8192, 'net_bytes': 64, 'gc_per_frame': 0.05}),
+    ('rainbow', {'background': 2}, None, 0, False,
+     {'peak_bytes': 8192, 'net_bytes': 64, 'gc_per_frame': 0.05}),
+    ('chaos', {'background': 9}, None, 0, False,
+     {'peak_bytes': 65536, 'net_bytes': 1024, 'gc_per_frame': 0.5}),  # Particle count fluctuates
+    ('rage', {'background': 1}, 1, 2000, False,
+     {'peak_bytes': 16384, 'net_bytes': 64, 'gc_per_frame': 0.2}),  # Explosions are pooled (sprite_pools)
+    ('emoji', {'background': 1}, 2, 0, False,
+     {'peak_bytes': 16384, 'net_bytes': 256, 'gc_per_frame': 0.2}),
+    ('psychedelic', {'background': 1}, 3, 0, False,
+     {'peak_bytes': 16384, 'net_bytes': 64, 'gc_per_frame': 0.05}),
+    ('ui', {'background': 1}, None, 0, True,
+     {'peak_bytes': 8192, 'net_bytes': 64, 'gc_per_frame': 0.05}),
+]
+
+
+def bench_allocations(frames=120, viewport=2):
+    """Allocations per frame for each steady-state scene, checked against its budget; net growth is
+    measured over a second window of frames after a first traced one, so it is a steady-state rate"""
+    failures = []
+    rows = []
+    for scene, config, effect, level, show_ui, budget in ALLOC_SCENES:
+        app = make_app(viewport, config)
+        if effect:
+            app.activate_effect(effect)
+        app.show_ui = show_ui
+
+        # Warm up caches (including the warming jobs the app runs in idle frame time, which
+        # render_offline never gets to), then trace the steady state only
+        for key in list(app.jobs.jobs):
+            app.jobs.finish(key)
+        for _ in range(60):
+            app.apply_audio_level(level)
+            app.render_offline(1)
+        app.alloc_tracker = AllocationTracker(snapshot_every=0)
+        app.compositor.alloc_tracker = app.alloc_tracker
+        for window in range(2):
+            # The first window takes one-off growth: objects first allocated under tracing
+            # (replacing untraced ones) and caches still filling
+            settled = app.alloc_tracker.net_total
+            for _ in range(frames):
+                app.apply_audio_level(level)
+                app.render_offline(1)
+        net_bytes = (app.alloc_tracker.net_total - settled) / frames
+        report = app.alloc_tracker.report()
+        app.alloc_tracker.close()
+        app.alloc_tracker = app.compositor.alloc_tracker = None
+        app.cleanup()
+
+        measured = {
+            'peak_bytes': report['peak_bytes_per_frame'],
+            'net_bytes': net_bytes,
+            'gc_per_frame': report['gc']['collections_per_frame']
+        }
+        over = [name for name, limit in budget.items() if measured[name] > limit]
+        if over:
+            worst = max(report['stages'].items(), key=lambda item: item[1]['peak_bytes'])[0]
+            failures.append((scene, over))
+            result = f"OVER BUDGET ({', '.join(over)}; worst stage: {worst})"
+        else:
+            result = "ok"
+        rows.append((scene, measured, result))
+
+    print(f"\nAllocation budget check ({frames} frames per scene)")
+    print(f"{'scene':<12} {'peak B/frame':>13} {'net B/frame':>12} {'GC/frame':>9}  result")
+    for scene, measured, result in rows:
+        print(f"{scene:<12} {measured['peak_bytes']:>13.0f} {measured['net_bytes']:>12.0f} "
+              f"{measured['gc_per_frame']:>9.3f}  {result}")
+    if failures:
+        print(f"\n❌ {len(failures)} scene(s) over their allocation budget")
+    else:
+        print("\n✅ All scenes within their allocation budgets")
+    return failures
+
+
+# p95 frame-time budget (ms) per background for the modes check; generous enough
+# for a CI runner with no GPU or sound card, tight enough to catch big regressions
+MODE_BUDGETS_MS = {1: 50, 2: 60, 3: 50, 4: 50, 5: 50, 6: 50, 7: 50, 8: 50, 9: 200}
+MODE_EFFECT_BUDGET_MS = {None: 0, 1: 20, 2: 30, 3: 150}  # Added on top for each effect
+
+
+def bench_modes(frames=120, viewport=2):
+    """Run every background x effect with synthetic speech and check frame-time budgets"""
+    failures = []
+    rows = []
+    for background in range(1, 10):
+        app = make_app(viewport, {'background': background})
+        for effect in (None, 1, 2, 3):
+            if effect:
+                app.activate_effect(effect)
+            source = SyntheticSource('speech', seed=background)
+            run_frames(app, 10, source)  # Warm up caches
+            ordered = sorted(run_frames(app, frames, source))
+            p95 = ordered[int(len(ordered) * 0.95)]
+            mean = sum(ordered) / len(ordered)
+            budget = MODE_BUDGETS_MS[background] + MODE_EFFECT_BUDGET_MS[effect]
+            if p95 > budget:
+                failures.append((background, effect))
+            rows.append((background, effect, mean, p95, budget))
+            if effect:
+                app.activate_effect(effect)  # Toggle it back off
+        app.cleanup()
+
+    print(f"\nModes check ({frames} frames each, synthetic speech)")
+    print(f"{'background':>10} {'effect':>7} {'mean ms':>8} {'p95 ms':>8} {'budget':>7}  result")
+    for background, effect, mean, p95, budget in rows:
+        result = "ok" if p95 <= budget else "OVER BUDGET"
+        print(f"{background:>10} {str(effect or '-'):>7} {mean:>8.2f} {p95:>8.2f} {budget:>7}  {result}")
+    if failures:
+        print(f"\n❌ {len(failures)} mode(s) over their frame-time budget")
+    else:
+        print("\n✅ All modes within their frame-time budgets")
+    return failures
+
+
+def bench_sprites(frames=120, viewport=2):
+    """Frame time with tens to thousands of live explosions (E+1) and emojis (E+2)"""
+    rows = []
+    for count in (20, 200, 2000):
+        # Emoji party with count emojis
+        app = make_app(viewport, {'background': 1})
+        party = app.effects.plugins[2]
+        party.max_emojis = count
+        app.activate_effect(2)
+        while len(party.emojis) < count:
+            party.spawn_emoji()
+        emoji_ms = time_frames(app, frames)
+        app.cleanup()
+
+        # Rage with ~count live explosions (each lives 20 steps, spawned every 4 steps)
+        app = make_app(viewport, {'background': 1})
+        per_spawn = max(1, count // 5)
+        rage = app.effects.plugins[1]
+        rage.explosions_per_spawn = (per_spawn, per_spawn)
+        app.activate_effect(1)
+        app.render_offline(30)
+        live = len(rage.explosions)
+        explosion_ms = time_frames(app, frames)
+        app.cleanup()
+        rows.append((count, emoji_ms, live, explosion_ms))
+
+    print(f"\nSprite scaling ({frames} frames)")
+    print(f"{'emojis':>8} {'ms/frame':>9}   {'explosions':>10} {'ms/frame':>9}")
+    for count, emoji_ms, live, explosion_ms in rows:
+        print(f"{count:>8} {emoji_ms:>9.2f}   {live:>10} {explosion_ms:>9.2f}")
+    return rows
+
+
+def bench_boids(frames=120, viewport=2):
+    """Chaos boids swarm: update (spatial hash + flocking) and draw time vs swarm size"""
+    width, height = VIEWPORT_SIZES[viewport]
+    surface = pygame.Surface((width, height))
+    rows = []
+    for count in (500, 1000, 2000, 4000, 8000):
+        chaos = ChaosEffect(width, height, seed=1, particle_mode='boids', swarm_size=count)
+        for _ in range(10):  # Let the flocks form
+            chaos.update()
+        update_ms = draw_ms = 0.0
+        candidates = neighbors = 0
+        for _ in range(frames):
+            start = time.perf_counter()
+            chaos.update()
+            update_ms += (time.perf_counter() - start) * 1000
+            candidates += chaos.swarm.candidates_tested
+            neighbors += chaos.swarm.neighbor_pairs
+            start = time.perf_counter()
+            chaos.draw_particles(surface)
+            draw_ms += (time.perf_counter() - start) * 1000
+        rows.append((count, update_ms / frames, draw_ms / frames,
+                     candidates / frames / count, neighbors / frames / count))
+    
+    print(f"\nBoids swarm ({frames} frames, {width}x{height}, neighbor radius {chaos.neighbor_radius})")
+    print(f"{'boids':>6} {'update ms':>10} {'draw ms':>8} {'tested/boid':>12} {'neighbors/boid':>15}")
+    for count, update_ms, draw_ms, tested, found in rows:
+        print(f"{count:>6} {update_ms:>10.2f} {draw_ms:>8.2f} {tested:>12.1f} {found:>15.1f}")
+    return rows
+
+
+def bench_voronoi(frames=120, viewport=2):
+    """Jump-flooding Voronoi: full flood and per-frame (refine + render) time vs seeds and grid resolution"""
+    width, height = VIEWPORT_SIZES[viewport]
+    surface = pygame.Surface((width, height))
+    rows = []
+    for resolution in (8, 4, 2):
+        for seeds in (64, 256, 1024, 4096):
+            field = VoronoiField(width, height, seed_count=seeds, resolution=resolution, seed=1)
+            start = time.perf_counter()
+            field.update()
+            flood_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            for _ in range(frames):
+                field.step()
+                field.draw(surface)
+            frame_ms = (time.perf_counter() - start) * 1000 / frames
+            rows.append((resolution, seeds, field.columns * field.rows, flood_ms, frame_ms, field.full_floods - 1))
+    
+    # Reference: the classic 12-point Voronoi sampled every 20px
+    chaos = ChaosEffect(width, height, seed=1)
+    start = time.perf_counter()
+    for _ in range(min(frames, 30)):
+        chaos.draw_voronoi(surface)
+    classic_ms = (time.perf_counter() - start) * 1000 / min(frames, 30)
+    
+    print(f"\nVoronoi ({frames} frames, {width}x{height})")
+    print(f"{'px/cell':>7} {'seeds':>6} {'grid cells':>11} {'flood ms':>9} {'frame ms':>9} {'re-floods':>9}")
+    for resolution, seeds, cells, flood_ms, frame_ms, refloods in rows:
+        print(f"{resolution:>7} {seeds:>6} {cells:>11,} {flood_ms:>9.1f} {frame_ms:>9.2f} {refloods:>9}")
+    print(f"classic (12 points, 20px): {classic_ms:.2f} ms/frame")
+    return rows
+
+
+def bench_pattern_loops(frames=120, viewport=2):
+    """Effect 3 patterns drawn live vs played back from baked loops, plus bake time and loop memory"""
+    app = make_app(viewport, {}, bake_patterns=True)
+    app.activate_effect(3)
+    psychedelic = app.effects.plugins[3]
+    loops = psychedelic.loops
+    loops.duty = 1.0  # Bake flat out, nothing else is rendering
+    image = app.get_scaled_image()
+    canvas = psychedelic.canvas()
+    scale = app.render_scales['psychedelic']
+    
+    def time_pattern(index):
+        psychedelic.pattern_index = index
+        start = time.perf_counter()
+        for _ in range(frames):
+            psychedelic.update(app.sim_dt)
+            psychedelic.pattern_timer = 0  # Stay on this pattern
+            psychedelic.draw(image)
+        return (time.perf_counter() - start) * 1000 / frames
+    
+    patterns = sorted(psychedelic.loop_steps)
+    psychedelic.loops = None
+    live = {index: time_pattern(index) for index in patterns}
+    psychedelic.loops = loops
+    
+    # Bake one loop at a time (before timing playback, so no bake runs alongside it)
+    baking = {}
+    for index in patterns:
+        memory = loops.loops.bytes
+        start = time.perf_counter()
+        loops.request(index, canvas, scale)
+        while not loops.ready(index, canvas, scale) and not loops.failed:
+            time.sleep(0.01)
+        baking[index] = (time.perf_counter() - start, (loops.loops.bytes - memory) / 1048576)
+    
+    rows = [(index, psychedelic.loop_steps[index], live[index], time_pattern(index), *baking[index])
+            for index in patterns]
+    app.cleanup()
+    
+    width, height = image.get_size()
+    print(f"\nPsychedelic pattern loops ({frames} frames, {width}x{height} sprite, render scale {scale})")
+    print(f"{'pattern':>7} {'steps':>6} {'live ms':>8} {'baked ms':>9} {'bake s':>7} {'MB':>6}")
+    for index, steps, live_ms, baked_ms, bake_s, mb in rows:
+        print(f"{index:>7} {steps:>6} {live_ms:>8.2f} {baked_ms:>9.2f} {bake_s:>7.1f} {mb:>6.1f}")
+    return rows
+
+
+def bench_recording(frames=120, viewport=2, ffmpeg='ffmpeg'):
+    """Frame time with and without video recording, per drop policy, plus dropped frames and queue depth"""
+    if not ffmpeg_available(ffmpeg):
+        print(f"Recording benchmark needs ffmpeg ({ffmpeg} was not found on PATH)")
+        return None
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        for drop in (None, 'newest', 'oldest'):
+            app = make_app(viewport, {'background': 9})
+            app.video_dir = folder
+            app.video_drop = drop
+            app.ffmpeg = ffmpeg
+            app.render_offline(5)  # Warm up caches
+            if drop:
+                app.toggle_video_recording()
+            start = time.perf_counter()
+            app.render_offline(frames)
+            frame_ms = (time.perf_counter() - start) * 1000 / frames
+            stats = app.video_recorder.stats() if app.video_recorder else None
+            app.stop_video_recording()
+            app.cleanup()
+            rows.append((drop or 'off', frame_ms, stats))
+    
+    width, height = VIEWPORT_SIZES[viewport]
+    print(f"\nVideo recording ({frames} frames, {width}x{height}, chaos background)")
+    print(f"{'recording':>10} {'ms/frame':>9} {'copy ms':>8} {'dropped':>8} {'max queue':>10}")
+    for drop, frame_ms, stats in rows:
+        if stats:
+            queue = f"{stats['queue_max']}/{stats['queue_capacity']}"
+            print(f"{drop:>10} {frame_ms:>9.2f} {stats['copy_ms']:>8.2f} {stats['dropped']:>8} {queue:>10}")
+        else:
+            print(f"{drop:>10} {frame_ms:>9.2f} {'-':>8} {'-':>8} {'-':>10}")
+    return rows
+
+
+def bench_caches(frames=120, viewport=2, budget_mb=24):
+    """Switch zooms, backgrounds and effects under a small cache budget and check it holds (0 = no limit)"""
+    app = make_app(viewport, {'background': 3})
+    app.caches.set_budget(budget_mb)
+    app.show_ui = True
+    per_scene = max(1, frames // 20)
+    peak = 0
+    start = time.perf_counter()
+    for zoom in range(10):
+        app.change_zoom(zoom)
+        for background in (3, 4, 5, 6, 7, 8, 1, 2):
+            app.change_background(background)
+            app.render_offline(per_scene)
+            peak = max(peak, app.caches.bytes)
+        for effect in (1, 2, 3):
+            app.activate_effect(effect)
+            app.apply_audio_level(2000)
+            app.render_offline(per_scene)
+            peak = max(peak, app.caches.bytes)
+            app.activate_effect(effect)  # Toggle it back off
+    frame_ms = (time.perf_counter() - start) * 1000 / (10 * 11 * per_scene)
+    
+    # Revisit the first scene: whatever survived eviction counts as hits
+    app.change_zoom(0)
+    app.change_background(3)
+    app.render_offline(per_scene)
+    app.cleanup()
+    
+    stats = app.caches.dump()
+    peak_mb = peak / 1048576
+    print(f"\nCache budget check ({per_scene} frames per scene, {frame_ms:.2f} ms/frame): "
+          f"peak {peak_mb:.1f} MB of {budget_mb or 'unlimited'} MB")
+    if budget_mb and peak_mb > budget_mb:
+        print(f"\n❌ Caches went over their {budget_mb} MB budget")
+        return [stats]
+    print("\n✅ Caches stayed within their budget")
+    return []
+
+
+# Scene switches that used to spike a frame: (label, action)
+SWITCHES = [
+    ('zoom Z+6', lambda app: app.change_zoom(5)),
+    ('zoom Z+5', lambda app: app.change_zoom(4)),
+    ('zoom Z+1', lambda app: app.change_zoom(0)),
+    ('background B+5', lambda app: app.change_background(5)),
+    ('background B+9', lambda app: app.change_background(9)),
+    ('effect E+1', lambda app: app.activate_effect(1)),
+    ('effect E+2', lambda app: app.activate_effect(2)),
+    ('background B+7', lambda app: app.change_background(7)),
+    ('viewport D+2', lambda app: app.change_viewport(1)),
+    ('background B+4', lambda app: app.change_background(4)),
+]
+
+
+def bench_switches(frames=120, viewport=2):
+    """First-frame time after each scene switch, with and without background jobs in idle frame time"""
+    frame_ms = 1000 / 60
+    results = {}
+    steady = {}
+    for jobs in (False, True):
+        app = make_app(viewport, {'background': 3, 'zoom': 4, 'chaos_voronoi': {'mode': 'jfa'},
+                                  'jobs': {'warm_chaos': True}})  # B+9 is one of the switches
+        
+        def settle(count):
+            # Render at 60 FPS, giving the scheduler whatever each frame leaves over; returns render ms
+            render_ms = 0.0
+            for _ in range(count):
+                start = time.perf_counter()
+                app.render_offline(1)
+                render_ms += (time.perf_counter() - start) * 1000
+                if jobs:
+                    app.jobs.run(frame_ms - (time.perf_counter() - start) * 1000)
+            return render_ms / count
+        
+        settle(frames)
+        for label, action in SWITCHES:
+            start = time.perf_counter()
+            action(app)
+            app.render_offline(1)
+            results.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+            steady[label] = settle(frames)
+        stats = app.jobs.stats()
+        app.cleanup()
+    
+    print(f"\nFirst frame after a switch ({frames} frames at 60 FPS between switches, "
+          f"jfa chaos background)")
+    print(f"{'switch':>16} {'no jobs ms':>11} {'jobs ms':>8} {'steady ms':>10}")
+    for label, (without_jobs, with_jobs) in results.items():
+        print(f"{label:>16} {without_jobs:>11.2f} {with_jobs:>8.2f} {steady[label]:>10.2f}")
+    print(f"Jobs: {stats['completed']} completed, {stats['forced']} needed before they ran, "
+          f"{stats['cancelled']} cancelled")
+    return results
+
+
+def bench_effects(frames=120, viewport=2):
+    """Update + draw time of each effect plugin against its declared budget: alone in its own scene
+    (E+N on black, chaos as B+9) and all stacked on chaos; fails if a plugin is over budget alone"""
+    failures = []
+    rows = []
+    app = make_app(viewport, {'background': 1})
+    slots = sorted(app.effects.plugins)
+    app.cleanup()
+    cases = [(f"E+{slot}", 1, [slot]) for slot in slots] + [('B+9', 9, []), ('stacked', 9, slots)]
+    for label, background, active in cases:
+        app = make_app(viewport, {'background': background})
+        for slot in active:
+            app.activate_effect(slot)
+        source = SyntheticSource('speech', seed=1)
+        run_frames(app, 10, source)  # Warm up caches
+        run_frames(app, frames, source)
+        for name, stats in app.effects.stats().items():
+            if stats['active']:
+                alone = label != 'stacked'
+                if alone and stats['mean_ms'] > stats['budget_ms']:
+                    failures.append((label, name))
+                rows.append((label, name, stats['mean_ms'], stats['budget_ms'], stats['over_budget_frames'], alone))
+        app.cleanup()
+
+    print(f"\nEffect plugin budgets ({frames} frames, synthetic speech)")
+    print(f"{'case':>8} {'plugin':>12} {'mean ms':>8} {'budget':>7} {'frames over':>12}  result")
+    for label, name, mean_ms, budget_ms, over, alone in rows:
+        result = ("ok" if mean_ms <= budget_ms else "OVER BUDGET") if alone else "-"
+        print(f"{label:>8} {name:>12} {mean_ms:>8.2f} {budget_ms:>7.3g} {over:>12}  {result}")
+    if failures:
+        print(f"\n❌ {len(failures)} plugin(s) over their own budget")
+    else:
+        print("\n✅ All plugins within their own budgets")
+    return failures
+
+
+def bench_audio(frames=120, viewport=2, seconds=10.0):
+    """Audio chunks delivered late (overflows) while chaos + psychedelic render flat out,
+    with the audio source on a thread in the render process and in its own process"""
+    rows = []
+    for label, audio_process in [('thread', False), ('process', True)]:
+        app = make_app(viewport, {'background': 9}, audio_source='speech', audio_process=audio_process)
+        app.activate_effect(3)
+        run_frames(app, 10)  # Warm up caches
+        if audio_process:
+            deadline = time.perf_counter() + 10.0
+            while app.audio_source.stats()['chunks'] == 0 and time.perf_counter() < deadline:
+                time.sleep(0.05)  # Child process still starting
+                app.audio_source.poll()
+        before = app.audio_source.stats()
+        rendered = 0
+        start = last = time.perf_counter()
+        while last - start < seconds:
+            app.process_audio_levels()
+            now = time.perf_counter()
+            app.advance(now - last)
+            last = now
+            app.draw()
+            rendered += 1
+        app.process_audio_levels()
+        elapsed = time.perf_counter() - start
+        stats = app.audio_source.stats()
+        expected = elapsed * app.audio_source.rate / app.audio_source.chunk
+        rows.append((label, rendered / elapsed, stats['chunks'] - before['chunks'], expected,
+                     stats['overflows'] - before['overflows'], stats['max_late_ms']))
+        app.cleanup()
+
+    print(f"\nAudio overflows ({seconds:g}s real time, chaos background + psychedelic, synthetic speech)")
+    print(f"{'audio':>8} {'fps':>6} {'chunks':>7} {'expected':>9} {'overflows':>10} {'worst late ms':>14}")
+    for label, fps, chunks, expected, overflows, late_ms in rows:
+        print(f"{label:>8} {fps:>6.1f} {chunks:>7} {expected:>9.0f} {overflows:>10} {late_ms:>14.1f}")
+    return rows
+
+
+RENDERER_SCENES = [
+    ('idle', {'background': 1}, []),
+    ('image bg', {'background': 3}, []),
+    ('rainbow', {'background': 2}, []),
+    ('chaos', {'background': 9}, []),
+    ('rage', {'background': 3}, [1]),
+    ('emoji', {'background': 3}, [2]),
+    ('psychedelic', {'background': 1}, [3]),
+]
+
+
+def bench_renderers(frames=120, viewport=2):
+    """Render-thread CPU time per frame with the surface compositor and the SDL2 texture renderer
+    (software driver, so both run on this CPU)"""
+    rows = []
+    for label, config, effects in RENDERER_SCENES:
+        row = [label]
+        for renderer in ('surface', 'texture'):
+            app = make_app(viewport, config, renderer=renderer)
+            if app.renderer_backend != renderer:
+                app.cleanup()
+                print(f"Skipping the {renderer} renderer: not available")
+                return rows
+            for slot in effects:
+                app.activate_effect(slot)
+            source = SyntheticSource('speech', seed=1)
+            run_frames(app, 10, source)  # Warm up caches and upload textures
+            cpu_before = app.render_cpu_total
+            wall_ms = run_frames(app, frames, source)
+            row += [(app.render_cpu_total - cpu_before) / frames, sum(wall_ms) / frames]
+            app.cleanup()
+        rows.append(row)
+
+    print(f"\nRenderer CPU time per frame ({frames} frames, {VIEWPORT_SIZES[viewport][0]}x{VIEWPORT_SIZES[viewport][1]}, "
+          f"synthetic speech)")
+    print(f"{'scene':>12} {'surface CPU':>12} {'wall':>7} {'texture CPU':>12} {'wall':>7}")
+    for label, surface_cpu, surface_wall, texture_cpu, texture_wall in rows:
+        print(f"{label:>12} {surface_cpu:>10.2f}ms {surface_wall:>5.2f}ms {texture_cpu:>10.2f}ms {texture_wall:>5.2f}ms")
+    return rows
+
+
+ZOOM_TRANSITIONS = [(0, 4), (4, 9), (9, 0), (2, 2.5)]
+
+
+def bench_zoom(frames=120, viewport=2):
+    """Sprite scaling per zoom transition frame: the full-resolution image, the nearest mip level,
+    and only the on-screen part of the mip level (what the surface renderer does), plus the
+    frame times of the transition itself"""
+    rows = []
+    for start_zoom, end_zoom in ZOOM_TRANSITIONS:
+        app = make_app(viewport, {'background': 1, 'zoom': start_zoom})
+        app.render_offline(5)  # Warm up at the starting zoom
+        app.change_zoom(end_zoom)
+        scratch = pygame.Surface(app.screen.get_size())
+        full_ms = mip_ms = part_ms = 0.0
+        frame_ms = []
+        while app.zoom_moving():
+            frame_ms += run_frames(app, 1)
+            size = app.sprite_size()
+            start = time.perf_counter()
+            pygame.transform.smoothscale(app.original_image, size)
+            full_ms += (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            app.mipmaps.scale(size)
+            mip_ms += (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            app.draw_zooming_character(scratch)
+            part_ms += (time.perf_counter() - start) * 1000
+        count = len(frame_ms)
+        rows.append((f"{start_zoom}->{end_zoom}", count, full_ms / count, mip_ms / count, part_ms / count,
+                     sum(frame_ms) / count, max(frame_ms)))
+        mipmaps = app.mipmaps.stats()
+        app.cleanup()
+
+    print(f"\nZoom transitions ({VIEWPORT_SIZES[viewport][0]}x{VIEWPORT_SIZES[viewport][1]}, "
+          f"pyramid {len(mipmaps['levels'])} levels, {mipmaps['mb']}MB, built in {mipmaps['build_ms']:.1f}ms)")
+    print(f"{'zoom':>8} {'frames':>7} {'full-res':>9} {'mip level':>10} {'on-screen':>10} {'frame mean':>11} {'max':>8}")
+    for label, count, full_ms, mip_ms, part_ms, mean_ms, max_ms in rows:
+        print(f"{label:>8} {count:>7} {full_ms:>7.2f}ms {mip_ms:>8.2f}ms {part_ms:>8.2f}ms "
+              f"{mean_ms:>9.2f}ms {max_ms:>6.2f}ms")
+    return rows
+
+
+RESIZE_SCENES = [
+    ('ship', {'background': 3, 'zoom': 0}),
+    ('chaos', {'background': 9, 'zoom': 0, 'chaos_voronoi': {'mode': 'jfa'}}),
+]
+
+
+def bench_resize(frames=120, viewport=0):
+    """Frame times while a window is dragged from 1280x720 to 1920x1080 (one resize event per
+    frame, paced at 60 FPS): rebuilding on every event vs debounced and scaled ahead on the job threads"""
+    frame_ms = 1000 / 60
+    drag = [(1280 + step * 20, 720 + step * 360 // 32) for step in range(33)]
+    rows = []
+    for label, config in RESIZE_SCENES:
+        for mode in ('every event', 'debounced'):
+            app = make_app(0, config)
+            app.change_viewport(list(drag[0]))
+            run_frames(app, 30)
+            times = []
+            for frame in range(len(drag) + frames):
+                start = time.perf_counter()
+                if frame < len(drag):
+                    if mode == 'every event':
+                        app.change_viewport(list(drag[frame]))
+                    else:
+                        app.request_resize(*drag[frame])
+                app.apply_pending_resize()
+                app.advance(frame_ms / 1000, realtime=False)
+                app.draw()
+                elapsed = (time.perf_counter() - start) * 1000
+                times.append(elapsed)
+                app.jobs.run(frame_ms - elapsed)
+                time.sleep(max(0.0, frame_ms - (time.perf_counter() - start) * 1000) / 1000)
+            rows.append((label, mode, app.resizes - 1, sum(times) / len(times), max(times),
+                         sum(1 for ms in times if ms > 2 * frame_ms), (app.width, app.height)))
+            app.cleanup()
+
+    print(f"\nDragging the window 1280x720 -> 1920x1080 ({len(drag)} resize events, then {frames} frames)")
+    print(f"{'scene':>8} {'mode':>12} {'rebuilds':>9} {'mean ms':>8} {'max ms':>7} {'over 33ms':>10} {'final':>10}")
+    for label, mode, rebuilds, mean_ms, max_ms, hitches, size in rows:
+        print(f"{label:>8} {mode:>12} {rebuilds:>9} {mean_ms:>8.2f} {max_ms:>7.2f} {hitches:>10} "
+              f"{size[0]:>5}x{size[1]}")
+    return rows
+
+
+BENCHMARKS = {
+    'render-scale': bench_render_scale,
+    'alloc': bench_allocations,
+    'modes': bench_modes,
+    'sprites': bench_sprites,
+    'boids': bench_boids,
+    'voronoi': bench_voronoi,
+    'loops': bench_pattern_loops,
+    'recording': bench_recording,
+    'caches': bench_caches,
+    'switches': bench_switches,
+    'effects': bench_effects,
+    'audio': bench_audio,
+    'renderers': bench_renderers,
+    'zoom': bench_zoom,
+    'resize': bench_resize,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Samurai Samus Avatar benchmarks')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help='Benchmark to run')
+    parser.add_argument('--frames', type=int, default=120, help='Frames to render per case (default: 120)')
+    parser.add_argument('--viewport', type=int, default=2, choices=[0, 1, 2],
+                        help='Viewport preset (0=800x800, 1=1200x800, 2=1920x1080; default: 2)')
+    parser.add_argument('--ffmpeg', default='ffmpeg', help='ffmpeg executable for the recording benchmark')
+    parser.add_argument('--budget-mb', type=int, default=24, help='Cache budget for the caches benchmark (default: 24)')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Real-time length of the audio benchmark (default: 10)')
+    args = parser.parse_args()
+
+    options = {}
+    if args.benchmark == 'recording':
+        options = {'ffmpeg': args.ffmpeg}
+    elif args.benchmark == 'caches':
+        options = {'budget_mb': args.budget_mb}
+    elif args.benchmark == 'audio':
+        options = {'seconds': args.seconds}
+    result = BENCHMARKS[args.benchmark](frames=args.frames, viewport=args.viewport, **options)
+    if args.benchmark in ('alloc', 'modes', 'caches', 'effects') and result:
+        sys.exit(1)  # Budget regression
@@ -0,0 +1,195 @@
+"""
+CACHE REGISTRY - One memory budget shared by every cache
+Caches (scaled sprite, scaled backgrounds, explosion and emoji transforms,
+rendered text, baked pattern loops) keep their entries in RegisteredCache
+objects that report their size to a CacheRegistry. When the total goes over
+the budget, the registry evicts across all caches by GreedyDual-Size: each
+entry's priority is the registry clock plus its rebuild cost per KB, renewed
+on every hit, and the lowest priority goes first. A big scaled background
+that is quick to rebuild and hasn't been drawn lately goes before a small
+glyph that took as long to render.
+"""
+
+import threading
+
+MB = 1024 * 1024
+
+
+def surface_bytes(surface):
+    """Pixel memory held by a surface"""
+    return surface.get_pitch() * surface.get_height()
+
+
+class RegisteredCache:
+    """Dict-like cache whose entries count against its registry's budget"""
+
+    def __init__(self, registry, name, max_entries=None, max_bytes=None):
+        self.registry = registry
+        self.name = name
+        self.max_entries = max_entries  # Own limits, on top of the registry budget
+        self.max_bytes = max_bytes
+        self.entries = {}  # key -> [value, bytes, cost_ms, priority]
+        self.bytes = 0
+        self.on_discard = None  # Called with (key, value) for every entry dropped, evicted or cleared
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Cached value (renewing its priority) or None"""
+        with self.registry.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry[3] = self.registry.priority(entry[1], entry[2])
+            return entry[0]
+
+    def peek(self, key):
+        """Cached value or None, without counting a lookup or renewing its priority"""
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def put(self, key, value, cost_ms=0.0, size=None):
+        """Store value (size defaults to a surface's pixel bytes; cost_ms is what it took to build)"""
+        if size is None:
+            size = surface_bytes(value)
+        with self.registry.lock:
+            self.discard(key)
+            self.entries[key] = [value, size, cost_ms, self.registry.priority(size, cost_ms)]
+            self.bytes += size
+            self.registry.bytes += size
+            while ((self.max_entries and len(self.entries) > self.max_entries)
+                   or (self.max_bytes and self.bytes > self.max_bytes)):
+                victim = self.lowest(key)
+                if victim is None:
+                    break
+                self.evict(victim)
+            self.registry.enforce(self, key)
+        return value
+
+    def lowest(self, protect=None):
+        """Key of the entry to evict first (never protect), or None"""
+        victim = None
+        lowest = None
+        for key, entry in self.entries.items():
+            if key != protect and (lowest is None or entry[3] < lowest):
+                victim, lowest = key, entry[3]
+        return victim
+
+    def evict(self, key):
+        """Drop an entry to free memory"""
+        with self.registry.lock:
+            self.registry.inflation = max(self.registry.inflation, self.entries[key][3])
+            self.discard(key)
+            self.evictions += 1
+            self.registry.evictions += 1
+
+    def discard(self, key):
+        """Drop an entry if present (not counted as an eviction)"""
+        with self.registry.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+                self.registry.bytes -= entry[1]
+                if self.on_discard:
+                    self.on_discard(key, entry[0])
+
+    def discard_if(self, test):
+        """Drop every entry whose key passes test (e.g. everything scaled from a reloaded image)"""
+        with self.registry.lock:
+            for key in [key for key in self.entries if test(key)]:
+                self.discard(key)
+
+    def clear(self):
+        with self.registry.lock:
+            if self.on_discard:
+                for key, entry in self.entries.items():
+                    self.on_discard(key, entry[0])
+            self.registry.bytes -= self.bytes
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'mb': round(self.bytes / MB, 2),
+            'entries': len(self.entries),
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions
+        }
+
+
+class CacheRegistry:
+    def __init__(self, budget_mb=512):
+        self.budget = budget_mb * MB if budget_mb else None  # None = unlimited
+        self.caches = []
+        self.bytes = 0
+        self.inflation = 0.0  # GreedyDual-Size clock: rises to the priority of each evicted entry
+        self.min_cost_ms = 0.05  # Entries built "for free" still rank by recency
+        self.lock = threading.RLock()  # Caches may be filled from worker threads (pattern baker)
+        self.evictions = 0
+
+    def cache(self, name, max_entries=None, max_bytes=None):
+        """New cache counted against this registry's budget"""
+        cache = RegisteredCache(self, name, max_entries, max_bytes)
+        self.caches.append(cache)
+        return cache
+
+    def priority(self, size, cost_ms):
+        """Eviction priority of an entry used now: higher stays longer"""
+        return self.inflation + (cost_ms + self.min_cost_ms) * 1024 / max(1, size)
+
+    def enforce(self, protect_cache=None, protect_key=None):
+        """Evict lowest-priority entries across all caches until the total fits the budget"""
+        if self.budget is None:
+            return
+        with self.lock:
+            while self.bytes > self.budget:
+                victim_cache = victim_key = None
+                lowest = None
+                for cache in self.caches:
+                    key = cache.lowest(protect_key if cache is protect_cache else None)
+                    if key is not None and (lowest is None or cache.entries[key][3] < lowest):
+                        victim_cache, victim_key, lowest = cache, key, cache.entries[key][3]
+                if victim_cache is None:
+                    break  # Only the entry being added is left
+                victim_cache.evict(victim_key)
+
+    def set_budget(self, budget_mb):
+        self.budget = budget_mb * MB if budget_mb else None
+        self.enforce()
+
+    def stats(self):
+        with self.lock:
+            hits = sum(cache.hits for cache in self.caches)
+            lookups = hits + sum(cache.misses for cache in self.caches)
+            return {
+                'mb': round(self.bytes / MB, 2),
+                'budget_mb': round(self.budget / MB) if self.budget else None,
+                'entries': sum(len(cache) for cache in self.caches),
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'caches': {cache.name: cache.stats() for cache in self.caches}
+            }
+
+    def dump(self):
+        """Print a table of every cache"""
+        stats = self.stats()
+        budget = f"{stats['budget_mb']} MB" if stats['budget_mb'] else "unlimited"
+        print(f"🗄️ Caches: {stats['mb']:.1f} MB of {budget}, {stats['entries']} entries, "
+              f"{stats['hit_rate']:.0%} hits, {stats['evictions']} evictions")
+        print(f"  {'cache':<16} {'MB':>8} {'entries':>8} {'hit rate':>9} {'evictions':>10}")
+        for name, cache in stats['caches'].items():
+            print(f"  {name:<16} {cache['mb']:>8.2f} {cache['entries']:>8} "
+                  f"{cache['hit_rate']:>9.1%} {cache['evictions']:>10}")
+        return stats
@@ -6,19 +6,51 @@ A celebration of computational beauty and chaos
 import pygame
 import math
 import random
+import time
 import numpy as np
 
+from effect_plugins import EffectPlugin
+from particle_swarm import BoidSwarm
+from voronoi_field import VoronoiField
 
-class ChaosEffect:
-    def __init__(self, width, height):
+
+class ChaosEffect(EffectPlugin):
+    name = 'chaos'
+    title = 'CHAOS 🌀'
+    kind = 'background'  # Attached to the effect stack while B+9 is the background
+    budget_ms = 100.0  # 50-70 ms at 1920x1080 (benchmarks.py effects), well over a 60 fps frame
+    particle_modes = ('classic', 'boids')
+    voronoi_modes = ('classic', 'jfa')
+    
+    def __init__(self, width, height, seed=None, particle_mode='classic', swarm_size=2000,
+                 neighbor_radius=40, cell_size=None, voronoi_mode='classic', voronoi_seeds=256,
+                 voronoi_resolution=4, voronoi_edges=False):
+        super().__init__()
         self.width = width
         self.height = height
-        self.time = 0
+        self.rng = random.Random(seed)  # Seeded for reproducible sessions
+        self.time = 0  # Simulation steps (all speeds are per step at 60 steps/sec)
+        
+        # Fixed-timestep simulation
+        self.step_dt = 1.0 / 60
+        self.accumulator = 0.0
+        self.alpha = 0.0  # Fraction of a step to extrapolate when drawing
+        self.draw_scale = 1.0  # Surface pixels per simulation unit (< 1 for low-res rendering)
+        self.layer_times = {}  # ms spent drawing each layer in the last draw()
         
         # Particle system
         self.particles = []
         self.max_particles = 200
         
+        # Boids mode: a large flocking swarm instead of the classic particles
+        if particle_mode not in self.particle_modes:
+            raise ValueError(f"Unknown particle mode: {particle_mode}")
+        self.particle_mode = particle_mode
+        self.swarm_size = swarm_size
+        self.neighbor_radius = neighbor_radius
+        self.cell_size = cell_size  # Spatial hash cell size (None = neighbor radius)
+        self.swarm = None
+        
         # Fractal parameters
         self.fractal_depth = 0
         self.fractal_angle = 0
@@ -31,7 +63,17 @@ class ChaosEffect:
         
         # Voronoi points
         self.voronoi_points = []
-        self.regenerate_voronoi()
+        
+        # 'jfa': hundreds of seeds labelled per grid cell by jump flooding instead of 12 brute-forced points
+        if voronoi_mode not in self.voronoi_modes:
+            raise ValueError(f"Unknown Voronoi mode: {voronoi_mode}")
+        self.voronoi_mode = voronoi_mode
+        self.voronoi = None
+        if voronoi_mode == 'jfa':
+            self.voronoi = VoronoiField(width, height, seed_count=voronoi_seeds, resolution=voronoi_resolution,
+                                        edges=voronoi_edges, seed=self.rng.getrandbits(32))
+        else:
+            self.regenerate_voronoi()
         
         # Lissajous parameters
         self.lissajous_a = 3
@@ -42,34 +84,73 @@ class ChaosEffect:
         self.kaleidoscope_segments = 8
         
         # Initialize particles
-        self.spawn_particles(50)
+        if particle_mode == 'boids':
+            self.set_particle_mode('boids')
+        else:
+            self.spawn_particles(50)
+    
+    def set_particle_mode(self, mode):
+        """Switch between classic particles and the boids swarm"""
+        if mode not in self.particle_modes:
+            raise ValueError(f"Unknown particle mode: {mode}")
+        self.particle_mode = mode
+        if mode == 'boids':
+            if self.swarm is None:
+                self.swarm = BoidSwarm(self.width, self.height, capacity=self.swarm_size,
+                                       neighbor_radius=self.neighbor_radius, cell_size=self.cell_size,
+                                       seed=self.rng.getrandbits(32))
+                self.swarm.spawn(self.swarm_size)
+        else:
+            self.swarm = None
+            if not self.particles:
+                self.spawn_particles(50)
+    
+    def particle_count(self):
+        """Live particles (or boids)"""
+        return len(self.swarm) if self.swarm else len(self.particles)
+    
+    def status(self):
+        return f"{self.title} ({self.particle_count()} particles)"
+    
+    def stats(self):
+        return {
+            'particles': self.particle_count(),
+            'layer_ms': {name: round(ms, 3) for name, ms in self.layer_times.items()},
+            'voronoi': self.voronoi.stats() if self.voronoi else None
+        }
     
     def spawn_particles(self, count):
         """Spawn new particles"""
+        if self.swarm:
+            self.swarm.spawn(count)
+            return
         for _ in range(count):
             if len(self.particles) < self.max_particles:
                 particle = {
-                    'x': random.uniform(0, self.width),
-                    'y': random.uniform(0, self.height),
-                    'vx': random.uniform(-3, 3),
-                    'vy': random.uniform(-3, 3),
-                    'size': random.uniform(2, 8),
-                    'hue': random.uniform(0, 360),
+                    'x': self.rng.uniform(0, self.width),
+                    'y': self.rng.uniform(0, self.height),
+                    'vx': self.rng.uniform(-3, 3),
+                    'vy': self.rng.uniform(-3, 3),
+                    'size': self.rng.uniform(2, 8),
+                    'hue': self.rng.uniform(0, 360),
                     'life': 1.0,
-                    'decay': random.uniform(0.003, 0.01)
+                    'decay': self.rng.uniform(0.003, 0.01)
                 }
                 self.particles.append(particle)
     
     def regenerate_voronoi(self):
         """Generate new Voronoi points"""
+        if self.voronoi:
+            self.voronoi.regenerate()
+            return
         self.voronoi_points = []
         for _ in range(12):
             self.voronoi_points.append({
-                'x': random.uniform(0, self.width),
-                'y': random.uniform(0, self.height),
-                'hue': random.uniform(0, 360),
-                'vx': random.uniform(-2, 2),
-                'vy': random.uniform(-2, 2)
+                'x': self.rng.uniform(0, self.width),
+                'y': self.rng.uniform(0, self.height),
+                'hue': self.rng.uniform(0, 360),
+                'vx': self.rng.uniform(-2, 2),
+                'vy': self.rng.uniform(-2, 2)
             })
     
     def hsv_to_rgb(self, h, s, v):
@@ -78,51 +159,44 @@ class ChaosEffect:
         r, g, b = colorsys.hsv_to_rgb(h / 360.0, s, v)
         return (int(r * 255), int(g * 255), int(b * 255))
     
-    def update(self):
-        """Update all chaos systems"""
+    def advance(self, elapsed, max_elapsed=0.25):
+        """Advance by elapsed real seconds in fixed steps (pass max_elapsed=None for offline rendering)"""
+        if max_elapsed is not None:
+            elapsed = min(elapsed, max_elapsed)
+        self.accumulator += elapsed
+        while self.accumulator >= self.step_dt:
+            self.update()
+            self.accumulator -= self.step_dt
+        self.alpha = self.accumulator / self.step_dt
+
+    def warm_up(self):
+        """Do the first draw's expensive work (the Voronoi flood) ahead of time, one slice per yield"""
+        if self.voronoi:
+            yield from self.voronoi.update_steps()
+
+    def resize(self, width, height):
+        """Fit the simulation to a new viewport: everything keeps its relative position"""
+        sx = width / self.width
+        sy = height / self.height
+        self.width = width
+        self.height = height
+        for item in self.particles + self.voronoi_points:
+            item['x'] *= sx
+            item['y'] *= sy
+        self.attractor_points = [(int(x * sx), int(y * sy)) for x, y in self.attractor_points]
+        if self.swarm:
+            self.swarm.resize(width, height)
+        if self.voronoi:
+            self.voronoi.resize(width, height)
+    
+    def update(self, dt=None):
+        """Update all chaos systems by one fixed step"""
         self.time += 1
         
-        # Update particles with attraction/repulsion
-        center_x = self.width / 2
-        center_y = self.height / 2
-        
-        for particle in self.particles[:]:
-            # Apply attraction to center with oscillation
-            dx = center_x - particle['x']
-            dy = center_y - particle['y']
-            dist = math.sqrt(dx * dx + dy * dy) + 0.1
-            
-            # Oscillating force field
-            force = math.sin(self.time * 0.05 + dist * 0.02) * 0.5
-            particle['vx'] += (dx / dist) * force
-            particle['vy'] += (dy / dist) * force
-            
-            # Rotational force
-            angle = math.atan2(dy, dx) + math.pi / 2
-            particle['vx'] += math.cos(angle) * 0.3
-            particle['vy'] += math.sin(angle) * 0.3
-            
-            # Apply velocity with damping
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['vx'] *= 0.98
-            particle['vy'] *= 0.98
-            
-            # Wrap around screen
-            particle['x'] %= self.width
-            particle['y'] %= self.height
-            
-            # Color cycle
-            particle['hue'] = (particle['hue'] + 1) % 360
-            
-            # Life decay
-            particle['life'] -= particle['decay']
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
-        
-        # Spawn new particles
-        if len(self.particles) < self.max_particles and self.time % 3 == 0:
-            self.spawn_particles(2)
+        if self.swarm:
+            self.swarm.step(self.time)
+        else:
+            self.update_particles()
         
         # Update strange attractor (Lorenz system)
         dt = 0.01
@@ -147,6 +221,8 @@ class ChaosEffect:
             self.attractor_points.pop(0)
         
         # Update Voronoi points
+        if self.voronoi:
+            self.voronoi.step()
         for point in self.voronoi_points:
             point['x'] += point['vx']
             point['y'] += point['vy']
@@ -169,36 +245,100 @@ class ChaosEffect:
         # Update Lissajous parameters
         self.lissajous_delta += 0.02
     
+    def update_particles(self):
+        """Update classic particles with attraction/repulsion"""
+        center_x = self.width / 2
+        center_y = self.height / 2
+        
+        for particle in self.particles[:]:
+            # Apply attraction to center with oscillation
+            dx = center_x - particle['x']
+            dy = center_y - particle['y']
+            dist = math.sqrt(dx * dx + dy * dy) + 0.1
+            
+            # Oscillating force field
+            force = math.sin(self.time * 0.05 + dist * 0.02) * 0.5
+            particle['vx'] += (dx / dist) * force
+            particle['vy'] += (dy / dist) * force
+            
+            # Rotational force
+            angle = math.atan2(dy, dx) + math.pi / 2
+            particle['vx'] += math.cos(angle) * 0.3
+            particle['vy'] += math.sin(angle) * 0.3
+            
+            # Apply velocity with damping
+            particle['x'] += particle['vx']
+            particle['y'] += particle['vy']
+            particle['vx'] *= 0.98
+            particle['vy'] *= 0.98
+            
+            # Wrap around screen
+            particle['x'] %= self.width
+            particle['y'] %= self.height
+            
+            # Color cycle
+            particle['hue'] = (particle['hue'] + 1) % 360
+            
+            # Life decay
+            particle['life'] -= particle['decay']
+            if particle['life'] <= 0:
+                self.particles.remove(particle)
+        
+        # Spawn new particles
+        if len(self.particles) < self.max_particles and self.time % 3 == 0:
+            self.spawn_particles(2)
+    
     def draw(self, surface):
-        """Draw all chaos effects"""
+        """Draw all chaos effects (surface may be smaller than width x height for low-res rendering)"""
+        # Scale from simulation coordinates to surface pixels
+        self.draw_scale = surface.get_width() / self.width
+        self.layer_times = {}
+        
         # Create layers for different effects
         
         # Layer 1: Voronoi diagram (background)
-        self.draw_voronoi(surface)
+        self.draw_layer('voronoi', self.draw_voronoi, surface)
         
         # Layer 2: Geometric patterns
-        self.draw_geometric_chaos(surface)
+        self.draw_layer('geometric', self.draw_geometric_chaos, surface)
         
         # Layer 3: Strange attractor
-        self.draw_strange_attractor(surface)
+        self.draw_layer('attractor', self.draw_strange_attractor, surface)
         
         # Layer 4: Particles
-        self.draw_particles(surface)
+        self.draw_layer('particles', self.draw_particles, surface)
         
         # Layer 5: Fractals
-        self.draw_fractals(surface)
+        self.draw_layer('fractals', self.draw_fractals, surface)
         
         # Layer 6: Lissajous curves
-        self.draw_lissajous(surface)
+        self.draw_layer('lissajous', self.draw_lissajous, surface)
         
         # Layer 7: Kaleidoscope overlay
         if self.time % 60 < 30:  # Alternate
-            self.draw_kaleidoscope(surface)
+            self.draw_layer('kaleidoscope', self.draw_kaleidoscope, surface)
+    
+    def draw_layer(self, name, draw_function, surface):
+        """Draw one layer and record its time in layer_times"""
+        start = time.perf_counter()
+        draw_function(surface)
+        self.layer_times[name] = (time.perf_counter() - start) * 1000
+    
+    def line_width(self, width):
+        """Scale a line width to the current surface (at least 1px)"""
+        return max(1, int(round(width * self.draw_scale)))
     
     def draw_voronoi(self, surface):
         """Draw animated Voronoi diagram"""
+        if self.voronoi:
+            self.voronoi.draw(surface)
+            return
+        
+        s = self.draw_scale
+        
         # Sample points to create Voronoi cells
         step = 20
+        cell = int(math.ceil(step * s))
         for x in range(0, self.width, step):
             for y in range(0, self.height, step):
                 # Find closest Voronoi point
@@ -217,36 +357,66 @@ class ChaosEffect:
                     # Color based on distance and hue
                     intensity = min(1.0, min_dist / 50000)
                     color = self.hsv_to_rgb(closest_point['hue'], 0.6, 0.3 + intensity * 0.3)
-                    pygame.draw.rect(surface, color, (x, y, step, step))
+                    pygame.draw.rect(surface, color, (int(x * s), int(y * s), cell, cell))
     
     def draw_particles(self, surface):
         """Draw particle system"""
+        if self.swarm:
+            self.draw_swarm(surface)
+            return
+        s = self.draw_scale
+        trail_width = self.line_width(2)
         for particle in self.particles:
             color = self.hsv_to_rgb(particle['hue'], 1.0, particle['life'])
-            size = int(particle['size'] * particle['life'])
+            size = int(particle['size'] * particle['life'] * s)
             if size > 0:
-                pygame.draw.circle(surface, color, 
-                                 (int(particle['x']), int(particle['y'])), size)
+                # Extrapolate by the fraction of a step since the last update
+                x = particle['x'] + particle['vx'] * self.alpha
+                y = particle['y'] + particle['vy'] * self.alpha
+                pygame.draw.circle(surface, color, (int(x * s), int(y * s)), size)
                 
                 # Draw trails
-                trail_x = int(particle['x'] - particle['vx'] * 3)
-                trail_y = int(particle['y'] - particle['vy'] * 3)
+                trail_x = int((x - particle['vx'] * 3) * s)
+                trail_y = int((y - particle['vy'] * 3) * s)
                 pygame.draw.line(surface, color, 
-                               (int(particle['x']), int(particle['y'])),
-                               (trail_x, trail_y), 2)
+                               (int(x * s), int(y * s)),
+                               (trail_x, trail_y), trail_width)
+    
+    def draw_swarm(self, surface):
+        """Draw boids as dots with a short trail along their heading"""
+        swarm = self.swarm
+        n = len(swarm)
+        if not n:
+            return
+        s = self.draw_scale
+        trail_width = self.line_width(1)
+        x = (swarm.x[:n] + swarm.vx[:n] * self.alpha) * s
+        y = (swarm.y[:n] + swarm.vy[:n] * self.alpha) * s
+        trail_x = x - swarm.vx[:n] * (3 * s)
+        trail_y = y - swarm.vy[:n] * (3 * s)
+        sizes = np.maximum(1, (swarm.size[:n] * s).astype(np.int32))
+        points = zip(swarm.colors().tolist(), x.astype(np.int32).tolist(), y.astype(np.int32).tolist(),
+                     trail_x.astype(np.int32).tolist(), trail_y.astype(np.int32).tolist(), sizes.tolist())
+        for color, px, py, tx, ty, size in points:
+            pygame.draw.circle(surface, color, (px, py), size)
+            pygame.draw.line(surface, color, (px, py), (tx, ty), trail_width)
     
     def draw_strange_attractor(self, surface):
         """Draw Lorenz strange attractor"""
+        s = self.draw_scale
+        width = self.line_width(2)
         if len(self.attractor_points) > 1:
             for i in range(len(self.attractor_points) - 1):
                 hue = (i * 2 + self.time) % 360
                 color = self.hsv_to_rgb(hue, 0.8, 0.8)
                 alpha = int(255 * (i / len(self.attractor_points)))
+                start = self.attractor_points[i]
+                end = self.attractor_points[i + 1]
                 
                 try:
                     pygame.draw.line(surface, color, 
-                                   self.attractor_points[i], 
-                                   self.attractor_points[i + 1], 2)
+                                   (start[0] * s, start[1] * s), 
+                                   (end[0] * s, end[1] * s), width)
                 except:
                     pass
     
@@ -264,6 +434,7 @@ class ChaosEffect:
         if depth <= 0 or size < 5:
             return
         
+        s = self.draw_scale
         hue = (depth * 60 + self.time * 2) % 360
         color = self.hsv_to_rgb(hue, 0.8, 0.9)
         
@@ -276,7 +447,8 @@ class ChaosEffect:
             points.append((px, py))
         
         if len(points) == 3:
-            pygame.draw.polygon(surface, color, points, 2)
+            pygame.draw.polygon(surface, color, [(px * s, py * s) for px, py in points],
+                                self.line_width(2))
         
         # Recurse
         for px, py in points:
@@ -285,21 +457,25 @@ class ChaosEffect:
     
     def draw_lissajous(self, surface):
         """Draw Lissajous curves"""
+        s = self.draw_scale
         points = []
         for t in range(0, 360, 2):
             t_rad = math.radians(t)
             x = self.width / 2 + 150 * math.sin(self.lissajous_a * t_rad + self.lissajous_delta)
             y = self.height / 2 + 150 * math.sin(self.lissajous_b * t_rad)
-            points.append((x, y))
+            points.append((x * s, y * s))
         
+        width = self.line_width(3)
         if len(points) > 1:
             for i in range(len(points) - 1):
                 hue = (i * 2 + self.time) % 360
                 color = self.hsv_to_rgb(hue, 0.9, 0.7)
-                pygame.draw.line(surface, color, points[i], points[i + 1], 3)
+                pygame.draw.line(surface, color, points[i], points[i + 1], width)
     
     def draw_geometric_chaos(self, surface):
         """Draw chaotic geometric patterns"""
+        s = self.draw_scale
+        
         # Rotating squares/diamonds
         center_x = self.width / 2
         center_y = self.height / 2
@@ -323,12 +499,14 @@ class ChaosEffect:
                 corner_angle = rotation + j * math.pi / 2
                 px = x + math.cos(corner_angle) * size
                 py = y + math.sin(corner_angle) * size
-                points.append((px, py))
+                points.append((px * s, py * s))
             
-            pygame.draw.polygon(surface, color, points, 2)
+            pygame.draw.polygon(surface, color, points, self.line_width(2))
     
     def draw_kaleidoscope(self, surface):
         """Draw kaleidoscope effect"""
+        s = self.draw_scale
+        
         # This is just adding some radial symmetry overlays
         center_x = self.width / 2
         center_y = self.height / 2
@@ -344,10 +522,9 @@ class ChaosEffect:
             hue = (seg * (360 / self.kaleidoscope_segments) + self.time * 2) % 360
             color = self.hsv_to_rgb(hue, 0.8, 0.6)
             
-            pygame.draw.line(surface, color, (center_x, center_y), 
-                           (end_x, end_y), 4)
+            pygame.draw.line(surface, color, (center_x * s, center_y * s), 
+                           (end_x * s, end_y * s), self.line_width(4))
             
             # Draw circles at endpoints
-            pygame.draw.circle(surface, color, (int(end_x), int(end_y)), 
-                             int(10 + 5 * math.sin(self.time * 0.1)))
-
+            pygame.draw.circle(surface, color, (int(end_x * s), int(end_y * s)), 
+                             int((10 + 5 * math.sin(self.time * 0.1)) * s))
@@ -6,13 +6,24 @@ Pure computational art and chaos theory visualization
 Run this to experience the full glory of mathematical chaos!
 """
 
+import json
+import os
+import random
+import time
 import pygame
 import sys
 from chaos_effect import ChaosEffect
+from text_cache import TextCache
 
 
 class ChaosViewer:
-    def __init__(self, width=1200, height=800, fullscreen=False):
+    def __init__(self, width=1200, height=800, fullscreen=False, fps=60, seed=None, headless=False,
+                 particle_mode='classic', swarm_size=2000, neighbor_radius=40, cell_size=None,
+                 voronoi_mode='classic', voronoi_seeds=256, voronoi_resolution=4, voronoi_edges=False):
+        # Headless: render with the SDL dummy video driver (no window)
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            fullscreen = False
         pygame.init()
         
         self.width = width
@@ -29,15 +40,21 @@ class ChaosViewer:
         pygame.display.set_caption("CHAOS")
         
         # Initialize chaos effect
-        self.chaos = ChaosEffect(self.width, self.height)
+        self.chaos_seed = seed if seed is not None else random.getrandbits(32)
+        self.chaos = ChaosEffect(self.width, self.height, seed=self.chaos_seed, particle_mode=particle_mode,
+                                 swarm_size=swarm_size, neighbor_radius=neighbor_radius, cell_size=cell_size,
+                                 voronoi_mode=voronoi_mode, voronoi_seeds=voronoi_seeds,
+                                 voronoi_resolution=voronoi_resolution, voronoi_edges=voronoi_edges)
         
-        # Clock for FPS
+        # Clock for FPS (animation speed is independent of the target frame rate)
         self.clock = pygame.time.Clock()
+        self.target_fps = fps
         self.running = True
         
         # UI settings
         self.show_fps = False
         self.show_info = False
+        self.text_cache = TextCache()  # Fonts, rendered overlay text and number glyphs
     
     def handle_events(self):
         """Handle keyboard and window events"""
@@ -70,6 +87,17 @@ class ChaosViewer:
                     self.chaos.spawn_particles(50)
                     print("✨ Spawned 50 particles!")
                 
+                # B to toggle the boids swarm
+                elif event.key == pygame.K_b:
+                    mode = 'classic' if self.chaos.particle_mode == 'boids' else 'boids'
+                    self.chaos.set_particle_mode(mode)
+                    print(f"🐦 Particle mode: {mode} ({self.chaos.particle_count()} particles)")
+                
+                # E to toggle Voronoi edge highlighting (jump-flooding Voronoi only)
+                elif event.key == pygame.K_e and self.chaos.voronoi:
+                    self.chaos.voronoi.edges = not self.chaos.voronoi.edges
+                    print(f"🪟 Voronoi edges: {'ON' if self.chaos.voronoi.edges else 'OFF'}")
+                
                 # Numbers 1-9 to change kaleidoscope segments
                 elif pygame.K_1 <= event.key <= pygame.K_9:
                     segments = event.key - pygame.K_0
@@ -78,17 +106,15 @@ class ChaosViewer:
     
     def draw_ui(self):
         """Draw UI overlay"""
-        font = pygame.font.Font(None, 28)
-        
         if self.show_fps:
             fps = self.clock.get_fps()
-            fps_text = font.render(f"FPS: {fps:.1f}", True, (0, 255, 255))
-            self.screen.blit(fps_text, (10, 10))
+            self.text_cache.draw(self.screen, f"FPS: {fps:.1f}", (10, 10), (0, 255, 255), 28)
         
         if self.show_info:
             info_lines = [
-                f"Particles: {len(self.chaos.particles)}",
+                f"Particles: {self.chaos.particle_count()} ({self.chaos.particle_mode})",
                 f"Attractor Points: {len(self.chaos.attractor_points)}",
+                f"Voronoi: {self.chaos.voronoi.seed_count if self.chaos.voronoi else len(self.chaos.voronoi_points)} seeds ({self.chaos.voronoi_mode})",
                 f"Kaleidoscope: {self.chaos.kaleidoscope_segments} segments",
                 f"Fractal Depth: {self.chaos.fractal_depth}",
                 "",
@@ -98,24 +124,90 @@ class ChaosViewer:
                 "  I: Toggle Info",
                 "  R: Regenerate Voronoi",
                 "  SPACE: Spawn Particles",
+                "  B: Toggle Boids Swarm",
+                "  E: Toggle Voronoi Edges (jfa)",
                 "  1-9: Kaleidoscope Segments"
             ]
             
             y_offset = 40
             for line in info_lines:
-                text = font.render(line, True, (0, 255, 255))
-                self.screen.blit(text, (10, y_offset))
+                self.text_cache.draw(self.screen, line, (10, y_offset), (0, 255, 255), 28)
                 y_offset += 25
     
-    def run(self):
-        """Main application loop"""
+    def start_profile(self, profile_path):
+        """cProfile profiler already collecting, or None without a path"""
+        if not profile_path:
+            return None
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    
+    def stop_profile(self, profiler, profile_path):
+        """Write the pstats dump of a start_profile() run"""
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            print(f"Profile written to {profile_path}", file=sys.stderr)
+    
+    def bench(self, frames, profile_path=None):
+        """Run update+draw frames as fast as possible and return timing stats"""
+        profiler = self.start_profile(profile_path)
+        
+        frame_times = []
+        update_total = 0.0
+        layer_totals = {}
+        layer_counts = {}
+        particle_counts = []
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame_start = time.perf_counter()
+            self.chaos.update()
+            update_total += (time.perf_counter() - frame_start) * 1000
+            self.screen.fill((0, 0, 0))
+            self.chaos.draw(self.screen)
+            frame_times.append((time.perf_counter() - frame_start) * 1000)
+            for name, ms in self.chaos.layer_times.items():
+                layer_totals[name] = layer_totals.get(name, 0.0) + ms
+                layer_counts[name] = layer_counts.get(name, 0) + 1
+            particle_counts.append(self.chaos.particle_count())
+        total = time.perf_counter() - start
+        self.stop_profile(profiler, profile_path)
+        
+        ordered = sorted(frame_times) or [0.0]
+        return {
+            'frames': frames,
+            'size': [self.width, self.height],
+            'seed': self.chaos_seed,
+            'fps': round(frames / total, 2) if total else 0.0,
+            'frame_mean_ms': round(sum(ordered) / len(ordered), 3),
+            'frame_p95_ms': round(ordered[int(len(ordered) * 0.95)], 3),
+            'frame_max_ms': round(ordered[-1], 3),
+            'update_mean_ms': round(update_total / max(1, frames), 3),
+            # Mean over the frames the layer was drawn (kaleidoscope alternates)
+            'layers_mean_ms': {name: round(layer_totals[name] / layer_counts[name], 3)
+                               for name in layer_totals},
+            'particles': {
+                'min': min(particle_counts, default=0),
+                'mean': round(sum(particle_counts) / max(1, len(particle_counts)), 1),
+                'max': max(particle_counts, default=0),
+                'final': self.chaos.particle_count(),
+                'mode': self.chaos.particle_mode
+            },
+            'attractor_points': len(self.chaos.attractor_points),
+            'voronoi': self.chaos.voronoi.stats() if self.chaos.voronoi else {
+                'seeds': len(self.chaos.voronoi_points), 'mode': 'classic'}
+        }
+    
+    def run(self, profile_path=None):
+        """Main application loop (profiled until quit, Ctrl+C included, with a profile path)"""
         print("\n" + "=" * 60)
         print("🌀✨💫 CHAOS EFFECT - MATHEMATICAL MADNESS 💫✨🌀")
         print("=" * 60)
         print("\nA celebration of computational beauty and chaos theory")
         print("\nFeaturing:")
         print("  • Voronoi Diagrams")
-        print("  • Particle Systems with Physics")
+        print("  • Particle Systems with Physics (or a flocking boids swarm)")
         print("  • Lorenz Strange Attractor")
         print("  • Recursive Fractals")
         print("  • Lissajous Curves")
@@ -127,29 +219,35 @@ class ChaosViewer:
         print("  I: Toggle info overlay")
         print("  R: Regenerate Voronoi points")
         print("  SPACE: Spawn 50 particles")
+        print("  B: Toggle boids swarm")
+        print("  E: Toggle Voronoi edges (--voronoi jfa)")
         print("  1-9: Change kaleidoscope segments")
         print("\n" + "=" * 60 + "\n")
         
-        while self.running:
-            self.handle_events()
-            
-            # Update chaos effect
-            self.chaos.update()
-            
-            # Clear screen with black
-            self.screen.fill((0, 0, 0))
-            
-            # Draw chaos effect
-            self.chaos.draw(self.screen)
-            
-            # Draw UI overlay
-            self.draw_ui()
-            
-            # Update display
-            pygame.display.flip()
-            
-            # Maintain 60 FPS
-            self.clock.tick(60)
+        profiler = self.start_profile(profile_path)
+        try:
+            while self.running:
+                elapsed = self.clock.tick(self.target_fps) / 1000.0
+                self.handle_events()
+                
+                # Update chaos effect in fixed steps
+                self.chaos.advance(elapsed)
+                
+                # Clear screen with black
+                self.screen.fill((0, 0, 0))
+                
+                # Draw chaos effect
+                self.chaos.draw(self.screen)
+                
+                # Draw UI overlay
+                self.draw_ui()
+                
+                # Update display
+                pygame.display.flip()
+        except KeyboardInterrupt:
+            pass  # Headless runs have no window to quit from
+        finally:
+            self.stop_profile(profiler, profile_path)
         
         pygame.quit()
         print("\n🌀 Chaos viewer closed. Reality restored. 🌀\n")
@@ -157,6 +255,7 @@ class ChaosViewer:
 
 if __name__ == "__main__":
     import argparse
+    from pngtuber import parse_viewport_size, viewport_size_argument
     
     parser = argparse.ArgumentParser(description='Chaos')
     parser.add_argument('--width', type=int, default=1200,
@@ -165,12 +264,56 @@ if __name__ == "__main__":
                        help='Window height (default: 800)')
     parser.add_argument('--fullscreen', action='store_true',
                        help='Run in fullscreen mode')
+    parser.add_argument('--fps', type=int, default=60,
+                       help='Target frame rate (default: 60)')
+    parser.add_argument('--size', metavar='WxH', type=viewport_size_argument, default=None,
+                       help='Window size, e.g. 1920x1080, 64 to 8192 pixels each (overrides --width/--height)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for a reproducible run')
+    parser.add_argument('--headless', action='store_true',
+                       help='Render without a window (SDL dummy video driver)')
+    parser.add_argument('--bench', type=int, metavar='N', default=None,
+                       help='Run N update+draw frames with no frame limiter and print timings as JSON')
+    parser.add_argument('--profile', metavar='FILE', default=None,
+                       help='Write a cProfile/pstats dump of the run (the --bench frames, or until quit)')
+    parser.add_argument('--particles', choices=ChaosEffect.particle_modes, default='classic',
+                       help='Particle mode: classic particles or a flocking boids swarm (default: classic)')
+    parser.add_argument('--swarm-size', type=int, default=2000,
+                       help='Number of boids in boids mode (default: 2000)')
+    parser.add_argument('--neighbor-radius', type=float, default=40,
+                       help='Boids neighbor radius in pixels (default: 40)')
+    parser.add_argument('--cell-size', type=float, default=None,
+                       help='Spatial hash cell size in pixels (default: the neighbor radius)')
+    parser.add_argument('--voronoi', choices=ChaosEffect.voronoi_modes, default='classic',
+                       help='Voronoi mode: classic 12 points or jump-flooding with many seeds (default: classic)')
+    parser.add_argument('--voronoi-seeds', type=int, default=256,
+                       help='Number of Voronoi seeds in jfa mode (default: 256)')
+    parser.add_argument('--voronoi-resolution', type=int, default=4,
+                       help='Pixels per Voronoi grid cell in jfa mode, 1 = full resolution (default: 4)')
+    parser.add_argument('--voronoi-edges', action='store_true',
+                       help='Highlight the borders between Voronoi cells (jfa mode)')
     
     args = parser.parse_args()
     
+    width, height = args.size or (args.width, args.height)
+    if parse_viewport_size((width, height)) is None:
+        parser.error(f"--width and --height must be 64 to 8192 pixels each (got {width}x{height})")
+    if args.bench is not None and args.bench < 1:
+        parser.error(f"--bench needs at least 1 frame (got {args.bench})")
+    
     try:
-        viewer = ChaosViewer(width=args.width, height=args.height, fullscreen=args.fullscreen)
-        viewer.run()
+        viewer = ChaosViewer(width=width, height=height, fullscreen=args.fullscreen, fps=args.fps,
+                             seed=args.seed, headless=args.headless, particle_mode=args.particles,
+                             swarm_size=args.swarm_size, neighbor_radius=args.neighbor_radius,
+                             cell_size=args.cell_size, voronoi_mode=args.voronoi,
+                             voronoi_seeds=args.voronoi_seeds, voronoi_resolution=args.voronoi_resolution,
+                             voronoi_edges=args.voronoi_edges)
+        if args.bench is not None:
+            stats = viewer.bench(args.bench, profile_path=args.profile)
+            pygame.quit()
+            print(json.dumps(stats, indent=2))
+        else:
+            viewer.run(profile_path=args.profile)
     except Exception as e:
         print(f"Error: {e}")
         import traceback
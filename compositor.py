@@ -0,0 +1,237 @@
+"""
+COMPOSITOR - Layered scene rendering with per-layer caching
+Each layer reports a cache key describing everything it draws from;
+an unchanged key means the layer's cached pixels can be reused.
+
+Runs of unchanged layers at the bottom of the stack are flattened into
+one cached surface, so an idle scene costs a single blit per frame.
+
+Layers with low-frequency content can render at a reduced internal
+resolution (render scale 0.5 or 0.25) and are upscaled when composited.
+
+The same layers also draw with the SDL2 renderer (texture_backend): a
+layer's render_textures draws with textures directly, or returns False to
+be drawn into a surface by render and uploaded.
+"""
+
+import time
+
+import pygame
+
+
+class Layer:
+    name = 'layer'
+    # Keep a standalone cached surface when unchanged above a dynamic layer
+    # (off for layers whose direct draw is already as cheap as a blit)
+    cache_standalone = True
+    # Layer covers every pixel of its target (upscale straight into it, no blend)
+    opaque = False
+    # Upscale filter for reduced-resolution rendering (False = nearest neighbour)
+    smooth = True
+
+    def __init__(self, render_scale=1.0):
+        self.surface = None  # Cached pixels (when rendered standalone)
+        self.surface_pos = (0, 0)
+        self.cached_key = None
+
+        # Internal resolution as a fraction of the target (1.0, 0.5, 0.25)
+        self.render_scale = render_scale
+        self.lowres = None  # Reduced-resolution render target
+        self.upscaled = None  # Full-size copy for non-opaque layers
+        self.pixels_filled = 0  # Pixels rasterized by the last draw
+
+        # Texture backend: surface drawn by render and the texture it was uploaded to
+        self.texture_surface = None
+        self.texture = None
+        self.texture_key = None
+
+        # Stats
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+        self.frames = 0
+        self.hits = 0
+        self.misses = 0
+
+    def visible(self, host):
+        """False when the layer has nothing to draw this frame"""
+        return True
+
+    def cache_key(self, host):
+        """Hashable description of this frame's content, or None if it changes every frame"""
+        return None
+
+    def render(self, host, target):
+        """Draw the layer onto target"""
+        raise NotImplementedError
+
+    def render_textures(self, host, textures):
+        """Draw straight with the texture backend; False to draw through render and a surface instead"""
+        return False
+
+    def scale_for(self, host):
+        """Render scale to use this frame (1.0 = native resolution)"""
+        return self.render_scale
+
+    def draw(self, host, target):
+        """Render onto target, through a smaller offscreen surface when the render scale is below 1"""
+        scale = self.scale_for(host)
+        width, height = target.get_size()
+        if scale >= 1.0:
+            self.pixels_filled = width * height
+            self.render(host, target)
+            return
+
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if self.lowres is None or self.lowres.get_size() != size:
+            self.lowres = pygame.Surface(size, target.get_flags() & pygame.SRCALPHA, target)
+        self.pixels_filled = size[0] * size[1]
+        self.render(host, self.lowres)
+
+        upscale = pygame.transform.smoothscale if self.smooth else pygame.transform.scale
+        if self.opaque and target.get_bitsize() == self.lowres.get_bitsize():
+            upscale(self.lowres, (width, height), target)
+        else:
+            if self.upscaled is None or self.upscaled.get_size() != (width, height):
+                self.upscaled = pygame.Surface((width, height), self.lowres.get_flags(), self.lowres)
+            upscale(self.lowres, (width, height), self.upscaled)
+            target.blit(self.upscaled, (0, 0))
+
+    def render_size(self, host):
+        """Size of the layer's own surface when cached standalone"""
+        return host.canvas.get_size()
+
+    def render_cached(self, host, target, key):
+        """Reuse or rebuild this layer's own surface, then blit it"""
+        if key is not None and key == self.cached_key and self.surface is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            size = self.render_size(host)
+            if self.surface is None or self.surface.get_size() != size:
+                self.surface = pygame.Surface(size, pygame.SRCALPHA)
+            self.surface.fill((0, 0, 0, 0))
+            self.draw(host, self.surface)
+            self.cached_key = key
+        target.blit(self.surface, self.surface_pos)
+
+    def invalidate(self):
+        """Drop cached pixels (e.g. after a resize)"""
+        self.surface = None
+        self.cached_key = None
+        self.lowres = None
+        self.upscaled = None
+        self.texture_surface = None
+        self.texture = None
+        self.texture_key = None
+
+    def record_time(self, ms):
+        self.last_ms = ms
+        self.total_ms += ms
+        self.frames += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'last_ms': round(self.last_ms, 3),
+            'mean_ms': round(self.total_ms / self.frames, 3) if self.frames else 0.0,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'render_scale': self.render_scale,
+            'pixels_filled': self.pixels_filled
+        }
+
+
+class Compositor:
+    def __init__(self, layers):
+        self.layers = layers
+
+        # Flattened surface for the run of unchanged layers at the bottom of the stack
+        self.base = None
+        self.base_keys = None
+        self.base_layers = 0
+        self.base_hits = 0
+        self.base_misses = 0
+
+        self.stage_times = {}
+        self.alloc_tracker = None  # Optional AllocationTracker, marked after every layer
+
+    def compose(self, host, canvas):
+        """Draw all visible layers onto canvas, reusing whatever hasn't changed"""
+        self.stage_times = {}
+        layers = [layer for layer in self.layers if layer.visible(host)]
+        keys = [layer.cache_key(host) for layer in layers]
+
+        # Leading run of cacheable layers gets flattened into one surface
+        run = 0
+        while run < len(layers) and keys[run] is not None:
+            run += 1
+
+        index = 0
+        if run:
+            start = time.perf_counter()
+            base_keys = tuple(keys[:run])
+            if self.base is not None and base_keys == self.base_keys \
+                    and self.base.get_size() == canvas.get_size():
+                self.base_hits += 1
+                for layer in layers[:run]:
+                    layer.hits += 1
+                    layer.record_time(0.0)
+            else:
+                self.base_misses += 1
+                if self.base is None or self.base.get_size() != canvas.get_size():
+                    self.base = canvas.copy()
+                for layer in layers[:run]:
+                    layer_start = time.perf_counter()
+                    layer.misses += 1
+                    layer.draw(host, self.base)
+                    layer.record_time((time.perf_counter() - layer_start) * 1000)
+                    self.stage_times[layer.name] = layer.last_ms
+                    if self.alloc_tracker:
+                        self.alloc_tracker.mark(layer.name)
+                self.base_keys = base_keys
+            self.blit_base(canvas)
+            self.base_layers = run
+            self.stage_times['base'] = (time.perf_counter() - start) * 1000
+            if self.alloc_tracker:
+                self.alloc_tracker.mark('base')
+            index = run
+        else:
+            self.base_layers = 0
+
+        # Everything above the flattened run
+        for layer, key in zip(layers[index:], keys[index:]):
+            start = time.perf_counter()
+            if key is None or not layer.cache_standalone:
+                layer.misses += 1
+                layer.draw(host, canvas)
+            else:
+                layer.render_cached(host, canvas, key)
+            layer.record_time((time.perf_counter() - start) * 1000)
+            self.stage_times[layer.name] = layer.last_ms
+            if self.alloc_tracker:
+                self.alloc_tracker.mark(layer.name)
+
+    def blit_base(self, canvas):
+        """Copy the flattened base onto the canvas (an exact copy, alpha included)"""
+        if canvas.get_flags() & pygame.SRCALPHA:
+            canvas.fill((0, 0, 0, 0))
+            canvas.blit(self.base, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        else:
+            canvas.blit(self.base, (0, 0))
+
+    def invalidate(self):
+        """Drop every cached surface (e.g. after a resize)"""
+        self.base = None
+        self.base_keys = None
+        for layer in self.layers:
+            layer.invalidate()
+
+    def stats(self):
+        """Per-layer cost and cache hit rate"""
+        lookups = self.base_hits + self.base_misses
+        return {
+            'base': {
+                'layers': self.base_layers,
+                'hit_rate': round(self.base_hits / lookups, 3) if lookups else 0.0
+            },
+            'layers': {layer.name: layer.stats() for layer in self.layers}
+        }
@@ -0,0 +1,122 @@
+"""
+CONFIG STORE - Debounced, atomic config persistence
+Keeps settings in memory and writes them from a background thread
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+class ConfigStore:
+    def __init__(self, path, defaults=None, debounce=0.5, persist=True):
+        self.path = Path(path)
+        self.debounce = debounce  # Seconds to merge rapid changes before writing
+        self.persist = persist  # False keeps changes in memory only (e.g. session replay)
+
+        self.data = dict(defaults or {})
+        self.data.update(self.read())
+
+        self.lock = threading.Lock()  # Guards data / dirty state
+        self.write_lock = threading.Lock()  # Serializes writes to disk
+        self.dirty = False
+        self.last_change = 0.0
+        self.writes = 0
+
+        self.wake = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self.writer_loop, name="config-writer", daemon=True)
+        self.thread.start()
+
+    def read(self):
+        """Read config from disk (empty dict if missing or unreadable)"""
+        try:
+            if self.path.exists():
+                with open(self.path, 'r') as f:
+                    config = json.load(f)
+                    print(f"Loaded config from {self.path}")
+                    return config
+        except Exception as e:
+            print(f"Could not load config: {e}")
+        return {}
+
+    def get(self, key, default=None):
+        """Get a config value"""
+        with self.lock:
+            return self.data.get(key, default)
+
+    def snapshot(self):
+        """Get a copy of the whole config"""
+        with self.lock:
+            return json.loads(json.dumps(self.data))
+
+    def update(self, changes):
+        """Merge changes into memory and schedule a write (never blocks on disk)"""
+        with self.lock:
+            changed = False
+            for key, value in changes.items():
+                if self.data.get(key, object()) != value:
+                    self.data[key] = value
+                    changed = True
+            if not changed:
+                return
+            self.dirty = True
+            self.last_change = time.monotonic()
+        self.wake.set()
+
+    def writer_loop(self):
+        """Background thread: wait for changes to settle, then write them"""
+        while not self.closed:
+            self.wake.wait()
+            self.wake.clear()
+
+            # Keep waiting while changes are still arriving
+            while not self.closed:
+                with self.lock:
+                    remaining = self.last_change + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(remaining)
+
+            if not self.closed:
+                self.flush()
+
+    def flush(self):
+        """Write pending changes to disk now (write-to-temp + atomic rename)"""
+        if not self.persist:
+            return
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                config = json.loads(json.dumps(self.data))
+                self.dirty = False
+
+            tmp_path = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp",
+                                                dir=str(self.path.parent))
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(config, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                self.writes += 1
+            except Exception as e:
+                print(f"Could not save config: {e}")
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                # Leave it dirty so the next flush retries
+                with self.lock:
+                    self.dirty = True
+
+    def close(self):
+        """Stop the writer thread and flush anything pending"""
+        self.closed = True
+        self.wake.set()
+        self.thread.join(timeout=2.0)
+        self.flush()
@@ -0,0 +1,176 @@
+"""
+CONTROL SERVER - Local JSON-lines control socket
+Lets stream decks and scripts drive the avatar without blocking rendering
+
+Protocol: one JSON object per line over TCP (localhost only by default)
+    {"cmd": "change_background", "args": [9], "id": 1}
+    -> {"id": 1, "ok": true, "frame": 1234, "latency_ms": 9.8}
+
+    {"cmd": "subscribe"}
+    -> {"ok": true, "subscribed": true}
+    -> {"stats": {"frame": 1235, "fps": 59.9, "stages": {...}, "audio_level": 412.0}}
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+
+
+class ControlCommand:
+    __slots__ = ('name', 'args', 'kwargs', 'request_id', 'writer', 'received', 'result')
+
+    def __init__(self, name, args, kwargs, request_id, writer):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.request_id = request_id
+        self.writer = writer
+        self.received = time.perf_counter()
+        self.result = None
+
+
+class ControlServer:
+    # Per-subscriber output buffer limit; stats are dropped for slow readers
+    max_subscriber_buffer = 256 * 1024
+
+    def __init__(self, host='127.0.0.1', port=8765):
+        self.host = host
+        self.port = port
+
+        # Commands flow socket thread -> render thread through this queue
+        self.commands = queue.SimpleQueue()
+        self.subscribers = set()
+
+        self.loop = None
+        self.server = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run_loop, name="control-server", daemon=True)
+
+        # Latency stats (command received -> frame containing it presented)
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.commands_handled = 0
+
+    def start(self):
+        """Start the server thread and wait until it is listening"""
+        self.thread.start()
+        self.ready.wait(timeout=5.0)
+        return self.server is not None
+
+    def run_loop(self):
+        """Server thread: run an asyncio loop with the TCP server"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self.handle_client, self.host, self.port))
+            print(f"🎛️ Control server listening on {self.host}:{self.port}")
+        except Exception as e:
+            print(f"Warning: Could not start control server: {e}")
+            self.server = None
+            self.ready.set()
+            return
+
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    async def handle_client(self, reader, writer):
+        """Read JSON-lines commands from one client"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    message = json.loads(line)
+                    name = message['cmd']
+                except Exception as e:
+                    self.send(writer, {'ok': False, 'error': f"bad request: {e}"})
+                    continue
+
+                request_id = message.get('id')
+                if name == 'subscribe':
+                    self.subscribers.add(writer)
+                    self.send(writer, {'id': request_id, 'ok': True, 'subscribed': True})
+                elif name == 'unsubscribe':
+                    self.subscribers.discard(writer)
+                    self.send(writer, {'id': request_id, 'ok': True, 'subscribed': False})
+                elif name == 'ping':
+                    self.send(writer, {'id': request_id, 'ok': True, 'pong': True})
+                else:
+                    self.commands.put(ControlCommand(name, message.get('args', []),
+                                                     message.get('kwargs', {}), request_id, writer))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+    def send(self, writer, payload):
+        """Write one JSON line to a client (server thread only)"""
+        if writer.is_closing():
+            return
+        writer.write((json.dumps(payload) + "\n").encode())
+
+    def drain(self):
+        """Pop all pending commands without blocking (render thread)"""
+        commands = []
+        while True:
+            try:
+                commands.append(self.commands.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def frame_done(self, frame, commands, stats):
+        """Report a presented frame: answer its commands and stream stats to subscribers
+        (stats is called for the stats dict only when someone is subscribed)"""
+        if self.loop is None or self.loop.is_closed():
+            return
+
+        now = time.perf_counter()
+        replies = []
+        for command in commands:
+            latency_ms = (now - command.received) * 1000
+            self.last_latency_ms = latency_ms
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            self.commands_handled += 1
+            reply = {'id': command.request_id, 'ok': command.result is None,
+                     'frame': frame, 'latency_ms': round(latency_ms, 3)}
+            if command.result is not None:
+                reply['error'] = command.result
+            replies.append((command.writer, reply))
+
+        stats_line = None
+        if self.subscribers:
+            stats_line = {'stats': stats()}
+
+        if replies or stats_line:
+            self.loop.call_soon_threadsafe(self.flush_frame, replies, stats_line)
+
+    def flush_frame(self, replies, stats_line):
+        """Send queued replies and stats (server thread)"""
+        for writer, reply in replies:
+            self.send(writer, reply)
+        if stats_line:
+            for writer in list(self.subscribers):
+                if writer.transport.get_write_buffer_size() > self.max_subscriber_buffer:
+                    continue  # Slow reader - drop this frame's stats
+                self.send(writer, stats_line)
+
+    def stop(self):
+        """Shut down the server thread"""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread.is_alive():
+            self.thread.join(timeout=2.0)
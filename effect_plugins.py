@@ -0,0 +1,258 @@
+"""
+EFFECT PLUGINS - Stackable effects loaded from the plugins folder
+Every effect is an EffectPlugin subclass in a .py file under plugins/ (or a
+folder listed in the config's "effects": {"plugin_dirs": [...]}). Its slot is
+the E+N hotkey that toggles it, and several effects can run at once.
+
+The host calls, for each active plugin:
+  init()          when it is switched on (reset state)
+  update(dt)      once per fixed simulation step (dt = 1/60 s)
+  draw(target)    'overlay' plugins draw onto the scene above the character;
+                  'character' plugins get the posed sprite and return the filtered one
+  draw_textures(textures)
+                  optional, 'overlay' plugins with the texture renderer: draw with
+                  textures (texture_backend) and return True, or return False to be
+                  drawn with draw() into a surface that is uploaded
+  resize(w, h)    when the viewport changes (inactive plugins too)
+  stop()          when it is switched off
+  stats()         extra numbers for the control-server stats
+  status()        short text for the UI overlay
+
+The EffectStack times every update and draw. A plugin that spends more than its
+budget_ms per frame for grace_frames frames in a row is reported, or switched
+off when the policy is 'disable' (config "effects": {"over_budget": ...}).
+budget_ms is measured at budget_size (benchmarks.py effects) and scaled up by
+area for larger viewports.
+ChaosEffect implements the same interface and is attached while B+9 is on.
+"""
+
+import importlib.util
+import inspect
+import time
+from pathlib import Path
+
+
+class EffectPlugin:
+    name = 'effect'
+    title = 'Effect'  # Shown in the UI and console
+    slot = None  # E+N hotkey (None = not toggled from the keyboard, like the chaos background)
+    kind = 'overlay'  # 'overlay', 'character' or 'background'
+    budget_ms = 4.0  # Update + draw time allowed per frame
+    budget_size = (1920, 1080)  # Viewport budget_ms holds for (scaled up by area for larger ones)
+
+    def __init__(self, host=None):
+        self.host = host
+
+    def init(self):
+        """Reset state when the effect is switched on"""
+
+    def update(self, dt):
+        """Advance one fixed simulation step"""
+
+    def draw(self, target):
+        """Draw onto target (character plugins return the filtered sprite instead)"""
+        return target
+
+    def draw_textures(self, textures):
+        """Draw with the texture backend's renderer; False to be drawn with draw() into a surface instead"""
+        return False
+
+    def resize(self, width, height):
+        """The viewport changed size"""
+
+    def stop(self):
+        """Drop state when the effect is switched off"""
+
+    def close(self):
+        """Stop background work on exit"""
+
+    def status(self):
+        """Short text for the UI overlay"""
+        return self.title
+
+    def stats(self):
+        return {}
+
+
+def discover_plugins(folders):
+    """EffectPlugin subclasses defined in the .py files of folders, in file order"""
+    plugins = []
+    for folder in folders:
+        for path in sorted(Path(folder).glob("*.py")):
+            if path.name.startswith('_'):
+                continue
+            try:
+                spec = importlib.util.spec_from_file_location(f"effect_plugin_{path.stem}", path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            except Exception as e:
+                print(f"Warning: Could not load effect plugin {path.name}: {e}")
+                continue
+            for _, cls in inspect.getmembers(module, inspect.isclass):
+                if issubclass(cls, EffectPlugin) and cls is not EffectPlugin and cls.__module__ == module.__name__:
+                    plugins.append(cls)
+    return plugins
+
+
+class PluginTimes:
+    __slots__ = ('update_ms', 'draw_ms', 'frame_ms', 'total_ms', 'frames', 'over_frames', 'over_total',
+                 'warnings')
+
+    def __init__(self):
+        self.update_ms = 0.0  # This frame so far
+        self.draw_ms = 0.0
+        self.frame_ms = 0.0  # Last finished frame
+        self.total_ms = 0.0
+        self.frames = 0
+        self.over_frames = 0  # Over budget this many frames in a row
+        self.over_total = 0
+        self.warnings = 0
+
+
+class EffectStack:
+    policies = ('warn', 'disable')
+
+    def __init__(self, host, plugin_classes, over_budget='warn', grace_frames=60, budgets_ms=None):
+        if over_budget not in self.policies:
+            print(f"Warning: Unknown over-budget policy {over_budget!r}, using 'warn'")
+            over_budget = 'warn'
+        self.host = host
+        self.over_budget = over_budget
+        self.grace_frames = grace_frames
+        self.budgets_ms = budgets_ms or {}  # Plugin name -> budget overriding the plugin's own
+
+        self.plugins = {}  # Slot -> plugin (first one found wins a slot)
+        for cls in plugin_classes:
+            if cls.slot is None:
+                print(f"Warning: Effect plugin {cls.__name__} has no slot")
+            elif cls.slot in self.plugins:
+                print(f"Warning: Effect plugin {cls.__name__} skipped: E+{cls.slot} is taken "
+                      f"by {self.plugins[cls.slot].name}")
+            else:
+                self.plugins[cls.slot] = cls(host)
+        self.active = []  # Update order: toggled effects by slot, then attached backgrounds
+        self.times = {}  # Plugin -> PluginTimes
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def is_active(self, plugin):
+        return plugin in self.active
+
+    def of_kind(self, kind):
+        return [plugin for plugin in self.active if plugin.kind == kind]
+
+    def slots(self):
+        """Slots of the active toggled effects"""
+        return [plugin.slot for plugin in self.active if plugin.slot is not None]
+
+    def budget(self, plugin):
+        """Configured budget as is, or the plugin's own scaled up for a viewport larger than budget_size"""
+        if plugin.name in self.budgets_ms:
+            return self.budgets_ms[plugin.name]
+        width, height = plugin.budget_size
+        area = self.host.width * self.host.height if self.host else 0
+        return plugin.budget_ms * max(1.0, area / (width * height))
+
+    def toggle(self, slot):
+        """Switch the effect in slot on or off; False if there is none"""
+        plugin = self.plugins.get(slot)
+        if plugin is None:
+            return False
+        if plugin in self.active:
+            print(f"Deactivating effect {slot} ({plugin.title})")
+            self.detach(plugin)
+        else:
+            print(f"Activating effect {slot} ({plugin.title})")
+            self.attach(plugin)
+        return True
+
+    def attach(self, plugin):
+        """Switch a plugin on (also used for the chaos background, which has no slot)"""
+        if plugin in self.active:
+            return
+        plugin.init()
+        self.active.append(plugin)
+        self.active.sort(key=lambda p: (p.slot is None, p.slot or 0))
+        self.times[plugin] = PluginTimes()
+
+    def detach(self, plugin):
+        if plugin not in self.active:
+            return
+        self.active.remove(plugin)
+        plugin.stop()
+
+    def update(self, dt):
+        """Step every active plugin once"""
+        for plugin in self.active:
+            start = time.perf_counter()
+            plugin.update(dt)
+            self.times[plugin].update_ms += (time.perf_counter() - start) * 1000
+
+    def draw(self, plugin, target):
+        """Draw one plugin, timed; returns what its draw returns"""
+        start = time.perf_counter()
+        result = plugin.draw(target)
+        times = self.times.get(plugin)
+        if times:
+            times.draw_ms += (time.perf_counter() - start) * 1000
+        return result
+
+    def draw_textures(self, plugin, textures):
+        """Draw one plugin with the texture backend, timed; False if it only draws on surfaces"""
+        start = time.perf_counter()
+        drawn = plugin.draw_textures(textures)
+        times = self.times.get(plugin)
+        if times and drawn:
+            times.draw_ms += (time.perf_counter() - start) * 1000
+        return drawn
+
+    def resize(self, width, height):
+        for plugin in self.plugins.values():
+            plugin.resize(width, height)
+
+    def end_frame(self):
+        """Close this frame's timings and act on plugins that keep going over budget"""
+        for plugin in list(self.active):
+            times = self.times[plugin]
+            times.frame_ms = times.update_ms + times.draw_ms
+            times.total_ms += times.frame_ms
+            times.frames += 1
+            times.update_ms = times.draw_ms = 0.0
+            budget = self.budget(plugin)
+            if times.frame_ms <= budget:
+                times.over_frames = 0
+                continue
+            times.over_frames += 1
+            times.over_total += 1
+            if times.over_frames != self.grace_frames:
+                continue
+            times.warnings += 1
+            mean_ms = times.total_ms / times.frames
+            if self.over_budget == 'disable':
+                print(f"Warning: Effect {plugin.name} over its {budget:g}ms budget for {self.grace_frames} "
+                      f"frames ({times.frame_ms:.1f}ms last, {mean_ms:.1f}ms mean) - switched off")
+                self.detach(plugin)
+            else:
+                print(f"Warning: Effect {plugin.name} over its {budget:g}ms budget for {self.grace_frames} "
+                      f"frames ({times.frame_ms:.1f}ms last, {mean_ms:.1f}ms mean)")
+
+    def close(self):
+        for plugin in self.plugins.values():
+            plugin.close()
+
+    def stats(self):
+        stats = {}
+        for plugin in [self.plugins[slot] for slot in sorted(self.plugins)] + self.of_kind('background'):
+            times = self.times.get(plugin)
+            entry = {
+                'slot': plugin.slot,
+                'active': plugin in self.active,
+                'budget_ms': self.budget(plugin),
+                'last_ms': round(times.frame_ms, 3) if times else 0.0,
+                'mean_ms': round(times.total_ms / times.frames, 3) if times and times.frames else 0.0,
+                'over_budget_frames': times.over_total if times else 0
+            }
+            entry.update(plugin.stats())
+            stats[plugin.name] = entry
+        return stats
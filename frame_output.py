@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+FRAME OUTPUT - Shared-memory frame ring for compositors
+Publishes each finished frame into a named POSIX shared-memory block so
+OBS plugins / scripts can read it without window capture.
+
+Layout (little endian):
+    global header (64 bytes):
+        magic 'KSAF', version, slot count, slot capacity (bytes),
+        width, height, latest frame number, closed flag
+    N slots, each:
+        slot header (64 bytes):
+            seq (odd while writing), frame number, publish time (ns),
+            width, height, stride, bytes per pixel, pixel format (4 chars,
+            memory byte order, e.g. 'BGRX'; 'A' = straight alpha,
+            'a' = premultiplied alpha)
+        pixels (slot capacity bytes, rows of `stride` bytes)
+
+Writers bump `seq` to odd, copy the pixels, then bump it back to even.
+Readers copy a slot and accept it only if `seq` was even and unchanged.
+"""
+
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+MAGIC = b'KSAF'
+VERSION = 1
+GLOBAL_HEADER = struct.Struct('<4sIIIIIQQ')
+SLOT_HEADER = struct.Struct('<QQQIIII4s')
+HEADER_SIZE = 64
+LATEST_OFFSET = 24  # Global header: latest frame number
+CLOSED_OFFSET = 32  # Global header: closed flag
+DEFAULT_NAME = 'kentroid_samurai_frames'
+
+
+def surface_pixel_format(surface):
+    """Describe a 32-bit surface's memory byte order as a 4-char code (e.g. b'BGRX')"""
+    masks = surface.get_masks()
+    shifts = surface.get_shifts()
+    order = ['X'] * 4
+    for channel, mask, shift in zip('RGBA', masks, shifts):
+        if mask:
+            order[shift // 8] = channel
+    if sys.byteorder == 'big':
+        order.reverse()
+    return ''.join(order).encode()
+
+
+def open_shared_memory(name, untrack=True):
+    """Attach to an existing block without letting this process unlink it on exit"""
+    if not untrack:
+        return shared_memory.SharedMemory(name=name)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: no track flag, unregister from the resource tracker instead
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class FrameWriter:
+    def __init__(self, name=DEFAULT_NAME, width=800, height=800, slots=3):
+        self.name = name
+        self.slot_count = slots
+        self.shm = None
+        self.frames_published = 0
+        self.last_publish_ms = 0.0
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """(Re)create the shared-memory ring for a new frame size"""
+        self.close()
+        self.width = width
+        self.height = height
+        self.slot_capacity = width * height * 4
+        self.slot_size = HEADER_SIZE + self.slot_capacity
+        total = HEADER_SIZE + self.slot_size * self.slot_count
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=total)
+        except FileExistsError:
+            # Stale block from a crashed run - replace it
+            stale = open_shared_memory(self.name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=total)
+
+        self.buf = np.ndarray((total,), dtype=np.uint8, buffer=self.shm.buf)
+        self.seqs = [0] * self.slot_count
+        GLOBAL_HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, self.slot_count,
+                                self.slot_capacity, width, height, 0, 0)
+        print(f"📡 Frame output: /dev/shm/{self.name} ({width}x{height}, {self.slot_count} slots)")
+
+    def publish(self, surface, frame_number, pixel_format=None):
+        """Copy a finished frame into the next ring slot (one memcpy, no Python-level copies)"""
+        start = time.perf_counter()
+        width, height = surface.get_size()
+        if (width, height) != (self.width, self.height):
+            self.resize(width, height)
+
+        bytes_per_pixel = surface.get_bytesize()
+        stride = surface.get_pitch()
+        nbytes = stride * height
+        if bytes_per_pixel != 4 or nbytes > self.slot_capacity:
+            return False
+
+        slot = frame_number % self.slot_count
+        offset = HEADER_SIZE + slot * self.slot_size
+
+        seq = self.seqs[slot] + 1  # Odd: write in progress
+        struct.pack_into('<Q', self.shm.buf, offset, seq)
+
+        # View the surface memory directly and copy it straight into the slot
+        view = surface.get_view('1')
+        src = np.asarray(view).view(np.uint8)
+        np.copyto(self.buf[offset + HEADER_SIZE:offset + HEADER_SIZE + nbytes], src.reshape(-1)[:nbytes])
+        del src, view  # Unlock the surface
+
+        seq += 1  # Even: slot is consistent
+        self.seqs[slot] = seq
+        SLOT_HEADER.pack_into(self.shm.buf, offset, seq, frame_number, time.time_ns(),
+                              width, height, stride, bytes_per_pixel,
+                              pixel_format or surface_pixel_format(surface))
+        struct.pack_into('<Q', self.shm.buf, LATEST_OFFSET, frame_number)
+
+        self.frames_published += 1
+        self.last_publish_ms = (time.perf_counter() - start) * 1000
+        return True
+
+    def close(self):
+        """Mark the ring closed (readers reattach) and unlink it"""
+        if self.shm is None:
+            return
+        struct.pack_into('<Q', self.shm.buf, CLOSED_OFFSET, 1)
+        del self.buf
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+
+
+class FrameReader:
+    def __init__(self, name=DEFAULT_NAME, untrack=True):
+        self.name = name
+        self.untrack = untrack  # False only when the writer lives in the same process
+        self.shm = None
+        self.last_frame = -1
+        self.torn_reads = 0
+        self.attach()
+
+    def attach(self):
+        """Attach to the writer's ring (re-attach after a resize)"""
+        if self.shm is not None:
+            self.shm.close()
+        self.shm = open_shared_memory(self.name, self.untrack)
+        magic, version, self.slot_count, self.slot_capacity, self.width, self.height, _, _ = \
+            GLOBAL_HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.name} is not a frame ring (magic={magic!r}, version={version})")
+        self.slot_size = HEADER_SIZE + self.slot_capacity
+
+    def latest_frame_number(self):
+        """Frame number of the most recently published frame"""
+        return struct.unpack_from('<Q', self.shm.buf, LATEST_OFFSET)[0]
+
+    def closed(self):
+        """True once the writer has resized or shut down this ring"""
+        return struct.unpack_from('<Q', self.shm.buf, CLOSED_OFFSET)[0] != 0
+
+    def read(self, frame_number=None):
+        """
+        Read a frame (latest by default) as (header dict, HxWx4 uint8 array).
+        Returns None if the slot was overwritten while reading.
+        """
+        if self.closed():
+            self.attach()
+        if frame_number is None:
+            frame_number = self.latest_frame_number()
+
+        offset = HEADER_SIZE + (frame_number % self.slot_count) * self.slot_size
+        seq, number, timestamp_ns, width, height, stride, bytes_per_pixel, pixel_format = \
+            SLOT_HEADER.unpack_from(self.shm.buf, offset)
+        if seq == 0:
+            return None  # Slot never written
+        if seq % 2 or number != frame_number:
+            self.torn_reads += 1
+            return None
+
+        start = offset + HEADER_SIZE
+        raw = np.frombuffer(self.shm.buf, dtype=np.uint8, count=stride * height, offset=start)
+        pixels = raw.reshape(height, stride)[:, :width * bytes_per_pixel].reshape(height, width, bytes_per_pixel).copy()
+        del raw
+
+        if struct.unpack_from('<Q', self.shm.buf, offset)[0] != seq:
+            self.torn_reads += 1
+            return None
+
+        self.last_frame = number
+        header = {
+            'frame': number,
+            'timestamp_ns': timestamp_ns,
+            'width': width,
+            'height': height,
+            'format': pixel_format.decode(),
+            'latency_ms': (time.time_ns() - timestamp_ns) / 1e6
+        }
+        return header, pixels
+
+    def wait_frame(self, timeout=1.0, poll=0.0005):
+        """Block until a frame newer than the last one read is available"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if self.closed():
+                self.attach()
+            if self.latest_frame_number() > self.last_frame:
+                result = self.read()
+                if result is not None:
+                    return result
+            time.sleep(poll)
+        return None
+
+    def close(self):
+        """Detach from the ring"""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+
+def check_ring(name, frames):
+    """Read frames from a live ring and report integrity and publish->read latency"""
+    reader = FrameReader(name)
+    latencies = []
+    skipped = 0
+    previous = None
+    for _ in range(frames):
+        result = reader.wait_frame()
+        if result is None:
+            print("No new frame within 1s")
+            break
+        header, pixels = result
+        if pixels.shape != (header['height'], header['width'], 4):
+            print(f"❌ Frame {header['frame']}: bad shape {pixels.shape}")
+        if previous is not None and header['frame'] != previous + 1:
+            skipped += header['frame'] - previous - 1
+        previous = header['frame']
+        latencies.append(header['latency_ms'])
+
+    if latencies:
+        latencies.sort()
+        print(f"Read {len(latencies)} frames ({reader.width}x{reader.height}, "
+              f"{header['format']}), skipped {skipped}, torn reads {reader.torn_reads}")
+        print(f"Publish->read latency: median {latencies[len(latencies) // 2]:.3f}ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)]:.3f}ms, max {latencies[-1]:.3f}ms")
+    reader.close()
+
+
+def self_test(frames=300, width=1920, height=1080):
+    """Publish synthetic frames and verify every pixel read back (no display needed)"""
+    import os
+    import threading
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+
+    pygame.init()
+    surface = pygame.Surface((width, height), 0, 32)
+    name = f"{DEFAULT_NAME}_selftest_{os.getpid()}"
+    writer = FrameWriter(name, width, height)
+    reader = FrameReader(name, untrack=False)
+
+    errors = []
+    latencies = []
+    done = threading.Event()
+
+    def read_loop():
+        while not done.is_set() or reader.latest_frame_number() > reader.last_frame:
+            result = reader.wait_frame(timeout=0.2)
+            if result is None:
+                continue
+            header, pixels = result
+            latencies.append(header['latency_ms'])
+            # Every pixel of frame n was filled with (n % 256, 255 - n % 256, 7)
+            n = header['frame'] % 256
+            expected = {'R': n, 'G': 255 - n, 'B': 7}
+            for index, channel in enumerate(header['format']):
+                if channel in expected and not (pixels[:, :, index] == expected[channel]).all():
+                    errors.append(header['frame'])
+                    break
+
+    thread = threading.Thread(target=read_loop)
+    thread.start()
+    for frame in range(1, frames + 1):
+        surface.fill((frame % 256, 255 - frame % 256, 7))
+        writer.publish(surface, frame)
+        time.sleep(1 / 120)
+    done.set()
+    thread.join()
+
+    writer.close()
+    reader.close()
+    latencies.sort()
+    print(f"Self-test: published {frames}, read {len(latencies)}, corrupt {len(errors)}, "
+          f"torn reads {reader.torn_reads}, publish cost {writer.last_publish_ms:.3f}ms")
+    if latencies:
+        print(f"Publish->read latency: median {latencies[len(latencies) // 2]:.3f}ms, "
+              f"max {latencies[-1]:.3f}ms")
+    return not errors and bool(latencies)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Shared-memory frame ring reader')
+    parser.add_argument('--name', default=DEFAULT_NAME,
+                       help=f'Shared-memory block name (default: {DEFAULT_NAME})')
+    parser.add_argument('--frames', type=int, default=300,
+                       help='Number of frames to read (default: 300)')
+    parser.add_argument('--self-test', action='store_true',
+                       help='Publish and verify synthetic frames without the avatar running')
+
+    args = parser.parse_args()
+
+    if args.self_test:
+        sys.exit(0 if self_test(args.frames) else 1)
+    check_ring(args.name, args.frames)
@@ -0,0 +1,205 @@
+"""
+JOB SCHEDULER - Expensive rebuild work spread over idle frame time
+Work that would otherwise land in one frame (scaling the character for a
+zoom, cover-fitting backgrounds, building the chaos background, warming the
+explosion and emoji caches) is queued as jobs. After each frame is drawn,
+run() steps jobs in the time left before the next frame, up to a millisecond
+budget, highest priority first.
+
+A job is a callable. If it returns a generator, each step between yields is
+one slice of work (keep slices well under the budget) and the generator's
+return value is the job's result. Work that spends its time in C code that
+releases the GIL (pygame smoothscale, NumPy) can be marked threaded instead:
+it runs whole on a worker thread while the render thread keeps drawing.
+
+When the render thread needs a job's result right away, finish() completes
+it on the spot (or waits for its thread), so what ends up on screen never
+depends on how much idle time there was.
+"""
+
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    def __init__(self, key, work, priority, threaded, sequence):
+        self.key = key
+        self.work = work
+        self.priority = priority  # Higher runs first
+        self.threaded = threaded  # Runs whole on a worker thread
+        self.sequence = sequence  # First come, first served within a priority
+        self.steps = None  # Generator once a cooperative job has started
+        self.future = None  # Worker thread result once a threaded job has started
+        self.result = None
+        self.work_ms = 0.0
+
+    def step(self):
+        """Run one slice; True once the job is done"""
+        start = time.perf_counter()
+        try:
+            if self.steps is None:
+                result = self.work()
+                if not inspect.isgenerator(result):
+                    self.result = result
+                    return True
+                self.steps = result
+            next(self.steps)
+            return False
+        except StopIteration as done:
+            self.result = done.value
+            return True
+        finally:
+            self.work_ms += (time.perf_counter() - start) * 1000
+
+
+class JobScheduler:
+    def __init__(self, budget_ms=4.0, threads=1):
+        self.budget_ms = budget_ms  # Most time run() takes per frame
+        self.threads = threads  # Worker threads for threaded jobs (0 = step them on the render thread)
+        self.jobs = {}  # key -> Job (queued or running)
+        self.executor = None
+        self.sequence = 0
+
+        # Stats
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.forced = 0  # Jobs finish() had to complete because their result was needed
+        self.last_ms = 0.0
+
+    def __contains__(self, key):
+        return key in self.jobs
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def submit(self, key, work, priority=0, threaded=False):
+        """Queue work under key (a job already queued under key keeps its place, at the higher priority)"""
+        job = self.jobs.get(key)
+        if job:
+            job.priority = max(job.priority, priority)
+            return job
+        self.sequence += 1
+        job = self.jobs[key] = Job(key, work, priority, threaded and self.threads > 0, self.sequence)
+        return job
+
+    def cancel(self, key):
+        """Drop a job (a threaded job already running finishes, but its result is ignored)"""
+        job = self.jobs.pop(key, None)
+        if job is None:
+            return False
+        if job.steps:
+            job.steps.close()
+        if job.future:
+            job.future.cancel()
+        self.cancelled += 1
+        return True
+
+    def cancel_group(self, group):
+        """Drop every job whose key is a tuple starting with group"""
+        for key in [key for key in self.jobs if isinstance(key, tuple) and key[0] == group]:
+            self.cancel(key)
+
+    def finish(self, key):
+        """Complete a job now and return its result (None if there is no such job or it failed)"""
+        job = self.jobs.get(key)
+        if job is None:
+            return None
+        self.forced += 1
+        if job.future:
+            return self.collect(job)
+        try:
+            while not job.step():
+                pass
+        except Exception as e:
+            return self.fail(job, e)
+        return self.complete(job)
+
+    def run(self, budget_ms=None):
+        """Step queued jobs until the budget (default budget_ms) is used up; returns ms spent"""
+        start = time.perf_counter()
+        budget_ms = self.budget_ms if budget_ms is None else min(budget_ms, self.budget_ms)
+        deadline = start + max(0.0, budget_ms) / 1000
+
+        # Collect threaded jobs that finished and keep the workers busy (cheap, whatever the budget)
+        running = 0
+        for job in list(self.jobs.values()):
+            if job.future:
+                if job.future.done():
+                    self.collect(job)
+                else:
+                    running += 1
+        for job in sorted(self.waiting(threaded=True), key=self.order)[:max(0, self.threads - running)]:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="jobs")
+            job.future = self.executor.submit(self.run_threaded, job)
+
+        # Cooperative jobs, one slice at a time, highest priority first
+        while time.perf_counter() < deadline:
+            jobs = self.waiting(threaded=False)
+            if not jobs:
+                break
+            job = min(jobs, key=self.order)
+            try:
+                if job.step():
+                    self.complete(job)
+            except Exception as e:
+                self.fail(job, e)
+
+        self.last_ms = (time.perf_counter() - start) * 1000
+        return self.last_ms
+
+    def waiting(self, threaded):
+        """Jobs not handed to a worker yet"""
+        return [job for job in self.jobs.values() if job.threaded == threaded and not job.future]
+
+    def order(self, job):
+        return (-job.priority, job.sequence)
+
+    def run_threaded(self, job):
+        """Worker thread: run the whole job"""
+        while not job.step():
+            pass
+        return job.result
+
+    def collect(self, job):
+        """Result of a threaded job (waits for it if it is still running)"""
+        try:
+            job.future.result()
+        except Exception as e:
+            return self.fail(job, e)
+        return self.complete(job)
+
+    def complete(self, job):
+        if self.jobs.get(job.key) is job:
+            del self.jobs[job.key]
+        self.completed += 1
+        return job.result
+
+    def fail(self, job, error):
+        print(f"Warning: Background job {job.key} failed: {error}")
+        if self.jobs.get(job.key) is job:
+            del self.jobs[job.key]
+        self.failed += 1
+        return None
+
+    def close(self):
+        """Drop queued jobs and wait for running threads"""
+        for key in list(self.jobs):
+            self.cancel(key)
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def stats(self):
+        return {
+            'queued': len(self.jobs),
+            'threads_busy': sum(1 for job in self.jobs.values() if job.future and not job.future.done()),
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'failed': self.failed,
+            'forced': self.forced,
+            'last_ms': round(self.last_ms, 3),
+            'budget_ms': self.budget_ms
+        }
@@ -0,0 +1,78 @@
+"""
+MIPMAPS - Halving pyramid of the character image for zoom transitions
+The 2048x2732 avatar is smoothscaled down by halves once at load (1024,
+512, ... wide). A zoom transition needs a new sprite size every frame;
+scaling it from the smallest level that is still at least that size reads
+at most about four source pixels per output pixel, so a transition frame
+costs about the same whatever the size of the original image. At the face
+zooms the sprite is several times the size of the window, so transition
+frames scale only the part of the level that ends up on screen.
+"""
+
+import math
+import time
+
+import pygame
+
+from cache_registry import surface_bytes
+
+
+class MipPyramid:
+    def __init__(self, image, min_size=64):
+        start = time.perf_counter()
+        self.levels = [image]  # Level n is 1/2^n of the image
+        width, height = image.get_size()
+        while min(width, height) // 2 >= min_size:
+            width, height = width // 2, height // 2
+            self.levels.append(pygame.transform.smoothscale(self.levels[-1], (width, height)))
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+        # Stats
+        self.scales = 0
+        self.scale_ms = 0.0
+
+    def level_for(self, size):
+        """Smallest level at least size in both directions (the image itself for upscales)"""
+        for level in reversed(self.levels):
+            if level.get_width() >= size[0] and level.get_height() >= size[1]:
+                return level
+        return self.levels[0]
+
+    def scale(self, size):
+        """The image smoothscaled to size, from the nearest larger level"""
+        start = time.perf_counter()
+        image = pygame.transform.smoothscale(self.level_for(size), size)
+        self.scales += 1
+        self.scale_ms += (time.perf_counter() - start) * 1000
+        return image
+
+    def scale_part(self, size, part):
+        """Only part (a rect in the coordinates of the image scaled to size) of the image scaled to size,
+        from the nearest larger level; returns it and the rect it covers (snapped to level pixels),
+        or None if part is outside the image"""
+        start = time.perf_counter()
+        level = self.level_for(size)
+        scale_x = level.get_width() / size[0]
+        scale_y = level.get_height() / size[1]
+        left = max(0, int(part.left * scale_x))
+        top = max(0, int(part.top * scale_y))
+        right = min(level.get_width(), math.ceil(part.right * scale_x))
+        bottom = min(level.get_height(), math.ceil(part.bottom * scale_y))
+        if right <= left or bottom <= top:
+            return None
+        covered = pygame.Rect(round(left / scale_x), round(top / scale_y), 0, 0)
+        covered.width = max(1, round(right / scale_x) - covered.left)
+        covered.height = max(1, round(bottom / scale_y) - covered.top)
+        image = pygame.transform.smoothscale(level.subsurface((left, top, right - left, bottom - top)), covered.size)
+        self.scales += 1
+        self.scale_ms += (time.perf_counter() - start) * 1000
+        return image, covered
+
+    def stats(self):
+        return {
+            'levels': [level.get_size() for level in self.levels],
+            'mb': round(sum(surface_bytes(level) for level in self.levels[1:]) / (1024 * 1024), 2),
+            'build_ms': round(self.build_ms, 3),
+            'scales': self.scales,
+            'mean_scale_ms': round(self.scale_ms / self.scales, 3) if self.scales else 0.0
+        }
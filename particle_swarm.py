@@ -0,0 +1,209 @@
+"""
+PARTICLE SWARM - Flocking particles for the chaos effect
+Boids (separation, alignment, cohesion) stored as NumPy columns. Neighbors
+are found through a uniform-grid spatial hash that is rebuilt every step by
+sorting particles on their cell, so a step costs ~O(n) instead of O(n^2).
+The area wraps around at the edges, like the classic chaos particles.
+"""
+
+import math
+
+import numpy as np
+
+
+class SpatialHash:
+    """Uniform grid over a wrapping area, rebuilt from scratch each step"""
+
+    def __init__(self, width, height, cell_size):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        # Whole number of cells per axis (never smaller than cell_size) so the grid wraps cleanly
+        self.columns = max(1, int(width // cell_size))
+        self.rows = max(1, int(height // cell_size))
+        self.cell_width = width / self.columns
+        self.cell_height = height / self.rows
+        cells = np.arange(self.columns * self.rows)
+        self.cells = cells
+        self.cell_start = np.zeros(len(cells), dtype=np.int64)
+        self.cell_end = np.zeros(len(cells), dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)  # Particle indices sorted by cell
+        self.cx = np.zeros(0, dtype=np.int64)  # Cell column / row of every particle
+        self.cy = np.zeros(0, dtype=np.int64)
+
+    def build(self, x, y):
+        """Bucket particles by cell: sort them on cell id and find each cell's range"""
+        self.cx = np.minimum((x / self.cell_width).astype(np.int64), self.columns - 1)
+        self.cy = np.minimum((y / self.cell_height).astype(np.int64), self.rows - 1)
+        cell = self.cy * self.columns + self.cx
+        self.order = np.argsort(cell, kind='stable')
+        sorted_cells = cell[self.order]
+        self.cell_start = np.searchsorted(sorted_cells, self.cells, 'left')
+        self.cell_end = np.searchsorted(sorted_cells, self.cells, 'right')
+
+    def offsets(self, radius):
+        """Cell offsets (dx, dy) that can hold a particle within radius (each cell once)"""
+        reach_x = int(math.ceil(radius / self.cell_width))
+        reach_y = int(math.ceil(radius / self.cell_height))
+        # On a small grid, offsets that wrap onto the same cell would count neighbors twice
+        xs = sorted({offset % self.columns for offset in range(-reach_x, reach_x + 1)})
+        ys = sorted({offset % self.rows for offset in range(-reach_y, reach_y + 1)})
+        return [(ox, oy) for oy in ys for ox in xs]
+
+    def candidates(self, radius):
+        """Candidate pairs (i, j): every particle against every particle in the cells around it"""
+        offsets = self.offsets(radius)
+        starts = []
+        counts = []
+        for ox, oy in offsets:
+            cell = ((self.cy + oy) % self.rows) * self.columns + (self.cx + ox) % self.columns
+            start = self.cell_start[cell]
+            starts.append(start)
+            counts.append(self.cell_end[cell] - start)
+        starts = np.concatenate(starts)
+        counts = np.concatenate(counts)
+        owners = np.tile(np.arange(len(self.cx)), len(offsets))
+
+        # Expand each (owner, cell range) into one pair per particle in the range
+        total = int(counts.sum())
+        first = np.cumsum(counts) - counts
+        within = np.arange(total) - np.repeat(first, counts)
+        i = np.repeat(owners, counts)
+        j = self.order[np.repeat(starts, counts) + within]
+        return i, j
+
+
+class BoidSwarm:
+    def __init__(self, width, height, capacity=2000, neighbor_radius=40.0, cell_size=None, seed=None):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.neighbor_radius = neighbor_radius
+        self.cell_size = cell_size or neighbor_radius  # Cells the size of the radius: 3x3 cells per query
+        self.grid = SpatialHash(width, height, self.cell_size)
+        self.rng = np.random.default_rng(seed)
+
+        # Flocking weights (per step at 60 steps/sec)
+        self.separation_radius = neighbor_radius * 0.4
+        self.separation = 1.5
+        self.alignment = 0.05
+        self.cohesion = 0.002
+        self.swirl = 0.05  # Weak version of the classic oscillating center + rotational force
+        self.min_speed = 1.0
+        self.max_speed = 4.0
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.hue = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.count = 0
+
+        # Stats from the last step
+        self.candidates_tested = 0
+        self.neighbor_pairs = 0
+
+    def __len__(self):
+        return self.count
+
+    def resize(self, width, height):
+        """New area size: boids keep their relative positions"""
+        n = self.count
+        self.x[:n] *= width / self.width
+        self.y[:n] *= height / self.height
+        self.width = width
+        self.height = height
+        self.grid = SpatialHash(width, height, self.cell_size)
+
+    def spawn(self, count):
+        """Add up to count boids at random positions"""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        new = slice(self.count, self.count + count)
+        self.x[new] = self.rng.uniform(0, self.width, count)
+        self.y[new] = self.rng.uniform(0, self.height, count)
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        speed = self.rng.uniform(self.min_speed, self.max_speed, count)
+        self.vx[new] = np.cos(angle) * speed
+        self.vy[new] = np.sin(angle) * speed
+        self.hue[new] = self.rng.uniform(0, 360, count)
+        self.size[new] = self.rng.uniform(2, 5, count)
+        self.count += count
+
+    def step(self, time):
+        """Apply flocking forces and move every boid one step"""
+        n = self.count
+        if not n:
+            return
+        x, y = self.x[:n], self.y[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+
+        # Neighbor pairs within the radius (offsets wrap around the edges)
+        self.grid.build(x, y)
+        i, j = self.grid.candidates(self.neighbor_radius)
+        self.candidates_tested = len(i)
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        dx -= self.width * np.round(dx / self.width)
+        dy -= self.height * np.round(dy / self.height)
+        dist2 = dx * dx + dy * dy
+        near = (dist2 < self.neighbor_radius * self.neighbor_radius) & (i != j)
+        i, j, dx, dy, dist2 = i[near], j[near], dx[near], dy[near], dist2[near]
+        self.neighbor_pairs = len(i)
+
+        neighbors = np.bincount(i, minlength=n)
+        has = neighbors > 0
+        inverse = 1.0 / np.maximum(neighbors, 1)
+
+        # Alignment: steer towards the neighbors' mean velocity
+        steer_x = (np.bincount(i, vx[j], n) * inverse - vx) * self.alignment
+        steer_y = (np.bincount(i, vy[j], n) * inverse - vy) * self.alignment
+
+        # Cohesion: steer towards the neighbors' center
+        steer_x += np.bincount(i, dx, n) * inverse * self.cohesion
+        steer_y += np.bincount(i, dy, n) * inverse * self.cohesion
+
+        # Separation: push away from close neighbors (stronger the closer they are)
+        close = dist2 < self.separation_radius * self.separation_radius
+        push = 1.0 / (dist2[close] + 1.0)
+        steer_x -= np.bincount(i[close], dx[close] * push, n) * self.separation
+        steer_y -= np.bincount(i[close], dy[close] * push, n) * self.separation
+
+        vx += np.where(has, steer_x, 0.0)
+        vy += np.where(has, steer_y, 0.0)
+
+        # Oscillating center force and swirl, as the classic particles feel them
+        cx = self.width / 2 - x
+        cy = self.height / 2 - y
+        dist = np.sqrt(cx * cx + cy * cy) + 0.1
+        force = np.sin(time * 0.05 + dist * 0.02) * self.swirl
+        vx += cx / dist * force - cy / dist * self.swirl
+        vy += cy / dist * force + cx / dist * self.swirl
+
+        # Keep speeds in range
+        speed = np.sqrt(vx * vx + vy * vy) + 1e-9
+        clamp = np.clip(speed, self.min_speed, self.max_speed) / speed
+        vx *= clamp
+        vy *= clamp
+
+        x += vx
+        y += vy
+        np.mod(x, self.width, out=x)
+        np.mod(y, self.height, out=y)
+
+        hue = self.hue[:n]
+        hue += 1
+        np.mod(hue, 360, out=hue)
+
+    def colors(self, saturation=1.0, value=1.0):
+        """RGB color of every boid from its hue (vectorized HSV -> RGB)"""
+        h = self.hue[:self.count] / 60.0
+        c = value * saturation
+        k = np.stack([(5 + h) % 6, (3 + h) % 6, (1 + h) % 6], axis=1)
+        rgb = value - c * np.clip(np.minimum(k, 4 - k), 0, 1)
+        return (rgb * 255).astype(np.int32)
+
+    def clear(self):
+        self.count = 0
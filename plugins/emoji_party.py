@@ -0,0 +1,107 @@
+"""
+EMOJI PARTY (E+2) - Emojis from emoji/ bouncing and spinning around the screen
+"""
+
+import pygame
+
+from effect_plugins import EffectPlugin
+from sprite_pools import EmojiPool
+
+
+class EmojiPartyEffect(EffectPlugin):
+    name = 'emoji_party'
+    title = 'EMOJI PARTY 🎉'
+    slot = 2
+    kind = 'overlay'
+    budget_ms = 4.0  # About 2.2 ms at 1920x1080 (benchmarks.py effects)
+
+    def __init__(self, host):
+        super().__init__(host)
+        self.emojis = EmojiPool()
+        self.max_emojis = 20
+        self.spawn_timer = 0
+        self.size = (host.width, host.height)  # Viewport the emojis were placed in
+
+    def init(self):
+        self.spawn_timer = 0
+        # Spawn initial emojis
+        for _ in range(10):
+            self.spawn_emoji()
+
+    def spawn_emoji(self):
+        """Spawn a new emoji with random properties"""
+        host = self.host
+        if not host.emoji_images:
+            return
+
+        # Random emoji from loaded images
+        image_index = host.rng.randrange(len(host.emoji_images))
+
+        # Random size between min and max
+        size = host.rng.randint(host.emoji_min_size, host.emoji_max_size)
+
+        # Random starting position (anywhere on screen)
+        x = host.rng.randint(0, host.width)
+        y = host.rng.randint(0, host.height)
+
+        # Random velocity (speed and direction)
+        vx = host.rng.uniform(-5, 5)
+        vy = host.rng.uniform(-5, 5)
+
+        # Random rotation speed (degrees per step)
+        rotation_speed = host.rng.uniform(-5, 5)
+
+        # Random flip
+        flip_x = host.rng.choice([True, False])
+        flip_y = host.rng.choice([True, False])
+
+        self.emojis.spawn(image_index, x, y, vx, vy, size, rotation_speed, flip_x, flip_y)
+
+    def update(self, dt):
+        # Spawn new emojis periodically
+        self.spawn_timer += 1
+        if self.spawn_timer >= 30 and len(self.emojis) < self.max_emojis:
+            self.spawn_timer = 0
+            self.spawn_emoji()
+
+        # Move, bounce and spin all emojis in one vectorized step
+        self.emojis.step(self.host.width, self.host.height)
+
+    def draw(self, target):
+        """Draw all active emojis with rotation and flipping"""
+        host = self.host
+        # Positions interpolated between the last two simulation steps
+        for image_index, size, flip_x, flip_y, x, y, rotation in self.emojis.interpolated(host.sim_alpha):
+            # Scaled and flipped emoji (cached)
+            scaled_emoji = host.get_emoji_image(image_index, size, flip_x, flip_y)
+
+            # Apply rotation
+            rotated_emoji = pygame.transform.rotate(scaled_emoji, rotation)
+
+            # Center the emoji at its position
+            rect = rotated_emoji.get_rect(center=(int(x), int(y)))
+            target.blit(rotated_emoji, rect)
+        return target
+
+    def draw_textures(self, textures):
+        # Original emoji images uploaded once; the renderer scales, flips and rotates them
+        host = self.host
+        for image_index, size, flip_x, flip_y, x, y, rotation in self.emojis.interpolated(host.sim_alpha):
+            rect = pygame.Rect(0, 0, size, size)
+            rect.center = (int(x), int(y))
+            textures.draw(textures.texture(host.emoji_images[image_index]), rect, rotation, flip_x, flip_y)
+        return True
+
+    def resize(self, width, height):
+        # Keep every emoji at the same relative spot on screen
+        self.emojis.rescale(width / self.size[0], height / self.size[1])
+        self.size = (width, height)
+
+    def stop(self):
+        self.emojis.clear()
+
+    def status(self):
+        return f"EMOJI PARTY 🎉 Count: {len(self.emojis)}"
+
+    def stats(self):
+        return {'emojis': len(self.emojis)}
@@ -0,0 +1,219 @@
+"""
+PSYCHEDELIC (E+3) - Neon color shift over the character with 8 auto-cycling patterns
+Patterns that repeat (the waves and the checkerboard) are baked into loops on
+a background thread and played back (see psychedelic_loops).
+"""
+
+import math
+
+import pygame
+
+from effect_plugins import EffectPlugin
+from psychedelic_loops import PatternLoops
+
+PATTERN_NAMES = ["Horizontal Waves", "Vertical Waves", "Diagonal Scan", "Radial Burst",
+                 "Checkerboard", "Glitch Bars", "Spiral", "Plasma"]
+SHORT_NAMES = ["H-Wave", "V-Wave", "Diagonal", "Radial", "Checker", "Glitch", "Spiral", "Plasma"]
+
+
+class PsychedelicEffect(EffectPlugin):
+    name = 'psychedelic'
+    title = 'PSYCHEDELIC 🌈'
+    slot = 3
+    kind = 'character'
+    budget_ms = 12.0  # About 9 ms at 1920x1080 (benchmarks.py effects)
+
+    def __init__(self, host):
+        super().__init__(host)
+        self.hue_offset = 0.0
+        self.time = 0
+        self.pattern_index = 0  # Current pattern
+        self.pattern_timer = 0  # Time in current pattern
+        self.pattern_duration = 300  # Steps per pattern (5 seconds at 60 steps/sec)
+        self.hue_step = 2.0  # Hue degrees per step (a full turn every 180 steps)
+
+        # Patterns that repeat are baked into loops on a background thread and played back
+        # (pattern index -> loop steps). The checkerboard repeats with the hue every 180 steps;
+        # the waves' phase turns every 40*pi steps, so their 1260-step loop (7 hue turns)
+        # restarts about 0.17 rad off. The other patterns are cheaper drawn live.
+        self.loop_steps = {0: 1260, 1: 1260, 4: 180}
+        self.loops = None
+        if host.bake_patterns:
+            self.loops = PatternLoops(self.draw_pattern, self.loop_steps, self.hue_step,
+                                      host.pattern_loops_mb, host.caches)
+
+    def init(self):
+        self.hue_offset = 0.0
+        self.time = 0
+        self.pattern_index = 0
+        self.pattern_timer = 0
+        print("🌈 PSYCHEDELIC MODE ACTIVATED - NEON DREAMS ENGAGED! 🌈")
+
+    def update(self, dt):
+        # Smoothly cycle through hue spectrum
+        self.hue_offset += self.hue_step
+        self.hue_offset %= 360
+
+        # Increment time for wave patterns
+        self.time += 1
+
+        # Cycle through patterns
+        self.pattern_timer += 1
+        if self.pattern_timer >= self.pattern_duration:
+            self.pattern_timer = 0
+            self.pattern_index = (self.pattern_index + 1) % 8  # 8 different patterns
+            print(f"🌈 Pattern switched to: {PATTERN_NAMES[self.pattern_index]}")
+
+    def draw(self, target):
+        """Psychedelic copy of the posed character sprite"""
+        host = self.host
+        width, height = target.get_size()
+        effect_surface = target.copy()
+
+        # Base color layers (always applied)
+        overlay1 = pygame.Surface((width, height), pygame.SRCALPHA)
+        color1 = host.hsv_to_rgb(self.hue_offset, 0.6, 1.0)
+        overlay1.fill((*color1, 80))
+        effect_surface.blit(overlay1, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+
+        # Apply pattern-specific effects (drawn at the psychedelic render scale, then upscaled)
+        s = host.render_scales['psychedelic']
+        pattern_size = (max(1, int(width * s)), max(1, int(height * s)))
+        pattern_surface = None
+        if self.loops and not self.host.zoom_moving():
+            # Baked loop frame for this step once the loop is ready (the next pattern bakes ahead;
+            # not while zooming, when every frame has a new canvas size)
+            canvas = self.canvas()
+            pattern_surface = self.loops.frame(self.pattern_index, self.time, self.hue_offset,
+                                               pattern_size, canvas, s)
+            self.loops.request((self.pattern_index + 1) % 8, canvas, s)
+        if pattern_surface is None:
+            pattern_surface = pygame.Surface(pattern_size, pygame.SRCALPHA)
+            self.draw_pattern(pattern_surface, self.pattern_index, self.time, self.hue_offset, width, height, s)
+
+        if s < 1.0:
+            pattern_surface = pygame.transform.smoothscale(pattern_surface, (width, height))
+
+        effect_surface.blit(pattern_surface, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        return effect_surface
+
+    def canvas(self):
+        """Size the loops are baked at: the sprite plus room for it to rock"""
+        width, height = self.host.sprite_size()
+        angle = math.radians(self.host.max_rock_angle * 2)
+        return (int(width * math.cos(angle) + height * math.sin(angle)) + 2,
+                int(height * math.cos(angle) + width * math.sin(angle)) + 2)
+
+    def draw_pattern(self, pattern_surface, pattern_index, pattern_time, hue_offset, width, height, s):
+        """Draw one pattern for a width x height image at render scale s (also called by the loop baker thread)"""
+        hsv_to_rgb = self.host.hsv_to_rgb
+        rng = self.host.rng
+
+        def line_width(w):
+            return max(1, int(round(w * s)))
+
+        if pattern_index == 0:
+            # Horizontal Waves (original)
+            for y in range(0, height, 4):
+                wave_offset = math.sin((y * 0.02) + (pattern_time * 0.05))
+                wave_hue = (hue_offset + wave_offset * 60) % 360
+                wave_color = hsv_to_rgb(wave_hue, 0.8, 0.9)
+                wave_alpha = int(abs(wave_offset) * 40)
+                pygame.draw.line(pattern_surface, (*wave_color, wave_alpha),
+                               (0, y * s), (width * s, y * s), line_width(4))
+
+        elif pattern_index == 1:
+            # Vertical Waves
+            for x in range(0, width, 4):
+                wave_offset = math.sin((x * 0.02) + (pattern_time * 0.05))
+                wave_hue = (hue_offset + wave_offset * 60) % 360
+                wave_color = hsv_to_rgb(wave_hue, 0.8, 0.9)
+                wave_alpha = int(abs(wave_offset) * 40)
+                pygame.draw.line(pattern_surface, (*wave_color, wave_alpha),
+                               (x * s, 0), (x * s, height * s), line_width(4))
+
+        elif pattern_index == 2:
+            # Diagonal Scan Lines
+            for i in range(-height, width, 8):
+                offset = (i + pattern_time * 2) % (width + height)
+                wave_hue = (hue_offset + (offset * 0.5)) % 360
+                wave_color = hsv_to_rgb(wave_hue, 0.9, 1.0)
+                pygame.draw.line(pattern_surface, (*wave_color, 60),
+                               (offset * s, 0), ((offset - height) * s, height * s), line_width(3))
+
+        elif pattern_index == 3:
+            # Radial Burst
+            center_x, center_y = width // 2, height // 2
+            for angle in range(0, 360, 10):
+                angle_rad = math.radians(angle + pattern_time * 2)
+                radius = min(width, height)
+                end_x = center_x + math.cos(angle_rad) * radius
+                end_y = center_y + math.sin(angle_rad) * radius
+                wave_hue = (hue_offset + angle) % 360
+                wave_color = hsv_to_rgb(wave_hue, 0.8, 0.9)
+                pygame.draw.line(pattern_surface, (*wave_color, 50),
+                               (center_x * s, center_y * s), (end_x * s, end_y * s), line_width(2))
+
+        elif pattern_index == 4:
+            # Checkerboard
+            checker_size = 20
+            cell = int(math.ceil(checker_size * s))
+            for y in range(0, height, checker_size):
+                for x in range(0, width, checker_size):
+                    if ((x // checker_size) + (y // checker_size) + (pattern_time // 10)) % 2:
+                        checker_hue = (hue_offset + x + y) % 360
+                        checker_color = hsv_to_rgb(checker_hue, 0.7, 0.8)
+                        pygame.draw.rect(pattern_surface, (*checker_color, 70),
+                                       (int(x * s), int(y * s), cell, cell))
+
+        elif pattern_index == 5:
+            # Glitch Bars
+            for i in range(10):
+                bar_y = (i * height // 10 + pattern_time * (i % 3 + 1)) % height
+                bar_height = rng.randint(10, 40)
+                bar_hue = (hue_offset + i * 36) % 360
+                bar_color = hsv_to_rgb(bar_hue, 1.0, 1.0)
+                pygame.draw.rect(pattern_surface, (*bar_color, 80),
+                               (0, int(bar_y * s), pattern_surface.get_width(), int(math.ceil(bar_height * s))))
+
+        elif pattern_index == 6:
+            # Spiral
+            center_x, center_y = width // 2, height // 2
+            for i in range(0, 360, 5):
+                angle = math.radians(i + pattern_time * 3)
+                radius = (i / 360.0) * min(width, height) // 2
+                x = center_x + math.cos(angle) * radius
+                y = center_y + math.sin(angle) * radius
+                spiral_hue = (hue_offset + i) % 360
+                spiral_color = hsv_to_rgb(spiral_hue, 0.9, 1.0)
+                if i > 0:
+                    prev_angle = math.radians(i - 5 + pattern_time * 3)
+                    prev_radius = ((i - 5) / 360.0) * min(width, height) // 2
+                    prev_x = center_x + math.cos(prev_angle) * prev_radius
+                    prev_y = center_y + math.sin(prev_angle) * prev_radius
+                    pygame.draw.line(pattern_surface, (*spiral_color, 60),
+                                   (prev_x * s, prev_y * s), (x * s, y * s), line_width(3))
+
+        elif pattern_index == 7:
+            # Plasma Effect
+            cell = int(math.ceil(6 * s))
+            for y in range(0, height, 6):
+                for x in range(0, width, 6):
+                    plasma_val = math.sin(x * 0.02 + pattern_time * 0.05)
+                    plasma_val += math.sin(y * 0.02 + pattern_time * 0.05)
+                    plasma_val += math.sin((x + y) * 0.01 + pattern_time * 0.05)
+                    plasma_hue = (hue_offset + plasma_val * 50) % 360
+                    plasma_color = hsv_to_rgb(plasma_hue, 0.8, 0.9)
+                    plasma_alpha = int((plasma_val + 3) / 6 * 60)
+                    pygame.draw.rect(pattern_surface, (*plasma_color, plasma_alpha),
+                                   (int(x * s), int(y * s), cell, cell))
+
+    def close(self):
+        if self.loops:
+            self.loops.close()
+
+    def status(self):
+        return f"PSYCHEDELIC 🌈 {SHORT_NAMES[self.pattern_index]} | Hue: {self.hue_offset:.0f}°"
+
+    def stats(self):
+        return {'pattern': self.pattern_index, 'pattern_loops': self.loops.stats() if self.loops else None}
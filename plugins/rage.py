@@ -0,0 +1,106 @@
+"""
+RAGE (E+1) - Pulsing red tint with explosions going off everywhere
+"""
+
+import math
+
+import pygame
+
+from effect_plugins import EffectPlugin
+from sprite_pools import ExplosionPool
+
+
+class RageEffect(EffectPlugin):
+    name = 'rage'
+    title = 'RAGE 🔥'
+    slot = 1
+    kind = 'overlay'
+    budget_ms = 8.0  # About 5.5 ms at 1920x1080 (benchmarks.py effects)
+
+    def __init__(self, host):
+        super().__init__(host)
+        self.explosions = ExplosionPool()
+        self.explosions_per_spawn = (1, 2)  # Explosions per spawn cycle (min, max)
+        self.red_phase = 0.0  # Phase for oscillation
+        self.red_intensity = 0.0
+        self.explosion_timer = 0
+
+    def init(self):
+        self.red_phase = 0.0
+        self.explosion_timer = 0
+
+    def update(self, dt):
+        host = self.host
+        # Oscillate red tint slowly (sine wave for smooth oscillation)
+        self.red_phase += 0.015  # Slower oscillation speed
+        # Use sine wave to oscillate between 0.3 (light red) and 1.0 (dark red)
+        self.red_intensity = 0.65 + 0.35 * math.sin(self.red_phase)
+
+        # Spawn explosions randomly - MORE EXPLOSIONS!
+        self.explosion_timer += 1
+        if self.explosion_timer >= 4:  # Spawn every 4 steps (twice as fast!)
+            self.explosion_timer = 0
+
+            # Spawn 1-2 explosions per spawn cycle
+            num_explosions = host.rng.randint(*self.explosions_per_spawn)
+            for _ in range(num_explosions):
+                # Random position on screen
+                x = host.rng.randint(0, host.width)
+                y = host.rng.randint(0, host.height)
+
+                # Random size (50% to 150% of original)
+                scale = host.rng.uniform(0.5, 1.5)
+                scale = round(scale / host.explosion_scale_step) * host.explosion_scale_step
+
+                self.explosions.spawn(x, y, scale)
+
+        # Update all explosions (animate through frames quickly)
+        self.explosions.step(0.5, len(host.explosion_frames))
+
+    def draw(self, target):
+        self.draw_tint(target)
+        self.draw_explosions(target)
+        return target
+
+    def draw_tint(self, surface):
+        """Red tint overlay over the whole scene"""
+        if self.red_intensity > 0:
+            red_overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+            alpha = int(self.red_intensity * 150)  # Max 150 alpha for red tint
+            red_overlay.fill((255, 0, 0, alpha))
+            surface.blit(red_overlay, (0, 0))
+
+    def draw_explosions(self, surface):
+        """Draw all active explosions"""
+        host = self.host
+        for x, y, frame_position, scale in self.explosions.live():
+            frame_index = int(frame_position)
+            if 0 <= frame_index < len(host.explosion_frames):
+                frame = host.get_explosion_frame(frame_index, scale)
+
+                # Center the explosion at its position
+                rect = frame.get_rect(center=(x, y))
+                surface.blit(frame, rect)
+
+    def draw_textures(self, textures):
+        # Tint blended by the renderer; explosion frames uploaded once and scaled as they are drawn
+        if self.red_intensity > 0:
+            textures.fill((255, 0, 0), int(self.red_intensity * 150))
+        host = self.host
+        for x, y, frame_position, scale in self.explosions.live():
+            frame_index = int(frame_position)
+            if 0 <= frame_index < len(host.explosion_frames):
+                frame = host.explosion_frames[frame_index]
+                rect = pygame.Rect(0, 0, int(frame.get_width() * scale), int(frame.get_height() * scale))
+                rect.center = (x, y)
+                textures.draw(textures.texture(frame), rect)
+        return True
+
+    def stop(self):
+        self.explosions.clear()
+
+    def status(self):
+        return f"RAGE 🔥 Red: {self.red_intensity:.2f}"
+
+    def stats(self):
+        return {'explosions': len(self.explosions)}
@@ -4,29 +4,91 @@ Samurai Samus Avatar
 A simple VTuber-style avatar application with voice reactivity
 """
 
+import os
 import pygame
-import pyaudio
-import numpy as np
 import math
 import sys
 import random
 import glob
 import argparse
 import json
+import time
+import queue
 from PIL import Image
 from pathlib import Path
 from chaos_effect import ChaosEffect
+from config_store import ConfigStore
+from control_server import ControlServer
+from frame_output import FrameWriter, surface_pixel_format
+from compositor import Compositor
+from texture_backend import TextureCompositor, open_texture_backend
+from avatar_layers import build_avatar_layers
+from text_cache import TextCache
+from alloc_tracker import AllocationTracker
+from audio_sources import AudioSource, make_audio_source, list_audio_devices
+from audio_process import ProcessAudioSource
+from video_recorder import start_recording
+from cache_registry import CacheRegistry
+from job_scheduler import JobScheduler
+from mipmaps import MipPyramid
+from asset_watcher import AssetWatcher
+from effect_plugins import EffectStack, discover_plugins
+from session_log import SessionRecorder, SessionReader, frame_checksum, KEY_DOWN, KEY_UP, AUDIO, COMMAND
 
 class SamuraiPNGTuber:
-    def __init__(self, audio_device_index=None):
+    # Render scales accepted for the background (rainbow / chaos) and psychedelic layers
+    render_scale_names = ('background', 'psychedelic')
+    render_scale_choices = (1.0, 0.5, 0.25)
+    
+    # Image backgrounds by number (B+3 to B+8)
+    background_image_names = {3: 'ship01', 4: 'ship02', 5: 'crateria01', 6: 'brinstar01', 7: 'hellway01', 8: 'tourian01'}
+    
+    def __init__(self, audio_device_index=None, control_port=None, frame_output=None, frame_slots=3,
+                 transparent=False, premultiplied=True, target_fps=None,
+                 seed=None, chaos_seed=None, headless=False, config_overrides=None,
+                 persist_config=True, audio_source=None, record_path=None, record_checksums=False,
+                 effect_scale=None, alloc_stats_path=None, video_dir='.', video_buffers=8,
+                 video_drop='newest', ffmpeg='ffmpeg', bake_patterns=True, cache_budget_mb=None,
+                 job_budget_ms=None, watch_assets=True, audio_process=None, renderer=None, viewport=None):
+        # Headless: render with the SDL dummy video driver (no window)
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
         pygame.init()
         
         # Config file path
         self.config_path = Path.home() / ".kentroid_samurai_avatar.json"
         
-        # Load saved config
+        # Load saved config (kept in memory, written debounced in the background)
+        self.config_store = ConfigStore(self.config_path, defaults=self.default_config(),
+                                        persist=persist_config)
+        if config_overrides:
+            self.config_store.update(config_overrides)
         config = self.load_config()
         
+        # Seeded RNGs so sessions can be recorded and replayed exactly
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.chaos_seed = chaos_seed if chaos_seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        
+        # Every surface cache registers here and shares one memory budget (C dumps the stats)
+        if cache_budget_mb is None:
+            cache_budget_mb = config.get('cache_budget_mb', 512)
+        self.caches = CacheRegistry(cache_budget_mb)
+        self.sprite_cache = self.caches.cache('sprite')  # (size, avatar version) -> character scaled for the zoom
+        self.background_cache = self.caches.cache('backgrounds')  # (image, size) -> cover-scaled background
+        
+        # Rebuild work (scaling for a new zoom or viewport, building the chaos background, cache
+        # warming) runs as jobs in the time left after each frame instead of in one spiking frame
+        jobs = config.get('jobs', {})
+        if job_budget_ms is None:
+            job_budget_ms = jobs.get('budget_ms', 4)
+        self.jobs = JobScheduler(job_budget_ms, jobs.get('threads', 1))
+        self.warm_effect_caches = jobs.get('warm_effects', True)
+        self.warm_chaos = jobs.get('warm_chaos', False)  # Build the chaos background ahead of time even if no profile uses it
+        
+        # Named scene profiles (P+1-9 to recall, Shift+P+1-9 to save)
+        self.scene_profiles = config.get('profiles', {})
+        
         # Audio device selection (CLI arg overrides config)
         if audio_device_index is not None:
             self.audio_device_index = audio_device_index
@@ -39,12 +101,71 @@ class SamuraiPNGTuber:
             (1200, 800),   # d+2: Wide viewport
             (1920, 1080)   # d+3: Full HD viewport (OBS-optimized with 100px lower position)
         ]
-        self.current_viewport = config.get('viewport', 0)
+        # Extra presets from the config for d+4 to d+9, e.g. [[2560, 1440], [1080, 1920]]
+        self.custom_viewports = []
+        for size in config.get('viewports', []):
+            if parse_viewport_size(size) and len(self.custom_viewports) < 6:
+                self.custom_viewports.append(list(parse_viewport_size(size)))
+            else:
+                print(f"Warning: Skipping viewport preset {size!r}")
+        self.viewport_presets += [tuple(size) for size in self.custom_viewports]
+        self.current_viewport = config.get('viewport', 0)  # Preset index, or [width, height] for any other size
+        if viewport is not None:
+            self.current_viewport = list(viewport)
         self.viewport_x_offset = config.get('viewport_x_offset', 0)  # Manual X offset for fine-tuning position (arrow keys)
         self.viewport_y_offset = config.get('viewport_y_offset', 0)  # Manual Y offset for fine-tuning position (arrow keys)
-        self.width, self.height = self.viewport_presets[self.current_viewport]
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Samurai Samus Avatar")
+        if self.resolve_viewport(self.current_viewport) is None:
+            print(f"Warning: Unsupported viewport {self.current_viewport!r}, using 800x800")
+            self.current_viewport = 0
+        self.width, self.height = self.resolve_viewport(self.current_viewport)
+        
+        # Resizable window: a resize is applied once the size has settled for resize_debounce_ms
+        # and the sprite and background have been scaled for it (at most resize_warm_ms later)
+        window = config.get('window', {})
+        self.resizable = window.get('resizable', True)
+        self.resize_debounce = window.get('resize_debounce_ms', 250) / 1000
+        self.resize_warm_limit = window.get('resize_warm_ms', 500) / 1000
+        self.display_flags = pygame.RESIZABLE if self.resizable else 0
+        self.pending_resize = None  # Size the window was dragged to, not applied yet
+        self.resize_due = 0.0
+        self.resize_warm_keys = None  # Jobs scaling for the pending size
+        self.resize_warm_until = 0.0
+        self.resize_events = 0
+        self.resizes = 0
+        
+        # Transparent mode: render into an offscreen RGBA framebuffer with no background
+        self.transparent = transparent
+        
+        # Renderer backend: 'surface' composites with CPU blits into the window; 'texture' draws with an
+        # SDL2 Renderer (not for transparent output or session recording, which need the surface pixels)
+        render = config.get('renderer', {})
+        backend = renderer or render.get('backend', 'surface')
+        self.textures = None
+        if backend == 'texture':
+            if transparent or record_path:
+                print("Warning: The texture renderer doesn't support transparent output or recording - "
+                      "using the surface renderer")
+            else:
+                # Software rendering when headless (no GPU behind the dummy video driver)
+                driver = render.get('driver') or ('software' if headless else None)
+                self.textures = open_texture_backend("Samurai Samus Avatar", (self.width, self.height),
+                                                     driver, self.caches, self.resizable)
+        self.renderer_backend = 'texture' if self.textures else 'surface'
+        if self.textures:
+            # Scaled copies dropped from their caches (reloads, rescales, evictions) release their textures too
+            for cache in (self.sprite_cache, self.background_cache):
+                cache.on_discard = lambda key, surface: self.textures.forget(surface)
+        self.render_cpu_ms = 0.0  # Render thread CPU time of the last frame
+        self.render_cpu_total = 0.0
+        if self.textures:
+            # Hidden display only gives convert() its pixel format; frames read back land in self.screen
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+            self.screen = pygame.Surface((self.width, self.height), 0, 32)
+        else:
+            self.screen = pygame.display.set_mode((self.width, self.height), self.display_flags)
+            pygame.display.set_caption("Samurai Samus Avatar")
+        self.premultiplied = premultiplied  # Export premultiplied alpha (else straight RGBA)
+        self.create_canvas()
         
         # Load samurai image
         self.image_path = Path(__file__).parent / "KentroidSamuraiTopVisorShade.PNG"
@@ -60,25 +181,42 @@ class SamuraiPNGTuber:
         self.load_background_images()
         
         # Background settings
-        self.current_background = config.get('background', 1)  # 1=black, 2=rainbow, 3=ship01, 4=ship02, 5=crateria01, 6=brinstar01, 7=hellway01, 8=tourian01, 9=chaos
+        self.current_background = config.get('background', 1)  # 1=black, 2=rainbow, 3=ship01, 4=ship02, 5=crateria01, 6=brinstar01, 7=hellway01, 8=tourian01, 9=chaos, 10+=extra images
+        if not 1 <= self.current_background <= 9 and self.current_background not in self.background_slots:
+            self.current_background = 1  # Extra background image no longer in bg/
         self.rainbow_hue = 0.0  # For rainbow background animation
         self.chaos_effect = None  # For chaos background
+        self.prepared_chaos_effect = None  # Built ahead of time by a job, taken when switching to chaos
+        self.chaos_particles = config.get('chaos_particles', {})  # ChaosEffect particle options (mode, swarm size, ...)
+        self.chaos_voronoi = config.get('chaos_voronoi', {})  # ChaosEffect Voronoi options (mode, seeds, ...)
         
         # Initialize chaos effect if background is chaos
         if self.current_background == 9:
-            self.chaos_effect = ChaosEffect(self.width, self.height)
-        
-        # Effects system
-        self.current_effect = None
-        self.active_explosions = []
-        self.active_emojis = []
-        
-        # Effect 3: Psychedelic color shift
-        self.effect3_hue_offset = 0.0
-        self.effect3_time = 0
-        self.effect3_pattern_index = 0  # Current pattern
-        self.effect3_pattern_timer = 0  # Time in current pattern
-        self.effect3_pattern_duration = 300  # Frames per pattern (5 seconds at 60fps)
+            self.chaos_effect = self.take_chaos_effect()
+        
+        # Shared effect assets: explosion frames and emojis scaled once and cached
+        self.explosion_scale_step = 1 / 16  # Explosion sizes are quantized so scaled frames can be cached
+        self.explosion_cache = self.caches.cache('explosions')  # (frame index, scale) -> scaled frame
+        self.emoji_cache = self.caches.cache('emojis')  # (image index, size, flip_x, flip_y) -> scaled, flipped emoji
+        
+        # Psychedelic patterns that repeat are baked into loops on a background thread
+        # (not while recording: baked and live frames can differ by a row at the edges)
+        loops = config.get('psychedelic_loops', {})
+        self.bake_patterns = bake_patterns and loops.get('enabled', True) and not record_path
+        self.pattern_loops_mb = loops.get('memory_mb', 64)
+        
+        # Effects system: plugins from plugins/ (E+N toggles slot N; several can run at once),
+        # each timed against its frame budget (only warned about while recording: switching an
+        # effect off depends on this machine's speed, so the replay would diverge)
+        effects = config.get('effects', {})
+        plugin_dirs = [Path(__file__).parent / "plugins"] + [Path(folder).expanduser()
+                                                              for folder in effects.get('plugin_dirs', [])]
+        self.effects = EffectStack(self, discover_plugins(plugin_dirs),
+                                   over_budget='warn' if record_path else effects.get('over_budget', 'warn'),
+                                   grace_frames=effects.get('grace_frames', 60),
+                                   budgets_ms=effects.get('budgets_ms', {}))
+        if self.chaos_effect:
+            self.effects.attach(self.chaos_effect)
         
         # Zoom settings
         # Multiple zoom levels from full body to extreme close-up
@@ -142,14 +280,48 @@ class SamuraiPNGTuber:
                 'focus': 'mask'
             }
         ]
-        self.current_zoom = config.get('zoom', 4)  # Default to Z+5 (face1, was Z+2)
+        self.current_zoom = config.get('zoom', 4)  # Default to Z+5 (face1, was Z+2); fractional = between levels
+        
+        # Zoom transitions: the shown zoom eases to current_zoom over zoom_transition seconds (0 = snap)
+        self.zoom_transition = config.get('zoom_transition', 0.35)
+        self.zoom_step = 0.25  # Zoom levels per -/= key press
+        self.zoom_position = self.prev_zoom_position = self.zoom_from = self.current_zoom
+        self.zoom_progress = 1.0
+        
+        # Fixed-timestep simulation: all per-step speeds below are tuned for 60 steps/sec,
+        # independent of the render frame rate (accumulated real time, interpolated for drawing)
+        self.sim_rate = 60
+        self.sim_dt = 1.0 / self.sim_rate
+        self.sim_accumulator = 0.0
+        self.sim_alpha = 0.0  # Fraction of a step between the last state and the next
+        self.sim_steps = 0
+        self.max_frame_time = 0.25  # Clamp huge real-time gaps (window drag, breakpoints)
+        self.target_fps = target_fps or config.get('fps', 60)
+        
+        # Internal resolution of the low-frequency effect layers (1.0, 0.5 or 0.25);
+        # the character and UI always render at native resolution
+        self.render_scales = {}
+        for name, scale in config.get('render_scales', {}).items():
+            if name not in self.render_scale_names:
+                print(f"Warning: Unknown render scale layer {name!r} in config (expected one of "
+                      f"{', '.join(self.render_scale_names)})")
+            elif scale not in self.render_scale_choices:
+                print(f"Warning: Unsupported render scale {name}={scale!r} in config, using 1.0")
+            else:
+                self.render_scales[name] = float(scale)
+        for name in self.render_scale_names:
+            if effect_scale is not None:
+                self.render_scales[name] = effect_scale
+            self.render_scales.setdefault(name, 1.0)
         
         # Animation settings
+        self.prev_rock_angle = 0
+        self.prev_rock_intensity = 0.0
         self.rock_angle = 0
         self.rock_speed = 0.5  # Faster rocking when talking
         self.max_rock_angle = 2  # degrees
         self.rock_intensity = 0.0  # Driven by audio like glow
-        self.rock_decay = 0.08
+        self.rock_decay = 0.08  # Per step
         
         # Bobbing variability
         self.bob_pattern = 0  # Current bobbing pattern
@@ -160,18 +332,17 @@ class SamuraiPNGTuber:
             {'type': 'tilt_right', 'axis': 'z'}, # Tilt more right
         ]
         self.pattern_change_counter = 0
-        self.pattern_change_interval = 180  # Change pattern every 3 seconds at 60fps
+        self.pattern_change_interval = 180  # Change pattern every 3 seconds (60 steps/sec)
         
         # Audio settings
         self.audio_chunk = 1024
-        self.audio_format = pyaudio.paInt16
         self.audio_channels = 1
         self.audio_rate = 44100
         self.audio_threshold = 300  # Adjust for sensitivity
         
         # Visor glow settings (400x400 sphere on original image)
         self.glow_intensity = 0.0
-        self.glow_decay = 0.05  # Slower decay so it's more visible
+        self.glow_decay = 0.05  # Per step - slower decay so it's more visible
         self.max_glow = 1.0
         self.glow_base_size = 350  # 400x400 on original image scale
         self.glow_base_intensity = 0.3  # Always-on base glow
@@ -180,10 +351,26 @@ class SamuraiPNGTuber:
         self.last_volume = 0
         self.frame_count = 0
         
+        # Audio levels from the audio thread, applied on the render thread at frame start
+        self.audio_levels = queue.SimpleQueue()
+        
         # UI toggle
         self.show_ui = False
-        
-        # Initialize audio
+        self.text_cache = TextCache(registry=self.caches)  # Fonts, rendered overlay text and number glyphs
+        
+        # Initialize audio (microphone by default; see audio_sources for the alternatives)
+        if audio_process is None:
+            audio_process = config.get('audio_process', False)
+        if not isinstance(audio_source, AudioSource):
+            if audio_process:
+                # Capture and analysis in a child process, read from shared memory each frame
+                audio_source = ProcessAudioSource(audio_source or 'mic', self.audio_device_index,
+                                                  rate=self.audio_rate, chunk=self.audio_chunk,
+                                                  threshold=self.audio_threshold)
+            else:
+                audio_source = make_audio_source(audio_source, self.audio_device_index,
+                                                 rate=self.audio_rate, chunk=self.audio_chunk)
+        self.audio_source = audio_source
         self.init_audio()
         
         # Clock for FPS
@@ -192,58 +379,203 @@ class SamuraiPNGTuber:
         
         # Key states for combo detection
         self.keys_pressed = set()
-    
-    def load_config(self):
-        """Load configuration from JSON file"""
-        try:
-            if self.config_path.exists():
-                with open(self.config_path, 'r') as f:
-                    config = json.load(f)
-                    print(f"Loaded config from {self.config_path}")
-                    return config
-        except Exception as e:
-            print(f"Could not load config: {e}")
         
-        # Return defaults if config doesn't exist or fails to load
+        # Per-stage draw timings in ms (reported in stats)
+        self.stage_times = {}
+        
+        # Layered scene rendering with per-layer caching (or drawn by the SDL2 renderer)
+        layers = build_avatar_layers(self.render_scales, self.effects.plugins.values())
+        if self.textures:
+            self.compositor = TextureCompositor(layers, self.textures)
+        else:
+            self.compositor = Compositor(layers)
+        
+        # Optional per-stage allocation / GC instrumentation (--alloc-stats), reported on exit
+        self.alloc_stats_path = alloc_stats_path
+        self.alloc_tracker = AllocationTracker() if alloc_stats_path else None
+        self.compositor.alloc_tracker = self.alloc_tracker
+        self.pose = None
+        
+        # Optional local control server (stream deck / scripts)
+        self.control_server = None
+        if control_port is not None:
+            self.control_server = ControlServer(port=control_port)
+            if not self.control_server.start():
+                self.control_server = None
+        
+        # Optional session recording (seeds, keys, audio levels, frame timing)
+        self.recorder = None
+        if record_path:
+            self.recorder = SessionRecorder(record_path, self.seed, self.chaos_seed,
+                                            self.session_state(), record_checksums)
+        
+        # Local video recording (V to start/stop): frames are encoded by ffmpeg on a background thread
+        self.video_dir = video_dir  # None disables recording (e.g. session replay)
+        self.video_buffers = video_buffers
+        self.video_drop = video_drop
+        self.ffmpeg = ffmpeg
+        self.video_recorder = None
+        
+        # Optional shared-memory frame output for compositors (replaces window capture)
+        self.frame_output = None
+        if frame_output:
+            try:
+                self.frame_output = FrameWriter(frame_output, self.width, self.height, frame_slots)
+            except Exception as e:
+                print(f"Warning: Could not start frame output: {e}")
+        
+        # Hot reload of edited artwork (not while recording a session: reloads aren't replayable)
+        self.asset_watcher = None
+        hot_reload = config.get('hot_reload', {})
+        if watch_assets and hot_reload.get('enabled', True) and not record_path:
+            self.start_asset_watcher(hot_reload.get('interval', 1.0))
+        
+        # Start warming caches in idle frame time
+        self.schedule_warmup()
+        if self.warm_effect_caches:
+            self.jobs.submit(('explosions',), self.warm_explosion_cache)
+            self.jobs.submit(('emojis',), self.warm_emoji_cache)
+    
+    def create_canvas(self):
+        """Create the surface the scene is drawn into (screen, or RGBA framebuffer when transparent)"""
+        if self.transparent:
+            self.canvas = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        else:
+            self.canvas = self.screen
+    
+    def export_frame(self):
+        """Get the finished frame for output (premultiplied alpha in transparent mode)"""
+        if not self.transparent:
+            return self.screen, None
+        if self.premultiplied:
+            return self.canvas.premul_alpha(), self.alpha_format('a')
+        return self.canvas, self.alpha_format('A')
+    
+    def alpha_format(self, alpha_code):
+        """Pixel format code for the framebuffer, 'a' marking premultiplied alpha"""
+        return surface_pixel_format(self.canvas).replace(b'A', alpha_code.encode())
+    
+    def session_state(self):
+        """Starting scene stored in session recordings"""
+        return {
+            'viewport': self.current_viewport,
+            'viewports': self.custom_viewports,
+            'zoom': self.current_zoom,
+            'zoom_transition': self.zoom_transition,
+            'background': self.current_background,
+            'viewport_x_offset': self.viewport_x_offset,
+            'viewport_y_offset': self.viewport_y_offset,
+            'fps': self.target_fps,
+            'profiles': self.scene_profiles,
+            'transparent': self.transparent
+        }
+    
+    def default_config(self):
+        """Default configuration used when no config file exists"""
         return {
             'viewport': 0,
             'zoom': 4,  # Z+5: face1 - good default zoom
+            'zoom_transition': 0.35,
             'background': 1,
             'viewport_x_offset': 0,
             'viewport_y_offset': 0,
-            'audio_device_index': None
+            'audio_device_index': None,
+            'fps': 60,
+            'render_scales': {'background': 1.0, 'psychedelic': 1.0},
+            'chaos_particles': {'mode': 'classic', 'swarm_size': 2000, 'neighbor_radius': 40, 'cell_size': None},
+            'chaos_voronoi': {'mode': 'classic', 'seeds': 256, 'resolution': 4, 'edges': False},
+            'psychedelic_loops': {'enabled': True, 'memory_mb': 64},
+            'cache_budget_mb': 512,
+            'jobs': {'budget_ms': 4, 'threads': 1, 'warm_effects': True, 'warm_chaos': False},
+            'effects': {'over_budget': 'warn', 'grace_frames': 60, 'budgets_ms': {}, 'plugin_dirs': []},
+            'hot_reload': {'enabled': True, 'interval': 1.0},
+            'audio_process': False,
+            'renderer': {'backend': 'surface', 'driver': None},
+            'viewports': [],
+            'window': {'resizable': True, 'resize_debounce_ms': 250, 'resize_warm_ms': 500},
+            'profiles': {}
         }
     
+    def load_config(self):
+        """Load configuration (defaults merged with the saved JSON file)"""
+        return self.config_store.snapshot()
+    
     def save_config(self):
-        """Save current configuration to JSON file"""
-        try:
-            config = {
-                'viewport': self.current_viewport,
-                'zoom': self.current_zoom,
-                'background': self.current_background,
-                'viewport_x_offset': self.viewport_x_offset,
-                'viewport_y_offset': self.viewport_y_offset,
-                'audio_device_index': self.audio_device_index
-            }
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-        except Exception as e:
-            print(f"Could not save config: {e}")
+        """Save current configuration (debounced, written off the render thread)"""
+        self.config_store.update({
+            'viewport': self.current_viewport,
+            'zoom': self.current_zoom,
+            'background': self.current_background,
+            'viewport_x_offset': self.viewport_x_offset,
+            'viewport_y_offset': self.viewport_y_offset,
+            'audio_device_index': self.audio_device_index,
+            'fps': self.target_fps,
+            'render_scales': self.render_scales,
+            'profiles': self.scene_profiles
+        })
+    
+    def save_profile(self, slot):
+        """Save the current scene (viewport, zoom, background, effects, offsets) to a profile slot"""
+        key = str(slot)
+        name = self.scene_profiles.get(key, {}).get('name', f"Scene {slot}")
+        self.scene_profiles = dict(self.scene_profiles)
+        self.scene_profiles[key] = {
+            'name': name,
+            'viewport': self.current_viewport,
+            'zoom': self.current_zoom,
+            'background': self.current_background,
+            'effects': self.effects.slots(),
+            'viewport_x_offset': self.viewport_x_offset,
+            'viewport_y_offset': self.viewport_y_offset
+        }
+        print(f"💾 Saved profile {slot}: {name}")
+        self.save_config()
+    
+    def apply_profile(self, slot):
+        """Switch to a saved scene profile"""
+        profile = self.scene_profiles.get(str(slot))
+        if not profile:
+            print(f"No profile saved in slot {slot} (Shift+P+{slot} to save)")
+            return
+        
+        print(f"🎬 Switching to profile {slot}: {profile.get('name', f'Scene {slot}')}")
+        if profile.get('viewport', self.current_viewport) != self.current_viewport:
+            self.change_viewport(profile['viewport'])
+        self.change_zoom(profile.get('zoom', self.current_zoom))
+        self.change_background(profile.get('background', self.current_background))
+        self.viewport_x_offset = profile.get('viewport_x_offset', self.viewport_x_offset)
+        self.viewport_y_offset = profile.get('viewport_y_offset', self.viewport_y_offset)
+        
+        # Toggle effects until exactly the profile's are on (older profiles stored a single 'effect')
+        effects = profile.get('effects')
+        if effects is None:
+            effects = [profile['effect']] if profile.get('effect') else []
+        for slot in self.effects.slots():
+            if slot not in effects:
+                self.activate_effect(slot)
+        for slot in effects:
+            if slot not in self.effects.slots():
+                self.activate_effect(slot)
+        self.save_config()
         
     def load_image(self):
         """Load and prepare the samurai image"""
-        pil_image = Image.open(self.image_path)
-        self.original_width, self.original_height = pil_image.size
+        self.original_image = self.decode_avatar(self.image_path).convert_alpha()
+        self.original_width, self.original_height = self.original_image.get_size()
+        self.avatar_version = 0  # Bumped on hot reload (part of the character layer's cache key)
+        self.mipmaps = MipPyramid(self.original_image)  # Halving levels that zoom transitions scale from
+        
+        print(f"Loaded image: {self.original_width}x{self.original_height}")
+    
+    def decode_avatar(self, path):
+        """Decode the samurai image (no display conversion, so it can run off the render thread)"""
+        pil_image = Image.open(path)
         
         # Convert PIL image to pygame surface
         mode = pil_image.mode
         size = pil_image.size
         data = pil_image.tobytes()
-        
-        self.original_image = pygame.image.fromstring(data, size, mode)
-        self.original_image = self.original_image.convert_alpha()
-        
-        print(f"Loaded image: {self.original_width}x{self.original_height}")
+        return pygame.image.fromstring(data, size, mode)
     
     def load_explosion_sprites(self):
         """Load and split explosion sprite sheet into individual frames"""
@@ -271,9 +603,11 @@ class SamuraiPNGTuber:
         emoji_paths = glob.glob(str(emoji_dir / "*.png"))
         
         self.emoji_images = []
+        self.emoji_indices = {}  # File name -> index in emoji_images (for hot reload)
         for emoji_path in emoji_paths:
             try:
                 emoji = pygame.image.load(emoji_path).convert_alpha()
+                self.emoji_indices[Path(emoji_path).name] = len(self.emoji_images)
                 self.emoji_images.append(emoji)
                 print(f"Loaded emoji: {Path(emoji_path).name}")
             except Exception as e:
@@ -301,8 +635,16 @@ class SamuraiPNGTuber:
             'tourian01': 'tourian01.png'
         }
         
+        # Any other images in bg/ go in extra slots after B+9 (B+0 cycles through them)
+        self.background_files = {filename: key for key, filename in bg_files.items()}
+        self.background_slots = dict(self.background_image_names)
+        for bg_path in sorted(bg_dir.glob("*.png")):
+            if bg_path.name not in self.background_files:
+                self.add_background_slot(bg_path.name)
+        self.background_version = 0  # Bumped on hot reload (part of the background layer's cache key)
+        
         # Load each background
-        for key, filename in bg_files.items():
+        for filename, key in self.background_files.items():
             bg_path = bg_dir / filename
             try:
                 if bg_path.exists():
@@ -314,381 +656,258 @@ class SamuraiPNGTuber:
                 print(f"Warning: Could not load {filename}: {e}")
         
         print(f"Total backgrounds loaded: {len(self.bg_images)}")
-        
+    
+    def add_background_slot(self, filename):
+        """Give an extra background image the next slot after B+9; returns the slot"""
+        slot = max(10, max(self.background_slots) + 1)
+        self.background_files[filename] = filename
+        self.background_slots[slot] = filename
+        return slot
+    
+    def start_asset_watcher(self, interval):
+        """Watch the avatar, background and emoji images and reload them when they change"""
+        root = Path(__file__).parent
+        watches = [('avatar', self.image_path.parent, self.image_path.name),
+                   ('background', root / "bg", "*.png"),
+                   ('emoji', root / "emoji", "*.png")]
+        self.asset_watcher = AssetWatcher(watches, self.decode_asset, interval)
+        self.asset_watcher.start()
+    
+    def decode_asset(self, kind, path):
+        """Watcher thread: decode a changed file (display conversion happens when it's swapped in)"""
+        if kind == 'avatar':
+            return self.decode_avatar(path)
+        return pygame.image.load(str(path))
+    
+    def apply_asset_changes(self):
+        """Swap in images the watcher decoded, between frames, dropping only what was built from the old ones"""
+        if not self.asset_watcher:
+            return
+        for change in self.asset_watcher.drain():
+            if change.kind == 'avatar':
+                self.swap_avatar(change.image)
+            elif change.kind == 'background':
+                self.swap_background(change.path.name, change.image)
+            elif change.kind == 'emoji':
+                self.swap_emoji(change.path.name, change.image)
+    
+    def swap_avatar(self, image):
+        """Replace the samurai image and its scaled copies"""
+        self.original_image = image.convert_alpha()
+        self.original_width, self.original_height = self.original_image.get_size()
+        self.image_center_original = (self.original_width // 2, self.original_height // 2)
+        self.sprite_cache.clear()
+        if self.textures:
+            for level in self.mipmaps.levels:
+                self.textures.forget(level)
+        self.mipmaps = MipPyramid(self.original_image)
+        self.avatar_version += 1
+        self.schedule_warmup()
+        print(f"🔄 Reloaded avatar: {self.original_width}x{self.original_height}")
+    
+    def swap_background(self, filename, image):
+        """Replace a background image (or add a new one in the next extra slot)"""
+        key = self.background_files.get(filename)
+        if key is None:
+            slot = self.add_background_slot(filename)
+            key = filename
+            print(f"🖼️ New background {filename} in slot {slot} (B+0 to cycle extra backgrounds)")
+        else:
+            old = self.bg_images.get(key)
+            if old is not None:
+                self.background_cache.discard_if(lambda cache_key: cache_key[0] is old)
+            print(f"🔄 Reloaded background: {filename}")
+        self.bg_images[key] = image.convert()
+        self.background_version += 1
+        self.schedule_warmup()
+    
+    def swap_emoji(self, filename, image):
+        """Replace an emoji image (or add a new one to the party)"""
+        image = image.convert_alpha()
+        index = self.emoji_indices.get(filename)
+        if index is None:
+            self.emoji_indices[filename] = len(self.emoji_images)
+            self.emoji_images.append(image)
+            print(f"🎉 New emoji: {filename} ({len(self.emoji_images)} total)")
+        else:
+            if self.textures:
+                self.textures.forget(self.emoji_images[index])
+            self.emoji_images[index] = image
+            self.emoji_cache.discard_if(lambda key: key[0] == index)
+            print(f"🔄 Reloaded emoji: {filename}")
+        if self.warm_effect_caches:
+            self.jobs.cancel(('emojis',))
+            self.jobs.submit(('emojis',), self.warm_emoji_cache)
+    
     def init_audio(self):
-        """Initialize PyAudio for microphone input"""
-        try:
-            self.audio = pyaudio.PyAudio()
-            
-            # If device index specified, get device info
-            if self.audio_device_index is not None:
-                device_info = self.audio.get_device_info_by_index(self.audio_device_index)
-                print(f"Using audio device: {device_info['name']} (index {self.audio_device_index})")
-            else:
-                print("Using default audio input device")
+        """Start the audio source (levels arrive on its thread)"""
+        if not self.audio_source.start(self.on_audio_level):
+            print("Continuing without audio")
+    
+    def on_audio_level(self, volume):
+        """Audio thread: queue a voice-activity level for the render thread"""
+        self.last_volume = volume
+        self.audio_levels.put(volume)
+    
+    def process_audio_levels(self):
+        """Apply audio levels queued by the audio thread or published by the audio process (once per frame)"""
+        levels = self.audio_source.poll()
+        while True:
+            try:
+                levels.append(self.audio_levels.get_nowait())
+            except queue.Empty:
+                break
+        for volume in levels:
+            if self.recorder:
+                self.recorder.audio(volume)
+            self.apply_audio_level(volume)
+    
+    def apply_audio_level(self, volume):
+        """Update glow intensity and rock intensity based on volume"""
+        self.last_volume = volume
+        if volume > self.audio_threshold:
+            intensity = min(self.max_glow, volume / 2000)
+            self.glow_intensity = intensity
+            self.rock_intensity = intensity  # Same intensity for rocking
             
-            self.audio_stream = self.audio.open(
-                format=self.audio_format,
-                channels=self.audio_channels,
-                rate=self.audio_rate,
-                input=True,
-                input_device_index=self.audio_device_index,
-                frames_per_buffer=self.audio_chunk,
-                stream_callback=self.audio_callback
-            )
-            self.audio_stream.start_stream()
-            print("Audio initialized successfully")
-        except Exception as e:
-            print(f"Warning: Could not initialize audio: {e}")
-            self.audio = None
-            self.audio_stream = None
+            # Log when glow is triggered (every 30 frames to avoid spam)
+            if self.frame_count % 30 == 0:
+                print(f"🎤 Audio detected! Volume: {volume:.0f}, Glow: {self.glow_intensity:.2f}")
+    
+    def process_control_commands(self):
+        """Apply commands queued by the control server (once per frame, never blocks)"""
+        if not self.control_server:
+            return []
+        
+        commands = self.control_server.drain()
+        for command in commands:
+            command.result = self.dispatch_command(command.name, command.args, command.kwargs)
+        return commands
     
-    def audio_callback(self, in_data, frame_count, time_info, status):
-        """Process audio input to detect voice activity"""
+    def dispatch_command(self, name, args, kwargs):
+        """Run one control command; returns an error string or None"""
+        handler = self.control_commands().get(name)
+        if handler is None:
+            return f"unknown command: {name}"
+        if self.recorder:
+            self.recorder.command(name, args, kwargs)
         try:
-            audio_data = np.frombuffer(in_data, dtype=np.int16)
-            volume = np.abs(audio_data).mean()
-            self.last_volume = volume
-            
-            # Update glow intensity and rock intensity based on volume
-            if volume > self.audio_threshold:
-                intensity = min(self.max_glow, volume / 2000)
-                self.glow_intensity = intensity
-                self.rock_intensity = intensity  # Same intensity for rocking
-                
-                # Log when glow is triggered (every 30 frames to avoid spam)
-                if self.frame_count % 30 == 0:
-                    print(f"🎤 Audio detected! Volume: {volume:.0f}, Glow: {self.glow_intensity:.2f}")
-            
+            handler(*args, **kwargs)
         except Exception as e:
-            print(f"Audio callback error: {e}")
-        
-        return (in_data, pyaudio.paContinue)
+            return str(e)
+        return None
     
-    def activate_effect(self, effect_number):
-        """Activate or toggle an effect"""
-        # If same effect is already active, deactivate it
-        if self.current_effect == effect_number:
-            print(f"Deactivating effect {effect_number}")
-            self.current_effect = None
-            self.active_explosions.clear()
-            self.active_emojis.clear()
-        else:
-            # Deactivate current effect and activate new one
-            if self.current_effect is not None:
-                print(f"Stopping effect {self.current_effect}")
-                self.active_explosions.clear()
-                self.active_emojis.clear()
-            
-            print(f"Activating effect {effect_number}")
-            self.current_effect = effect_number
-            
-            # Initialize effect-specific state
-            if effect_number == 1:
-                self.effect1_red_phase = 0.0  # Phase for oscillation
-                self.effect1_explosion_timer = 0
-            elif effect_number == 2:
-                self.effect2_spawn_timer = 0
-                # Spawn initial emojis
-                for _ in range(10):
-                    self.spawn_emoji()
-            elif effect_number == 3:
-                self.effect3_hue_offset = 0.0
-                self.effect3_time = 0
-                self.effect3_pattern_index = 0
-                self.effect3_pattern_timer = 0
-                print("🌈 PSYCHEDELIC MODE ACTIVATED - NEON DREAMS ENGAGED! 🌈")
-    
-    def update_effects(self):
-        """Update active effects each frame"""
-        if self.current_effect == 1:
-            self.update_effect_1()
-        elif self.current_effect == 2:
-            self.update_effect_2()
-        elif self.current_effect == 3:
-            self.update_effect_3()
-    
-    def update_effect_1(self):
-        """Update Effect 1: Rage mode with red tint and explosions"""
-        # Oscillate red tint slowly (sine wave for smooth oscillation)
-        self.effect1_red_phase += 0.015  # Slower oscillation speed
-        # Use sine wave to oscillate between 0.3 (light red) and 1.0 (dark red)
-        self.effect1_red_intensity = 0.65 + 0.35 * math.sin(self.effect1_red_phase)
-        
-        # Spawn explosions randomly - MORE EXPLOSIONS!
-        self.effect1_explosion_timer += 1
-        if self.effect1_explosion_timer >= 4:  # Spawn every 4 frames (twice as fast!)
-            self.effect1_explosion_timer = 0
-            
-            # Spawn 1-2 explosions per spawn cycle
-            num_explosions = random.randint(1, 2)
-            for _ in range(num_explosions):
-                # Random position on screen
-                x = random.randint(0, self.width)
-                y = random.randint(0, self.height)
-                
-                # Random size (50% to 150% of original)
-                scale = random.uniform(0.5, 1.5)
-                
-                explosion = {
-                    'x': x,
-                    'y': y,
-                    'frame': 0,
-                    'scale': scale
-                }
-                self.active_explosions.append(explosion)
-        
-        # Update all explosions
-        for explosion in self.active_explosions[:]:
-            explosion['frame'] += 0.5  # Animate through frames quickly
-            if explosion['frame'] >= len(self.explosion_frames):
-                self.active_explosions.remove(explosion)
-    
-    def spawn_emoji(self):
-        """Spawn a new emoji with random properties"""
-        if not self.emoji_images:
-            return
-        
-        # Random emoji from loaded images
-        emoji_image = random.choice(self.emoji_images)
-        
-        # Random size between min and max
-        size = random.randint(self.emoji_min_size, self.emoji_max_size)
-        
-        # Random starting position (anywhere on screen)
-        x = random.randint(0, self.width)
-        y = random.randint(0, self.height)
-        
-        # Random velocity (speed and direction)
-        vx = random.uniform(-5, 5)
-        vy = random.uniform(-5, 5)
-        
-        # Random rotation speed (degrees per frame)
-        rotation_speed = random.uniform(-5, 5)
-        
-        # Random flip
-        flip_x = random.choice([True, False])
-        flip_y = random.choice([True, False])
-        
-        emoji = {
-            'image': emoji_image,
-            'x': x,
-            'y': y,
-            'vx': vx,
-            'vy': vy,
-            'size': size,
-            'rotation': 0,
-            'rotation_speed': rotation_speed,
-            'flip_x': flip_x,
-            'flip_y': flip_y
+    def control_commands(self):
+        """Commands accepted from the control server"""
+        return {
+            'change_zoom': self.change_zoom,
+            'zoom_by': self.zoom_by,
+            'change_viewport': self.change_viewport,
+            'change_background': self.change_background,
+            'activate_effect': self.activate_effect,
+            'move_offset': self.move_offset,
+            'reset_offset': lambda: self.move_offset(-self.viewport_x_offset, -self.viewport_y_offset),
+            'apply_profile': self.apply_profile,
+            'set_render_scale': self.set_render_scale,
+            'toggle_video_recording': self.toggle_video_recording,
+            'dump_caches': self.caches.dump,
+            'toggle_ui': lambda: setattr(self, 'show_ui', not self.show_ui),
+            'quit': lambda: setattr(self, 'running', False)
         }
-        
-        self.active_emojis.append(emoji)
-    
-    def update_effect_2(self):
-        """Update Effect 2: Emoji Party with bouncing emojis"""
-        # Spawn new emojis periodically
-        self.effect2_spawn_timer += 1
-        if self.effect2_spawn_timer >= 30 and len(self.active_emojis) < 20:  # Keep max 20 emojis
-            self.effect2_spawn_timer = 0
-            self.spawn_emoji()
-        
-        # Update all emojis
-        for emoji in self.active_emojis[:]:
-            # Update position
-            emoji['x'] += emoji['vx']
-            emoji['y'] += emoji['vy']
-            
-            # Bounce off edges
-            if emoji['x'] - emoji['size'] // 2 < 0 or emoji['x'] + emoji['size'] // 2 > self.width:
-                emoji['vx'] *= -1
-                emoji['x'] = max(emoji['size'] // 2, min(self.width - emoji['size'] // 2, emoji['x']))
-            
-            if emoji['y'] - emoji['size'] // 2 < 0 or emoji['y'] + emoji['size'] // 2 > self.height:
-                emoji['vy'] *= -1
-                emoji['y'] = max(emoji['size'] // 2, min(self.height - emoji['size'] // 2, emoji['y']))
-            
-            # Update rotation
-            emoji['rotation'] += emoji['rotation_speed']
-            emoji['rotation'] %= 360
-    
-    def update_effect_3(self):
-        """Update Effect 3: Psychedelic color transformation"""
-        # Smoothly cycle through hue spectrum
-        self.effect3_hue_offset += 2.0  # Degrees per frame
-        self.effect3_hue_offset %= 360
-        
-        # Increment time for wave patterns
-        self.effect3_time += 1
-        
-        # Cycle through patterns
-        self.effect3_pattern_timer += 1
-        if self.effect3_pattern_timer >= self.effect3_pattern_duration:
-            self.effect3_pattern_timer = 0
-            self.effect3_pattern_index = (self.effect3_pattern_index + 1) % 8  # 8 different patterns
-            pattern_names = ["Horizontal Waves", "Vertical Waves", "Diagonal Scan", "Radial Burst", 
-                           "Checkerboard", "Glitch Bars", "Spiral", "Plasma"]
-            print(f"🌈 Pattern switched to: {pattern_names[self.effect3_pattern_index]}")
-    
-    def apply_red_tint(self, surface):
-        """Apply red tint overlay to a surface"""
-        if self.current_effect == 1 and self.effect1_red_intensity > 0:
-            # Create a red overlay
-            red_overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
-            alpha = int(self.effect1_red_intensity * 150)  # Max 150 alpha for red tint
-            red_overlay.fill((255, 0, 0, alpha))
-            surface.blit(red_overlay, (0, 0))
-        return surface
-    
-    def apply_psychedelic_effect(self, surface):
-        """Apply psychedelic color transformation to a surface (Effect 3)"""
-        if self.current_effect != 3:
-            return surface
-        
-        # Create a copy to avoid modifying original
-        width, height = surface.get_size()
-        effect_surface = surface.copy()
-        
-        # Base color layers (always applied)
-        overlay1 = pygame.Surface((width, height), pygame.SRCALPHA)
-        hue = self.effect3_hue_offset
-        color1 = self.hsv_to_rgb(hue, 0.6, 1.0)
-        overlay1.fill((*color1, 80))
-        effect_surface.blit(overlay1, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
-        
-        # Apply pattern-specific effects
-        pattern_surface = pygame.Surface((width, height), pygame.SRCALPHA)
-        
-        if self.effect3_pattern_index == 0:
-            # Horizontal Waves (original)
-            for y in range(0, height, 4):
-                wave_offset = math.sin((y * 0.02) + (self.effect3_time * 0.05))
-                wave_hue = (self.effect3_hue_offset + wave_offset * 60) % 360
-                wave_color = self.hsv_to_rgb(wave_hue, 0.8, 0.9)
-                wave_alpha = int(abs(wave_offset) * 40)
-                pygame.draw.line(pattern_surface, (*wave_color, wave_alpha), 
-                               (0, y), (width, y), 4)
-        
-        elif self.effect3_pattern_index == 1:
-            # Vertical Waves
-            for x in range(0, width, 4):
-                wave_offset = math.sin((x * 0.02) + (self.effect3_time * 0.05))
-                wave_hue = (self.effect3_hue_offset + wave_offset * 60) % 360
-                wave_color = self.hsv_to_rgb(wave_hue, 0.8, 0.9)
-                wave_alpha = int(abs(wave_offset) * 40)
-                pygame.draw.line(pattern_surface, (*wave_color, wave_alpha), 
-                               (x, 0), (x, height), 4)
-        
-        elif self.effect3_pattern_index == 2:
-            # Diagonal Scan Lines
-            for i in range(-height, width, 8):
-                offset = (i + self.effect3_time * 2) % (width + height)
-                wave_hue = (self.effect3_hue_offset + (offset * 0.5)) % 360
-                wave_color = self.hsv_to_rgb(wave_hue, 0.9, 1.0)
-                pygame.draw.line(pattern_surface, (*wave_color, 60), 
-                               (offset, 0), (offset - height, height), 3)
-        
-        elif self.effect3_pattern_index == 3:
-            # Radial Burst
-            center_x, center_y = width // 2, height // 2
-            for angle in range(0, 360, 10):
-                angle_rad = math.radians(angle + self.effect3_time * 2)
-                radius = min(width, height)
-                end_x = center_x + math.cos(angle_rad) * radius
-                end_y = center_y + math.sin(angle_rad) * radius
-                wave_hue = (self.effect3_hue_offset + angle) % 360
-                wave_color = self.hsv_to_rgb(wave_hue, 0.8, 0.9)
-                pygame.draw.line(pattern_surface, (*wave_color, 50), 
-                               (center_x, center_y), (end_x, end_y), 2)
-        
-        elif self.effect3_pattern_index == 4:
-            # Checkerboard
-            checker_size = 20
-            for y in range(0, height, checker_size):
-                for x in range(0, width, checker_size):
-                    if ((x // checker_size) + (y // checker_size) + (self.effect3_time // 10)) % 2:
-                        checker_hue = (self.effect3_hue_offset + x + y) % 360
-                        checker_color = self.hsv_to_rgb(checker_hue, 0.7, 0.8)
-                        pygame.draw.rect(pattern_surface, (*checker_color, 70), 
-                                       (x, y, checker_size, checker_size))
-        
-        elif self.effect3_pattern_index == 5:
-            # Glitch Bars
-            for i in range(10):
-                bar_y = (i * height // 10 + self.effect3_time * (i % 3 + 1)) % height
-                bar_height = random.randint(10, 40)
-                bar_hue = (self.effect3_hue_offset + i * 36) % 360
-                bar_color = self.hsv_to_rgb(bar_hue, 1.0, 1.0)
-                pygame.draw.rect(pattern_surface, (*bar_color, 80), 
-                               (0, bar_y, width, bar_height))
-        
-        elif self.effect3_pattern_index == 6:
-            # Spiral
-            center_x, center_y = width // 2, height // 2
-            for i in range(0, 360, 5):
-                angle = math.radians(i + self.effect3_time * 3)
-                radius = (i / 360.0) * min(width, height) // 2
-                x = center_x + math.cos(angle) * radius
-                y = center_y + math.sin(angle) * radius
-                spiral_hue = (self.effect3_hue_offset + i) % 360
-                spiral_color = self.hsv_to_rgb(spiral_hue, 0.9, 1.0)
-                if i > 0:
-                    prev_angle = math.radians(i - 5 + self.effect3_time * 3)
-                    prev_radius = ((i - 5) / 360.0) * min(width, height) // 2
-                    prev_x = center_x + math.cos(prev_angle) * prev_radius
-                    prev_y = center_y + math.sin(prev_angle) * prev_radius
-                    pygame.draw.line(pattern_surface, (*spiral_color, 60), 
-                                   (prev_x, prev_y), (x, y), 3)
-        
-        elif self.effect3_pattern_index == 7:
-            # Plasma Effect
-            for y in range(0, height, 6):
-                for x in range(0, width, 6):
-                    plasma_val = math.sin(x * 0.02 + self.effect3_time * 0.05)
-                    plasma_val += math.sin(y * 0.02 + self.effect3_time * 0.05)
-                    plasma_val += math.sin((x + y) * 0.01 + self.effect3_time * 0.05)
-                    plasma_hue = (self.effect3_hue_offset + plasma_val * 50) % 360
-                    plasma_color = self.hsv_to_rgb(plasma_hue, 0.8, 0.9)
-                    plasma_alpha = int((plasma_val + 3) / 6 * 60)
-                    pygame.draw.rect(pattern_surface, (*plasma_color, plasma_alpha), 
-                                   (x, y, 6, 6))
-        
-        effect_surface.blit(pattern_surface, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
-        
-        return effect_surface
-    
-    def draw_explosions(self):
-        """Draw all active explosions"""
-        for explosion in self.active_explosions:
-            frame_index = int(explosion['frame'])
-            if 0 <= frame_index < len(self.explosion_frames):
-                frame = self.explosion_frames[frame_index]
-                
-                # Scale the explosion
-                if explosion['scale'] != 1.0:
-                    new_width = int(frame.get_width() * explosion['scale'])
-                    new_height = int(frame.get_height() * explosion['scale'])
-                    frame = pygame.transform.smoothscale(frame, (new_width, new_height))
-                
-                # Center the explosion at its position
-                rect = frame.get_rect(center=(explosion['x'], explosion['y']))
-                self.screen.blit(frame, rect)
-    
-    def draw_emojis(self):
-        """Draw all active emojis with rotation and flipping"""
-        for emoji in self.active_emojis:
-            # Scale emoji to desired size
-            scaled_emoji = pygame.transform.smoothscale(emoji['image'], (emoji['size'], emoji['size']))
-            
-            # Apply flipping
-            scaled_emoji = pygame.transform.flip(scaled_emoji, emoji['flip_x'], emoji['flip_y'])
-            
-            # Apply rotation
-            rotated_emoji = pygame.transform.rotate(scaled_emoji, emoji['rotation'])
-            
-            # Center the emoji at its position
-            rect = rotated_emoji.get_rect(center=(int(emoji['x']), int(emoji['y'])))
-            self.screen.blit(rotated_emoji, rect)
+    
+    def move_offset(self, dx=0, dy=0):
+        """Move the Samus + visor position offset"""
+        self.viewport_x_offset += dx
+        self.viewport_y_offset += dy
+        print(f"Position offset: X={self.viewport_x_offset}, Y={self.viewport_y_offset}")
+        self.save_config()
+    
+    def frame_stats(self):
+        """Per-frame stats streamed to control server subscribers"""
+        return {
+            'frame': self.frame_count,
+            'fps': round(self.clock.get_fps(), 2),
+            'stages': {name: round(ms, 3) for name, ms in self.stage_times.items()},
+            'audio_level': float(self.last_volume),
+            'audio': self.audio_source.stats(),
+            'glow': round(self.glow_base_intensity + self.glow_intensity, 3),
+            'layers': self.compositor.stats(),
+            'render': {
+                'backend': self.renderer_backend,
+                'cpu_ms': round(self.render_cpu_ms, 3),
+                'mean_cpu_ms': round(self.render_cpu_total / self.frame_count, 3) if self.frame_count else 0.0
+            },
+            'window': {'size': [self.width, self.height], 'resizable': self.resizable,
+                       'pending_resize': list(self.pending_resize) if self.pending_resize else None,
+                       'resize_events': self.resize_events, 'resizes': self.resizes},
+            'zoom': {'position': round(self.shown_zoom(), 3), 'target': self.current_zoom,
+                     'mipmaps': self.mipmaps.stats()},
+            'text_cache': self.text_cache.stats(),
+            'effects': self.effects.stats(),
+            'caches': self.caches.stats(),
+            'jobs': self.jobs.stats(),
+            'assets': self.asset_watcher.stats() if self.asset_watcher else None,
+            'allocations': self.alloc_tracker.last_frame() if self.alloc_tracker else None,
+            'video': self.video_recorder.stats() if self.video_recorder else None
+        }
+    
+    def activate_effect(self, effect_number):
+        """Toggle the effect plugin in slot effect_number (E+N); other active effects keep running"""
+        if not self.effects.toggle(effect_number):
+            print(f"No effect in slot {effect_number}")
+    
+    def get_explosion_frame(self, frame_index, scale):
+        """Explosion frame at a (quantized) scale, scaled once and cached"""
+        frame = self.explosion_cache.get((frame_index, scale))
+        if frame is None:
+            frame = self.scale_explosion_frame(frame_index, scale)
+        return frame
+    
+    def scale_explosion_frame(self, frame_index, scale):
+        """Scale an explosion frame into the cache"""
+        start = time.perf_counter()
+        frame = self.explosion_frames[frame_index]
+        if scale != 1.0:
+            new_width = int(frame.get_width() * scale)
+            new_height = int(frame.get_height() * scale)
+            frame = pygame.transform.smoothscale(frame, (new_width, new_height))
+        return self.explosion_cache.put((frame_index, scale), frame, (time.perf_counter() - start) * 1000)
+    
+    def warm_explosion_cache(self):
+        """Job: scale every explosion frame at every spawn scale, one per slice"""
+        steps = round(1 / self.explosion_scale_step)
+        for scale_steps in range(steps // 2, steps * 3 // 2 + 1):  # Spawn scales 0.5 to 1.5
+            scale = scale_steps * self.explosion_scale_step
+            for frame_index in range(len(self.explosion_frames)):
+                if (frame_index, scale) not in self.explosion_cache:
+                    self.scale_explosion_frame(frame_index, scale)
+                    yield
+    
+    def get_emoji_image(self, image_index, size, flip_x, flip_y):
+        """Emoji scaled to size and flipped, built once and cached"""
+        image = self.emoji_cache.get((image_index, size, flip_x, flip_y))
+        if image is None:
+            image = self.scale_emoji(image_index, size, flip_x, flip_y)
+        return image
+    
+    def scale_emoji(self, image_index, size, flip_x, flip_y):
+        """Scale and flip an emoji into the cache (flipped copies start from the unflipped one if cached)"""
+        start = time.perf_counter()
+        image = self.emoji_cache.peek((image_index, size, False, False))
+        if image is None:
+            image = pygame.transform.smoothscale(self.emoji_images[image_index], (size, size))
+        if flip_x or flip_y:
+            image = pygame.transform.flip(image, flip_x, flip_y)
+        return self.emoji_cache.put((image_index, size, flip_x, flip_y), image,
+                                    (time.perf_counter() - start) * 1000)
+    
+    def warm_emoji_cache(self):
+        """Job: scale every emoji at every spawn size, one per slice"""
+        for image_index in range(len(self.emoji_images)):
+            for size in range(self.emoji_min_size, self.emoji_max_size + 1):
+                if (image_index, size, False, False) not in self.emoji_cache:
+                    self.scale_emoji(image_index, size, False, False)
+                    yield
     
     def hsv_to_rgb(self, h, s, v):
         """Convert HSV color to RGB (values 0-1)"""
@@ -696,77 +915,103 @@ class SamuraiPNGTuber:
         r, g, b = colorsys.hsv_to_rgb(h, s, v)
         return (int(r * 255), int(g * 255), int(b * 255))
     
-    def draw_background(self):
-        """Draw the current background"""
+    def draw_background(self, surface):
+        """Draw the current background onto surface"""
         if self.current_background == 1:
             # Black background (default)
-            self.screen.fill((0, 0, 0))
+            surface.fill((0, 0, 0))
         
         elif self.current_background == 2:
             # Rainbow background
-            self.draw_rainbow_background()
+            self.draw_rainbow_background(surface)
         
         elif self.current_background == 3:
             # Ship 01 background
             if 'ship01' in self.bg_images:
-                self.draw_cover_background(self.bg_images['ship01'])
+                self.draw_cover_background(surface, self.bg_images['ship01'])
             else:
-                self.screen.fill((0, 0, 0))
+                surface.fill((0, 0, 0))
         
         elif self.current_background == 4:
             # Ship 02 background
             if 'ship02' in self.bg_images:
-                self.draw_cover_background(self.bg_images['ship02'])
+                self.draw_cover_background(surface, self.bg_images['ship02'])
             else:
-                self.screen.fill((0, 0, 0))
+                surface.fill((0, 0, 0))
         
         elif self.current_background == 5:
             # Crateria01 background
             if 'crateria01' in self.bg_images:
-                self.draw_cover_background(self.bg_images['crateria01'])
+                self.draw_cover_background(surface, self.bg_images['crateria01'])
             else:
-                self.screen.fill((0, 0, 0))
+                surface.fill((0, 0, 0))
         
         elif self.current_background == 6:
             # Brinstar01 background
             if 'brinstar01' in self.bg_images:
-                self.draw_cover_background(self.bg_images['brinstar01'])
+                self.draw_cover_background(surface, self.bg_images['brinstar01'])
             else:
-                self.screen.fill((0, 0, 0))
+                surface.fill((0, 0, 0))
         
         elif self.current_background == 7:
             # Hellway01 background
             if 'hellway01' in self.bg_images:
-                self.draw_cover_background(self.bg_images['hellway01'])
+                self.draw_cover_background(surface, self.bg_images['hellway01'])
             else:
-                self.screen.fill((0, 0, 0))
+                surface.fill((0, 0, 0))
         
         elif self.current_background == 8:
             # Tourian01 background
             if 'tourian01' in self.bg_images:
-                self.draw_cover_background(self.bg_images['tourian01'])
+                self.draw_cover_background(surface, self.bg_images['tourian01'])
             else:
-                self.screen.fill((0, 0, 0))
+                surface.fill((0, 0, 0))
         
         elif self.current_background == 9:
             # Chaos background - mathematical madness!
-            if self.chaos_effect:
-                # Fill with black first, then draw chaos on top
-                self.screen.fill((0, 0, 0))
-                self.chaos_effect.update()
-                self.chaos_effect.draw(self.screen)
+            # Fill with black first, then draw chaos on top (updated with the other effect plugins;
+            # stays black if it was switched off for going over its frame budget)
+            surface.fill((0, 0, 0))
+            if self.chaos_effect and self.effects.is_active(self.chaos_effect):
+                self.chaos_effect.alpha = self.sim_alpha
+                self.effects.draw(self.chaos_effect, surface)
+        
+        elif self.current_background in self.background_slots:
+            # Extra background images (B+0 cycles through them)
+            bg_image = self.bg_images.get(self.background_slots[self.current_background])
+            if bg_image:
+                self.draw_cover_background(surface, bg_image)
             else:
-                self.screen.fill((0, 0, 0))
+                surface.fill((0, 0, 0))
     
-    def draw_cover_background(self, bg_image):
+    def draw_cover_background(self, surface, bg_image):
         """Draw background image with cover fit (fills screen without distortion)"""
+        width, height = surface.get_size()
+        
+        # Scaled once per image and screen size (keyed by the image itself, so a reloaded one never matches)
+        key = (bg_image, width, height)
+        scaled_bg = self.background_cache.get(key)
+        if scaled_bg is None:
+            # Already being warmed: finish that job instead of scaling twice
+            scaled_bg = self.jobs.finish(('background',) + key) or self.scale_cover_background(bg_image, width, height)
+        
+        # Center the image
+        x = (width - scaled_bg.get_width()) // 2
+        y = (height - scaled_bg.get_height()) // 2
+        
+        surface.blit(scaled_bg, (x, y))
+    
+    def scale_cover_background(self, bg_image, width, height):
+        """Scale a background image to cover width x height into the cache (safe on a worker thread)"""
+        start = time.perf_counter()
+        
         # Get image dimensions
         img_width = bg_image.get_width()
         img_height = bg_image.get_height()
         
         # Calculate scale to cover the screen
-        scale_w = self.width / img_width
-        scale_h = self.height / img_height
+        scale_w = width / img_width
+        scale_h = height / img_height
         scale = max(scale_w, scale_h)  # Use max to cover (not contain)
         
         # Calculate new dimensions
@@ -775,38 +1020,81 @@ class SamuraiPNGTuber:
         
         # Scale the image
         scaled_bg = pygame.transform.smoothscale(bg_image, (new_width, new_height))
-        
-        # Center the image
-        x = (self.width - new_width) // 2
-        y = (self.height - new_height) // 2
-        
-        self.screen.blit(scaled_bg, (x, y))
+        return self.background_cache.put((bg_image, width, height), scaled_bg,
+                                         (time.perf_counter() - start) * 1000)
+    
+    def draw_background_textures(self, textures):
+        """Draw the background with the texture renderer; False for rainbow and chaos (drawn by pygame and uploaded)"""
+        if self.current_background in (2, 9):
+            return False
+        bg_image = self.bg_images.get(self.background_slots.get(self.current_background))
+        if bg_image:
+            # The cover-scaled image is uploaded once per viewport size (its scale never changes
+            # between frames, so a 1:1 copy beats scaling the full image on every draw)
+            key = (bg_image, self.width, self.height)
+            scaled_bg = (self.background_cache.get(key) or self.jobs.finish(('background',) + key)
+                         or self.scale_cover_background(bg_image, self.width, self.height))
+            textures.draw(textures.texture(scaled_bg), scaled_bg.get_rect(center=(self.width // 2, self.height // 2)))
+        return True  # Black: the frame starts cleared to black
     
-    def draw_rainbow_background(self):
+    def draw_rainbow_background(self, surface):
         """Draw a smooth rainbow gradient background"""
-        # Update rainbow hue
-        self.rainbow_hue += 0.003  # Slow smooth progression
-        if self.rainbow_hue > 1.0:
-            self.rainbow_hue = 0.0
+        width, height = surface.get_size()
         
         # Create a smooth gradient across the screen
-        for y in range(self.height):
+        for y in range(height):
             # Calculate hue based on y position and time
-            hue = (self.rainbow_hue + (y / self.height) * 0.3) % 1.0
+            hue = (self.rainbow_hue + (y / height) * 0.3) % 1.0
             color = self.hsv_to_rgb(hue, 0.6, 0.8)  # Medium saturation and brightness
             
-            pygame.draw.line(self.screen, color, (0, y), (self.width, y))
+            pygame.draw.line(surface, color, (0, y), (width, y))
+    
+    def create_chaos_effect(self):
+        """Chaos effect for the current viewport with the configured particle and Voronoi modes"""
+        options = self.chaos_particles
+        voronoi = self.chaos_voronoi
+        return ChaosEffect(self.width, self.height, seed=self.chaos_seed,
+                           particle_mode=options.get('mode', 'classic'),
+                           swarm_size=options.get('swarm_size', 2000),
+                           neighbor_radius=options.get('neighbor_radius', 40),
+                           cell_size=options.get('cell_size'),
+                           voronoi_mode=voronoi.get('mode', 'classic'),
+                           voronoi_seeds=voronoi.get('seeds', 256),
+                           voronoi_resolution=voronoi.get('resolution', 4),
+                           voronoi_edges=voronoi.get('edges', False))
+    
+    def prepare_chaos_effect(self):
+        """Job: build the chaos background and do its first-frame work ahead of time"""
+        effect = self.create_chaos_effect()
+        yield
+        yield from effect.warm_up()
+        self.prepared_chaos_effect = effect
+    
+    def chaos_likely(self):
+        """Whether a switch to the chaos background is likely enough to build it ahead of time"""
+        return self.warm_chaos or any(profile.get('background') == 9 for profile in self.scene_profiles.values())
+    
+    def take_chaos_effect(self):
+        """Chaos background for the current viewport (finishing its job now if it isn't ready)"""
+        if not self.prepared_chaos_effect:
+            self.jobs.submit(('chaos',), self.prepare_chaos_effect)
+            self.jobs.finish(('chaos',))
+        effect, self.prepared_chaos_effect = self.prepared_chaos_effect, None
+        return effect
     
     def change_background(self, bg_number):
         """Change the background"""
-        if 1 <= bg_number <= 9:
+        if 1 <= bg_number <= 9 or bg_number in self.background_slots:
             self.current_background = bg_number
             
-            # Initialize chaos effect if switching to chaos background
+            # Initialize chaos effect if switching to chaos background (it only runs while shown)
             if bg_number == 9:
                 if not self.chaos_effect:
-                    self.chaos_effect = ChaosEffect(self.width, self.height)
+                    self.chaos_effect = self.take_chaos_effect()
                     print("🌀 CHAOS BACKGROUND ACTIVATED - MATHEMATICAL MADNESS ENGAGED! 🌀")
+                self.effects.attach(self.chaos_effect)
+            elif self.chaos_effect:
+                self.effects.detach(self.chaos_effect)
             
             bg_names = {
                 1: "Black",
@@ -819,26 +1107,133 @@ class SamuraiPNGTuber:
                 8: "Tourian",
                 9: "Chaos (Mathematical Madness)"
             }
-            print(f"Changed background to: {bg_names[bg_number]}")
+            print(f"Changed background to: {bg_names.get(bg_number, self.background_slots.get(bg_number))}")
+            self.schedule_warmup()
             self.save_config()
     
-    def get_scaled_image(self):
-        """Get the samurai image scaled according to current zoom level"""
-        zoom = self.zoom_levels[self.current_zoom]
+    def cycle_extra_background(self):
+        """Switch to the next extra background image (slots after B+9)"""
+        extra = sorted(slot for slot in self.background_slots if slot > 9)
+        if not extra:
+            print("No extra backgrounds (add .png files to bg/)")
+            return
+        later = [slot for slot in extra if slot > self.current_background]
+        self.change_background(later[0] if later else extra[0])
+    
+    def shown_zoom(self):
+        """Zoom position drawn this frame (interpolated between simulation steps during a transition)"""
+        if self.prev_zoom_position == self.zoom_position:
+            return self.zoom_position
+        return self.prev_zoom_position + (self.zoom_position - self.prev_zoom_position) * self.sim_alpha
+    
+    def zoom_moving(self):
+        """True while a zoom transition is under way"""
+        return self.zoom_position != self.current_zoom or self.prev_zoom_position != self.zoom_position
+    
+    def zoom_name(self, zoom):
+        """Name of a zoom position (two level names and the position when between levels)"""
+        if zoom == int(zoom):
+            return self.zoom_levels[int(zoom)]['name']
+        low = int(zoom)
+        return f"{self.zoom_levels[low]['name']}/{self.zoom_levels[low + 1]['name']} {zoom:.2f}"
+    
+    def get_zoom_scale(self, zoom_index=None, viewport_size=None):
+        """Get the image scale factor for a zoom position (default: the zoom shown now and the current viewport)"""
+        if zoom_index is None:
+            zoom_index = self.shown_zoom()
+        low = int(zoom_index)
+        fraction = zoom_index - low
+        if fraction:
+            # Between two levels: geometric, so zooming in feels as fast at every scale
+            low_scale = self.get_zoom_scale(low, viewport_size)
+            return low_scale * (self.get_zoom_scale(low + 1, viewport_size) / low_scale) ** fraction
+        zoom = self.zoom_levels[low]
+        width, height = viewport_size or (self.width, self.height)
         
         if zoom['name'] == 'full_body':
             # Scale to fit the window while maintaining aspect ratio
-            scale_w = self.width / self.original_width
-            scale_h = self.height / self.original_height
-            scale = min(scale_w, scale_h) * 0.9  # 90% to leave some margin
-        else:
-            # Use specified scale for face zoom
-            scale = zoom['scale']
+            scale_w = width / self.original_width
+            scale_h = height / self.original_height
+            return min(scale_w, scale_h) * 0.9  # 90% to leave some margin
         
-        new_width = int(self.original_width * scale)
-        new_height = int(self.original_height * scale)
+        # Use specified scale for face zoom
+        return zoom['scale']
+    
+    def sprite_size(self, zoom_index=None, viewport_size=None):
+        """Size of the character at a zoom level (default: the current zoom and viewport)"""
+        scale = self.get_zoom_scale(zoom_index, viewport_size)
+        return (int(self.original_width * scale), int(self.original_height * scale))
+    
+    def get_scaled_image(self):
+        """Get the samurai image scaled according to current zoom level (cached per size)"""
+        size = self.sprite_size()
+        image = self.sprite_cache.get((size, self.avatar_version))
+        if image is None and self.zoom_moving():
+            # A new size every transition frame: scaled from the nearest mip level, not cached
+            return self.mipmaps.scale(size)
+        if image is None:
+            # Already being warmed: finish that job instead of scaling twice
+            image = self.jobs.finish(('sprite', size)) or self.scale_sprite(size)
+        return image
+    
+    def scale_sprite(self, size):
+        """Scale the character into the cache (safe on a worker thread)"""
+        start = time.perf_counter()
+        original, version = self.original_image, self.avatar_version  # A reload may swap these meanwhile
+        image = pygame.transform.smoothscale(original, size)
+        return self.sprite_cache.put((size, version), image, (time.perf_counter() - start) * 1000)
+    
+    def schedule_warmup(self):
+        """Queue scaling for nearby zooms and viewports, every image background and the chaos background
+        (when a profile uses it or jobs.warm_chaos is set)"""
+        # The zooms next to this one and full body; at full body, the other viewport sizes too
+        self.jobs.cancel_group('sprite')
+        sizes = [(self.sprite_size(self.current_zoom), 4)]  # Where a zoom transition ends
+        sizes += [(self.sprite_size(zoom_index), 3) for zoom_index in {0, self.current_zoom - 1, self.current_zoom + 1}
+                  if 0 <= zoom_index <= len(self.zoom_levels) - 1]
+        if self.current_zoom == 0:
+            sizes += [(self.sprite_size(0, viewport_size), 0) for viewport_size in self.viewport_presets]
+        for size, priority in sizes:
+            if (size, self.avatar_version) not in self.sprite_cache:
+                self.jobs.submit(('sprite', size), lambda size=size: self.scale_sprite(size),
+                                 priority=priority, threaded=True)
+        
+        # Every image background at this size, and the current one at the other viewport sizes
+        self.jobs.cancel_group('background')
+        current = self.bg_images.get(self.background_slots.get(self.current_background))
+        warm = [(bg_image, (self.width, self.height), 2) for bg_image in self.bg_images.values()]
+        if current:
+            warm += [(current, size, 0) for size in self.viewport_presets if size != (self.width, self.height)]
+        for bg_image, size, priority in warm:
+            key = (bg_image, *size)
+            if key not in self.background_cache:
+                self.jobs.submit(('background',) + key,
+                                 lambda bg_image=bg_image, size=size: self.scale_cover_background(bg_image, *size),
+                                 priority=priority, threaded=True)
+        
+        if not self.chaos_effect and not self.prepared_chaos_effect and self.chaos_likely():
+            self.jobs.submit(('chaos',), self.prepare_chaos_effect, priority=1)
+    
+    def glow_color(self):
+        """Visor glow colour for the current talking intensity"""
+        # Idle: Blue -> Low volume: Cyan -> Medium: Green -> High: Pink/Magenta -> Very High: Purple
+        talking_intensity = self.glow_intensity  # 0.0 to 1.0
         
-        return pygame.transform.smoothscale(self.original_image, (new_width, new_height))
+        if talking_intensity < 0.1:
+            # Idle/quiet: Deep blue
+            return (0, 150, 255)
+        elif talking_intensity < 0.3:
+            # Low volume: Cyan
+            return (0, 255, 255)
+        elif talking_intensity < 0.5:
+            # Medium volume: Green
+            return (0, 255, 150)
+        elif talking_intensity < 0.7:
+            # High volume: Pink/Magenta
+            return (255, 100, 255)
+        else:
+            # Very high volume: Purple
+            return (200, 0, 255)
     
     def draw_visor_glow(self, surface, visor_pos, scale):
         """Draw the neon glowing sphere behind the visor - always visible, color changes with volume"""
@@ -850,27 +1245,11 @@ class SamuraiPNGTuber:
         glow_radius = int((self.glow_base_size / 2) * scale * 0.95)
         
         # First, draw a solid black circle directly on the screen to block the background
+        # (on the transparent framebuffer this is a fully opaque disc behind the glow)
         pygame.draw.circle(surface, (0, 0, 0), visor_pos, glow_radius)
         
         # Determine color based on talking intensity
-        # Idle: Blue -> Low volume: Cyan -> Medium: Green -> High: Pink/Magenta -> Very High: Purple
-        talking_intensity = self.glow_intensity  # 0.0 to 1.0
-        
-        if talking_intensity < 0.1:
-            # Idle/quiet: Deep blue
-            r, g, b = 0, 150, 255
-        elif talking_intensity < 0.3:
-            # Low volume: Cyan
-            r, g, b = 0, 255, 255
-        elif talking_intensity < 0.5:
-            # Medium volume: Green
-            r, g, b = 0, 255, 150
-        elif talking_intensity < 0.7:
-            # High volume: Pink/Magenta
-            r, g, b = 255, 100, 255
-        else:
-            # Very high volume: Purple
-            r, g, b = 200, 0, 255
+        r, g, b = self.glow_color()
         
         # Create glow surface with transparency
         glow_size = glow_radius * 2
@@ -885,45 +1264,42 @@ class SamuraiPNGTuber:
         # Blit glow surface on top of the black circle
         glow_rect = glow_surface.get_rect(center=visor_pos)
         surface.blit(glow_surface, glow_rect)
-        
-        # Decay talking boost only (base glow remains)
-        self.glow_intensity = max(0, self.glow_intensity - self.glow_decay)
     
-    def draw(self):
-        """Main drawing function"""
-        self.frame_count += 1
-        
-        # Update active effects
-        self.update_effects()
-        
-        # Draw background (replaces screen.fill)
-        self.draw_background()
-        
-        # Get scaled image
-        scaled_image = self.get_scaled_image()
-        zoom = self.zoom_levels[self.current_zoom]
-        
-        # Calculate scale factor for positioning
-        if zoom['name'] == 'full_body':
-            scale_w = self.width / self.original_width
-            scale_h = self.height / self.original_height
-            scale = min(scale_w, scale_h) * 0.9
-        else:
-            scale = zoom['scale']
+    def draw_visor_glow_textures(self, textures, visor_pos, scale):
+        """Visor glow with the texture renderer: a black disc, then the glow colour blended over it"""
+        total_intensity = min(1.0, self.glow_base_intensity + self.glow_intensity)
+        glow_radius = int((self.glow_base_size / 2) * scale * 0.95)
+        textures.circle((0, 0, 0), visor_pos, glow_radius)
+        textures.circle(self.glow_color(), visor_pos, glow_radius, int(total_intensity * 255))
+    
+    def advance(self, elapsed, realtime=True):
+        """Advance the simulation by elapsed seconds in fixed steps"""
+        if self.alloc_tracker:
+            self.alloc_tracker.mark('input')  # Events, audio and control commands since the last frame
+        stage_start = time.perf_counter()
+        if realtime:
+            elapsed = min(elapsed, self.max_frame_time)
+        self.sim_accumulator += elapsed
+        while self.sim_accumulator >= self.sim_dt:
+            self.update_simulation()
+            self.sim_accumulator -= self.sim_dt
+        self.sim_alpha = self.sim_accumulator / self.sim_dt
+        self.mark_stage('simulation', stage_start)
+    
+    def update_simulation(self):
+        """Advance all animation state by one fixed step"""
+        self.sim_steps += 1
+        self.prev_rock_angle = self.rock_angle
+        self.prev_rock_intensity = self.rock_intensity
         
-        # Calculate where to position the image on screen
-        if zoom['focus'] == 'center':
-            # Full body: center the entire image
-            image_x = self.width // 2 + self.viewport_x_offset
-            image_y = self.height // 2 + self.viewport_y_offset
-        else:
-            # Zoomed views: position so mask center is at screen center
-            mask_x_scaled = self.mask_center_original[0] * scale
-            mask_y_scaled = self.mask_center_original[1] * scale
-            image_x = self.width // 2 - mask_x_scaled + (scaled_image.get_width() // 2) + self.viewport_x_offset
-            image_y = self.height // 2 - mask_y_scaled + (scaled_image.get_height() // 2) + self.viewport_y_offset
+        # Active effect plugins (the chaos background is one while B+9 is on)
+        self.effects.update(self.sim_dt)
         
-        image_rect = scaled_image.get_rect(center=(image_x, image_y))
+        # Background animation
+        if self.current_background == 2:
+            self.rainbow_hue += 0.003  # Slow smooth progression
+            if self.rainbow_hue > 1.0:
+                self.rainbow_hue = 0.0
         
         # Apply rock animation only when talking
         if self.rock_intensity > 0.02:
@@ -935,49 +1311,100 @@ class SamuraiPNGTuber:
                 self.bob_pattern = (self.bob_pattern + 1) % len(self.bob_patterns)
                 self.pattern_change_counter = 0
             
+            # Decay rock intensity
+            self.rock_intensity = max(0, self.rock_intensity - self.rock_decay)
+        else:
+            self.rock_intensity = 0
+        
+        # Decay talking boost only (base glow remains)
+        self.glow_intensity = max(0, self.glow_intensity - self.glow_decay)
+        
+        # Zoom transition (smoothstep eased from zoom_from to current_zoom)
+        self.prev_zoom_position = self.zoom_position
+        if self.zoom_position != self.current_zoom:
+            self.zoom_progress = min(1.0, self.zoom_progress + self.sim_dt / self.zoom_transition)
+            if self.zoom_progress >= 1.0:
+                self.zoom_position = self.current_zoom
+            else:
+                eased = self.zoom_progress * self.zoom_progress * (3 - 2 * self.zoom_progress)
+                self.zoom_position = self.zoom_from + (self.current_zoom - self.zoom_from) * eased
+    
+    def render_offline(self, frames, fps=None):
+        """Render frames as fast as possible with simulated time (faster than real time)"""
+        frame_time = 1.0 / (fps or self.target_fps)
+        for _ in range(frames):
+            self.advance(frame_time, realtime=False)
+            self.draw()
+    
+    def zoom_focus(self, zoom_index, scale):
+        """Screen position of the image centre for a zoom level's framing at scale (before offsets)"""
+        if self.zoom_levels[zoom_index]['focus'] == 'center':
+            # Full body: center the entire image
+            return self.width // 2, self.height // 2
+        # Zoomed views: position so mask center is at screen center
+        mask_x_scaled = self.mask_center_original[0] * scale
+        mask_y_scaled = self.mask_center_original[1] * scale
+        image_x = self.width // 2 - mask_x_scaled + (int(self.original_width * scale) // 2)
+        image_y = self.height // 2 - mask_y_scaled + (int(self.original_height * scale) // 2)
+        return image_x, image_y
+    
+    def compute_pose(self):
+        """Work out where the character and visor glow go this frame (no pixel work)"""
+        zoom = self.shown_zoom()
+        scale = self.get_zoom_scale(zoom)
+        scaled_width = int(self.original_width * scale)
+        scaled_height = int(self.original_height * scale)
+        
+        # Calculate where to position the image on screen
+        low = int(zoom)
+        image_x, image_y = self.zoom_focus(low, scale)
+        if zoom != low:
+            # Between levels: pan from one level's framing to the next
+            next_x, next_y = self.zoom_focus(low + 1, scale)
+            image_x += (next_x - image_x) * (zoom - low)
+            image_y += (next_y - image_y) * (zoom - low)
+        image_x += self.viewport_x_offset
+        image_y += self.viewport_y_offset
+        
+        image_rect = pygame.Rect(0, 0, scaled_width, scaled_height)
+        image_rect.center = (image_x, image_y)
+        
+        # Apply rock animation only when talking (interpolated between simulation steps)
+        rock_angle = self.prev_rock_angle + (self.rock_angle - self.prev_rock_angle) * self.sim_alpha
+        rock_intensity = self.prev_rock_intensity + (self.rock_intensity - self.prev_rock_intensity) * self.sim_alpha
+        if rock_intensity > 0.02:
             # Calculate angle based on current pattern
             pattern = self.bob_patterns[self.bob_pattern]
-            base_motion = math.sin(self.rock_angle)
+            base_motion = math.sin(rock_angle)
             
             if pattern['type'] == 'tilt':
                 # Normal head tilt (left-right)
-                angle = base_motion * self.max_rock_angle * self.rock_intensity
+                angle = base_motion * self.max_rock_angle * rock_intensity
                 y_offset = 0
             elif pattern['type'] == 'vertical':
                 # Up-down bobbing
-                angle = base_motion * (self.max_rock_angle * 0.5) * self.rock_intensity
-                y_offset = int(base_motion * 5 * self.rock_intensity)
+                angle = base_motion * (self.max_rock_angle * 0.5) * rock_intensity
+                y_offset = int(base_motion * 5 * rock_intensity)
             elif pattern['type'] == 'tilt_left':
                 # Tilt with left bias
-                angle = (base_motion - 0.3) * self.max_rock_angle * self.rock_intensity
+                angle = (base_motion - 0.3) * self.max_rock_angle * rock_intensity
                 y_offset = 0
             elif pattern['type'] == 'tilt_right':
                 # Tilt with right bias
-                angle = (base_motion + 0.3) * self.max_rock_angle * self.rock_intensity
+                angle = (base_motion + 0.3) * self.max_rock_angle * rock_intensity
                 y_offset = 0
             else:
-                angle = base_motion * self.max_rock_angle * self.rock_intensity
-                y_offset = 0
-            
-            # Apply y_offset if present
-            if 'y_offset' not in locals():
+                angle = base_motion * self.max_rock_angle * rock_intensity
                 y_offset = 0
-            
-            # Decay rock intensity
-            self.rock_intensity = max(0, self.rock_intensity - self.rock_decay)
         else:
             angle = 0
             y_offset = 0
-            self.rock_intensity = 0
         
-        # Rotate image for rocking effect and apply y_offset
+        # Rotated image is centered on the same point (plus y_offset)
         if angle != 0:
-            rotated_image = pygame.transform.rotate(scaled_image, angle)
-            center_with_offset = (image_rect.centerx, image_rect.centery + y_offset)
-            rotated_rect = rotated_image.get_rect(center=center_with_offset)
+            center = (image_rect.centerx, image_rect.centery + y_offset)
         else:
-            rotated_image = scaled_image
-            rotated_rect = image_rect
+            center = image_rect.center
         
         # Calculate visor/mask position on screen
         # The mask is at a known position in the original image
@@ -988,62 +1415,193 @@ class SamuraiPNGTuber:
         visor_offset_x_scaled = self.visor_glow_offset[0] * scale
         visor_offset_y_scaled = self.visor_glow_offset[1] * scale
         
-        visor_x = rotated_rect.centerx + mask_offset_x + visor_offset_x_scaled
-        visor_y = rotated_rect.centery + mask_offset_y + visor_offset_y_scaled
-        
-        # Draw glow behind the image (pass scale for proper sizing)
-        self.draw_visor_glow(self.screen, (visor_x, visor_y), scale)
+        visor_x = center[0] + mask_offset_x + visor_offset_x_scaled
+        visor_y = center[1] + mask_offset_y + visor_offset_y_scaled
         
-        # Apply psychedelic effect to the image (if active)
-        if self.current_effect == 3:
-            rotated_image = self.apply_psychedelic_effect(rotated_image)
-        
-        # Draw the samurai
-        self.screen.blit(rotated_image, rotated_rect)
+        return {
+            'scale': scale,
+            'center': center,
+            'angle': angle,
+            'visor_pos': (visor_x, visor_y)
+        }
+    
+    def draw_character(self, surface):
+        """Draw the samurai at the current pose (through any active character effects, like E+3)"""
+        if self.zoom_moving() and not self.effects.of_kind('character'):
+            self.draw_zooming_character(surface)
+            return
+        scaled_image = self.get_scaled_image()
+        angle = self.pose['angle']
         
-        # Apply red tint effect over the character (if active)
-        if self.current_effect == 1:
-            self.apply_red_tint(self.screen)
+        # Rotate image for rocking effect
+        if angle != 0:
+            rotated_image = pygame.transform.rotate(scaled_image, angle)
+        else:
+            rotated_image = scaled_image
+        rotated_rect = rotated_image.get_rect(center=self.pose['center'])
         
-        # Draw explosions on top of everything
-        self.draw_explosions()
+        # Character effect plugins filter the posed sprite
+        for plugin in self.effects.of_kind('character'):
+            rotated_image = self.effects.draw(plugin, rotated_image)
         
-        # Draw emojis on top of everything
-        self.draw_emojis()
+        surface.blit(rotated_image, rotated_rect)
+    
+    def draw_zooming_character(self, surface):
+        """Zoom transition frame: scale only the part of the sprite that lands on screen, from the nearest mip level"""
+        width, height = self.sprite_size()
+        center_x, center_y = self.pose['center']
+        angle = self.pose['angle']
+        cos_a = math.cos(math.radians(angle))
+        sin_a = math.sin(math.radians(angle))
+        
+        # Screen corners in sprite pixels (undoing the rotation about the pose centre)
+        xs, ys = [], []
+        for x, y in ((0, 0), (surface.get_width(), 0), (0, surface.get_height()), surface.get_size()):
+            dx, dy = x - center_x, y - center_y
+            xs.append(dx * cos_a - dy * sin_a + width / 2)
+            ys.append(dx * sin_a + dy * cos_a + height / 2)
+        part = pygame.Rect(int(min(xs)) - 1, int(min(ys)) - 1, 0, 0)
+        part.width = int(max(xs)) + 2 - part.left
+        part.height = int(max(ys)) + 2 - part.top
+        scaled = self.mipmaps.scale_part((width, height), part)
+        if scaled is None:
+            return  # Entirely off screen
+        image, covered = scaled
+        
+        # The part's centre, rotated about the pose centre like the whole sprite would be
+        dx = covered.centerx - width / 2
+        dy = covered.centery - height / 2
+        if angle != 0:
+            image = pygame.transform.rotate(image, angle)
+        rect = image.get_rect(center=(center_x + dx * cos_a + dy * sin_a, center_y - dx * sin_a + dy * cos_a))
+        surface.blit(image, rect)
+    
+    def draw_character_textures(self, textures):
+        """Draw the samurai with the texture renderer: the sprite for this zoom is uploaded once and rotated
+        by the renderer (character effects filter it with pygame, so it is uploaded every frame then)"""
+        angle = self.pose['angle']
+        if self.zoom_moving() and not self.effects.of_kind('character'):
+            # Zoom transition: the renderer scales the nearest mip level, which is uploaded once
+            size = self.sprite_size()
+            rect = pygame.Rect((0, 0), size)
+            rect.center = self.pose['center']
+            textures.draw(textures.texture(self.mipmaps.level_for(size)), rect, angle)
+            return
+        scaled_image = self.get_scaled_image()
+        if self.effects.of_kind('character'):
+            rotated_image = pygame.transform.rotate(scaled_image, angle) if angle != 0 else scaled_image
+            for plugin in self.effects.of_kind('character'):
+                rotated_image = self.effects.draw(plugin, rotated_image)
+            rect = rotated_image.get_rect(center=self.pose['center'])
+            textures.draw(textures.stream('character', rotated_image), rect)
+            return
+        rect = scaled_image.get_rect(center=self.pose['center'])
+        textures.draw(textures.texture(scaled_image), rect, angle)
+    
+    def draw(self):
+        """Main drawing function"""
+        self.frame_count += 1
+        cpu_start = time.thread_time()
+        
+        # Compose the scene: background, glow, character, effects, UI (unchanged layers are reused)
+        self.pose = self.compute_pose()
+        if self.alloc_tracker:
+            self.alloc_tracker.mark('pose')
+        if self.canvas.get_size() != (self.width, self.height):
+            self.canvas.fill((0, 0, 0))  # Window dragged to a size not applied yet: clear around the old one
+        self.compositor.compose(self, self.canvas)
+        self.effects.end_frame()
+        self.stage_times = {name: ms for name, ms in self.stage_times.items() if name == 'simulation'}
+        self.stage_times.update(self.compositor.stage_times)
+        stage_start = time.perf_counter()
+        
+        # Texture renderer: read the frame back only when something needs its pixels
+        if self.textures and (self.frame_output or self.video_recorder):
+            self.textures.read_pixels(self.screen)
+            stage_start = self.mark_stage('readback', stage_start)
+        
+        # Publish the finished frame to shared memory
+        if self.frame_output:
+            frame, pixel_format = self.export_frame()
+            self.frame_output.publish(frame, self.frame_count, pixel_format)
+            stage_start = self.mark_stage('output', stage_start)
+        
+        # Show the transparent framebuffer in the window over black
+        if self.transparent:
+            self.screen.fill((0, 0, 0))
+            self.screen.blit(self.canvas, (0, 0))
         
-        # Draw UI info if enabled
-        if self.show_ui:
-            self.draw_ui()
+        # Hand the finished screen to the video encoder thread
+        if self.video_recorder:
+            self.video_recorder.submit(self.screen)
+            stage_start = self.mark_stage('record', stage_start)
         
-        pygame.display.flip()
+        if self.textures:
+            self.textures.present()
+        else:
+            pygame.display.flip()
+        self.mark_stage('flip', stage_start)
+        self.render_cpu_ms = (time.thread_time() - cpu_start) * 1000
+        self.render_cpu_total += self.render_cpu_ms
+        if self.alloc_tracker:
+            self.alloc_tracker.end_frame()
     
-    def draw_ui(self):
-        """Draw UI information overlay"""
-        font = pygame.font.Font(None, 30)
-        
+    def toggle_video_recording(self):
+        """Start or stop recording the screen to a video file"""
+        if self.video_recorder:
+            self.stop_video_recording()
+            return
+        if self.video_dir is None:
+            print("Video recording is disabled")
+            return
+        path = Path(self.video_dir) / time.strftime("avatar-%Y%m%d-%H%M%S.mp4")
+        self.video_recorder = start_recording(path, self.screen, fps=self.target_fps,
+                                              buffers=self.video_buffers, drop=self.video_drop,
+                                              ffmpeg=self.ffmpeg)
+    
+    def stop_video_recording(self):
+        """Finish the current video file (encodes the frames still queued)"""
+        if self.video_recorder:
+            self.video_recorder.close()
+            self.video_recorder = None
+    
+    def video_status(self):
+        """Recording state for the UI overlay"""
+        recorder = self.video_recorder
+        if not recorder:
+            return "Video: off (V to record)"
+        if recorder.error:
+            return "Video: ❌ encoder failed (V to stop)"
+        minutes, seconds = divmod(int(recorder.elapsed()), 60)
+        return (f"Video: ● REC {minutes:02d}:{seconds:02d} | queue {recorder.depth()}/{recorder.capacity} "
+                f"| dropped {recorder.frames_dropped} (V to stop)")
+    
+    def mark_stage(self, name, stage_start):
+        """Record the time spent in a draw stage and return the next stage's start"""
+        now = time.perf_counter()
+        self.stage_times[name] = (now - stage_start) * 1000
+        if self.alloc_tracker:
+            self.alloc_tracker.mark(name)
+        return now
+    
+    def ui_lines(self):
+        """Text lines for the UI information overlay"""
         # Current settings
-        zoom_name = self.zoom_levels[self.current_zoom]['name']
+        zoom_name = self.zoom_name(self.shown_zoom())
         viewport = f"{self.width}x{self.height}"
         
         pattern_name = self.bob_patterns[self.bob_pattern]['type']
         total_glow = self.glow_base_intensity + self.glow_intensity
         
-        effect_str = f"Effect {self.current_effect}" if self.current_effect else "None"
-        if self.current_effect == 1:
-            effect_str += f" (RAGE 🔥 Red: {self.effect1_red_intensity:.2f})"
-        elif self.current_effect == 2:
-            effect_str += f" (EMOJI PARTY 🎉 Count: {len(self.active_emojis)})"
-        elif self.current_effect == 3:
-            pattern_names = ["H-Wave", "V-Wave", "Diagonal", "Radial", "Checker", "Glitch", "Spiral", "Plasma"]
-            pattern_name = pattern_names[self.effect3_pattern_index]
-            effect_str += f" (PSYCHEDELIC 🌈 {pattern_name} | Hue: {self.effect3_hue_offset:.0f}°)"
+        effect_str = " + ".join(f"Effect {plugin.slot} ({plugin.status()})"
+                                for plugin in self.effects if plugin.slot is not None) or "None"
         
         bg_names = {1: "Black", 2: "Rainbow", 3: "Ship 01", 4: "Ship 02", 5: "Crateria", 6: "Brinstar", 7: "Hellway", 8: "Tourian", 9: "Chaos"}
-        bg_str = bg_names.get(self.current_background, "Unknown")
+        bg_str = bg_names.get(self.current_background) or self.background_slots.get(self.current_background, "Unknown")
         
         # Add particle count for chaos background
         if self.current_background == 9 and self.chaos_effect:
-            particles = len(self.chaos_effect.particles)
+            particles = self.chaos_effect.particle_count()
             bg_str += f" 🌀✨💫 ({particles} particles)"
         
         texts = [
@@ -1051,145 +1609,293 @@ class SamuraiPNGTuber:
             f"Viewport: {viewport} (D+1/D+2/D+3)",
             f"Position: X={self.viewport_x_offset:+d} Y={self.viewport_y_offset:+d} (Arrow keys ±5px, R to reset)",
             f"Background: {bg_str} (B+1 to B+9)",
-            f"Effect: {effect_str} (E+1/E+2/E+3 to toggle)",
+            f"Effect: {effect_str} ({'/'.join(f'E+{slot}' for slot in sorted(self.effects.plugins))} to toggle)",
             f"Glow: {'🔵 TALKING' if self.glow_intensity > 0.02 else '🔵 IDLE'} ({total_glow:.2f})",
-            f"Audio: Vol={self.last_volume:.0f}, Threshold={self.audio_threshold}",
+            self.audio_status(),
             f"Bob: {self.rock_intensity:.2f} ({pattern_name})",
+            f"FPS: {self.clock.get_fps():.1f} / {self.target_fps} (sim {self.sim_rate} steps/sec) | "
+            f"{self.renderer_backend} renderer",
+            self.video_status(),
+            self.cache_status(),
             "Press T to toggle UI | ESC to quit"
         ]
-        
+        return texts
+    
+    def audio_status(self):
+        """Audio level and capture health for the UI overlay"""
+        stats = self.audio_source.stats()
+        text = f"Audio: Vol={self.last_volume:.0f}, Threshold={self.audio_threshold}"
+        if isinstance(self.audio_source, ProcessAudioSource):
+            text += f" | process: {'voice' if stats['voice'] else 'quiet'}"
+        if stats['overflows']:
+            text += f" | {stats['overflows']} overflows"
+        return text
+    
+    def cache_status(self):
+        """Cache memory for the UI overlay"""
+        stats = self.caches.stats()
+        budget = f"{stats['budget_mb']} MB" if stats['budget_mb'] else "no limit"
+        return (f"Caches: {stats['mb']:.0f} MB / {budget} | {stats['entries']} entries | "
+                f"{stats['hit_rate']:.0%} hits (C to dump)")
+    
+    def draw_ui(self, surface, texts):
+        """Draw UI information overlay"""
         y_offset = 10
         for text in texts:
-            surface = font.render(text, True, (0, 255, 255))
-            self.screen.blit(surface, (10, y_offset))
+            self.text_cache.draw(surface, text, (10, y_offset), (0, 255, 255), 30)
             y_offset += 30
     
-    def change_viewport(self, preset_index):
-        """Change viewport dimensions"""
-        if 0 <= preset_index < len(self.viewport_presets):
-            self.current_viewport = preset_index
-            self.width, self.height = self.viewport_presets[preset_index]
-            self.screen = pygame.display.set_mode((self.width, self.height))
+    def resolve_viewport(self, viewport):
+        """Size of a viewport: a preset index, or [width, height] / "WxH" for any size (None if unusable)"""
+        if isinstance(viewport, int):
+            return self.viewport_presets[viewport] if 0 <= viewport < len(self.viewport_presets) else None
+        return parse_viewport_size(viewport)
+    
+    def change_viewport(self, viewport):
+        """Change viewport dimensions (a preset index, or [width, height] for a custom size)"""
+        size = self.resolve_viewport(viewport)
+        if size is None and not isinstance(viewport, int):
+            print(f"Warning: Unsupported viewport size {viewport!r}")
+        if size:
+            self.current_viewport = viewport if isinstance(viewport, int) else list(size)
+            self.width, self.height = size
+            self.pending_resize = None  # Superseded by this size
+            self.resizes += 1
+            self.stop_video_recording()  # A video file keeps one frame size
+            if self.textures:
+                self.textures.resize(self.width, self.height)
+                self.screen = pygame.Surface((self.width, self.height), 0, 32)
+            else:
+                self.screen = pygame.display.set_mode((self.width, self.height), self.display_flags)
+            self.create_canvas()
+            self.compositor.invalidate()
+            self.effects.resize(self.width, self.height)
+            if self.chaos_effect:
+                self.chaos_effect.resize(self.width, self.height)
+            
+            # A chaos background built ahead of time was for the old size
+            self.jobs.cancel(('chaos',))
+            self.prepared_chaos_effect = None
+            self.schedule_warmup()
             print(f"Changed viewport to {self.width}x{self.height}")
             self.save_config()
     
+    def request_resize(self, width, height):
+        """The window was resized: wait for the size to settle (dragging sends an event per step)"""
+        size = parse_viewport_size((width, height))
+        if not self.resizable or size is None:
+            return
+        if size == (self.width, self.height) and self.pending_resize is None:
+            return  # Our own set_mode, or the window already is this size
+        self.resize_events += 1
+        self.pending_resize = size
+        self.resize_due = time.perf_counter() + self.resize_debounce
+        self.resize_warm_keys = None
+    
+    def apply_pending_resize(self):
+        """Once a dragged window size has settled, scale the sprite and background for it on the job
+        threads, then switch to it (so its first frame doesn't stall on scaling)"""
+        if self.pending_resize is None or time.perf_counter() < self.resize_due:
+            return
+        size = self.pending_resize
+        if size == (self.width, self.height):
+            self.pending_resize = None  # Dragged back, or our own set_mode
+            return
+        if self.resize_warm_keys is None:
+            self.resize_warm_keys = self.warm_viewport(size)
+            self.resize_warm_until = time.perf_counter() + self.resize_warm_limit
+        if any(key in self.jobs for key in self.resize_warm_keys) and time.perf_counter() < self.resize_warm_until:
+            return
+        self.dispatch_command('change_viewport', [list(size)], {})  # Recorded, so replays resize too
+    
+    def warm_viewport(self, size):
+        """Queue scaling the character and the current background image for a viewport size; returns the job keys"""
+        keys = []
+        sprite_size = self.sprite_size(self.current_zoom, size)
+        if (sprite_size, self.avatar_version) not in self.sprite_cache:
+            keys.append(('sprite', sprite_size))
+            self.jobs.submit(keys[-1], lambda: self.scale_sprite(sprite_size), priority=5, threaded=True)
+        bg_image = self.bg_images.get(self.background_slots.get(self.current_background))
+        if bg_image and (bg_image, *size) not in self.background_cache:
+            keys.append(('background', bg_image, *size))
+            self.jobs.submit(keys[-1], lambda: self.scale_cover_background(bg_image, *size), priority=5,
+                             threaded=True)
+        return keys
+    
+    def set_render_scale(self, name, scale):
+        """Set the internal resolution of an effect layer ('background' or 'psychedelic');
+        raises ValueError for another layer or scale (reported to the control client)"""
+        if name not in self.render_scale_names:
+            raise ValueError(f"unknown render scale layer {name!r} (expected one of "
+                             f"{', '.join(self.render_scale_names)})")
+        try:
+            value = float(scale)
+        except (TypeError, ValueError):
+            value = None
+        if value not in self.render_scale_choices:
+            raise ValueError(f"unsupported render scale {scale!r} for {name} (expected one of "
+                             f"{', '.join(f'{choice:g}' for choice in self.render_scale_choices)})")
+        scale = value
+        self.render_scales[name] = scale
+        for layer in self.compositor.layers:
+            if layer.name == name:
+                layer.render_scale = scale
+        self.compositor.invalidate()
+        print(f"Render scale: {name} at {scale:g}x")
+        self.save_config()
+    
     def change_zoom(self, zoom_index):
-        """Change zoom level"""
-        if 0 <= zoom_index < len(self.zoom_levels):
+        """Change zoom level (fractions zoom between levels), easing there over zoom_transition seconds"""
+        if 0 <= zoom_index <= len(self.zoom_levels) - 1:
             self.current_zoom = zoom_index
-            zoom_name = self.zoom_levels[zoom_index]['name']
-            print(f"Changed zoom to {zoom_name}")
+            self.zoom_from = self.zoom_position
+            self.zoom_progress = 0.0
+            if self.zoom_transition <= 0:
+                self.zoom_position = self.prev_zoom_position = zoom_index
+            self.schedule_warmup()
+            print(f"Changed zoom to {self.zoom_name(zoom_index)}")
             self.save_config()
     
+    def zoom_by(self, delta):
+        """Zoom in (positive) or out from the current target, clamped to the zoom levels"""
+        zoom_index = min(max(self.current_zoom + delta, 0), len(self.zoom_levels) - 1)
+        if zoom_index != self.current_zoom:
+            self.change_zoom(round(zoom_index, 4))
+    
     def handle_events(self):
         """Handle pygame events"""
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if self.recorder and event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                self.recorder.key(event.type == pygame.KEYDOWN, event.key, event.mod)
+            self.handle_event(event)
+    
+    def handle_event(self, event):
+        """Handle a single pygame event"""
+        if event.type == pygame.QUIT or event.type == pygame.WINDOWCLOSE:
+            self.running = False  # The renderer window closing doesn't quit SDL while the hidden display is open
+        
+        elif event.type == pygame.WINDOWSIZECHANGED:
+            self.request_resize(event.x, event.y)
+        
+        elif event.type == pygame.KEYDOWN:
+            self.keys_pressed.add(event.key)
+            
+            # ESC to quit
+            if event.key == pygame.K_ESCAPE:
                 self.running = False
             
-            elif event.type == pygame.KEYDOWN:
-                self.keys_pressed.add(event.key)
-                
-                # ESC to quit
-                if event.key == pygame.K_ESCAPE:
-                    self.running = False
-                
-                # T to toggle UI text
-                elif event.key == pygame.K_t:
-                    self.show_ui = not self.show_ui
-                    print(f"UI text: {'ON' if self.show_ui else 'OFF'}")
-                
-                # Arrow keys to adjust viewport position (5px at a time)
-                elif event.key == pygame.K_UP:
-                    self.viewport_y_offset -= 5
-                    print(f"Position offset: X={self.viewport_x_offset}, Y={self.viewport_y_offset}")
-                    self.save_config()
-                elif event.key == pygame.K_DOWN:
-                    self.viewport_y_offset += 5
-                    print(f"Position offset: X={self.viewport_x_offset}, Y={self.viewport_y_offset}")
-                    self.save_config()
-                elif event.key == pygame.K_LEFT:
-                    self.viewport_x_offset -= 5
-                    print(f"Position offset: X={self.viewport_x_offset}, Y={self.viewport_y_offset}")
-                    self.save_config()
-                elif event.key == pygame.K_RIGHT:
-                    self.viewport_x_offset += 5
-                    print(f"Position offset: X={self.viewport_x_offset}, Y={self.viewport_y_offset}")
-                    self.save_config()
-                
-                # R to reset position offsets
-                elif event.key == pygame.K_r:
-                    self.viewport_x_offset = 0
-                    self.viewport_y_offset = 0
-                    print(f"Position offset reset to X=0, Y=0")
-                    self.save_config()
-                
-                # Check for key combos
-                # Z+1 through Z+0 for zoom levels (Z+0 = zoom 10)
-                if pygame.K_z in self.keys_pressed and event.key == pygame.K_1:
-                    self.change_zoom(0)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_2:
-                    self.change_zoom(1)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_3:
-                    self.change_zoom(2)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_4:
-                    self.change_zoom(3)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_5:
-                    self.change_zoom(4)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_6:
-                    self.change_zoom(5)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_7:
-                    self.change_zoom(6)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_8:
-                    self.change_zoom(7)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_9:
-                    self.change_zoom(8)
-                elif pygame.K_z in self.keys_pressed and event.key == pygame.K_0:
-                    self.change_zoom(9)
-                
-                # D+1 for viewport 1 (800x800)
-                elif pygame.K_d in self.keys_pressed and event.key == pygame.K_1:
-                    self.change_viewport(0)
-                
-                # D+2 for viewport 2 (1200x800)
-                elif pygame.K_d in self.keys_pressed and event.key == pygame.K_2:
-                    self.change_viewport(1)
-                
-                # D+3 for viewport 3 (1920x1080)
-                elif pygame.K_d in self.keys_pressed and event.key == pygame.K_3:
-                    self.change_viewport(2)
-                
-                # B+1 through B+9 for backgrounds
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_1:
-                    self.change_background(1)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_2:
-                    self.change_background(2)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_3:
-                    self.change_background(3)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_4:
-                    self.change_background(4)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_5:
-                    self.change_background(5)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_6:
-                    self.change_background(6)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_7:
-                    self.change_background(7)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_8:
-                    self.change_background(8)
-                elif pygame.K_b in self.keys_pressed and event.key == pygame.K_9:
-                    self.change_background(9)
-                
-                # E+1, E+2, E+3 for effects
-                elif pygame.K_e in self.keys_pressed and event.key == pygame.K_1:
-                    self.activate_effect(1)
-                elif pygame.K_e in self.keys_pressed and event.key == pygame.K_2:
-                    self.activate_effect(2)
-                elif pygame.K_e in self.keys_pressed and event.key == pygame.K_3:
-                    self.activate_effect(3)
+            # T to toggle UI text
+            elif event.key == pygame.K_t:
+                self.show_ui = not self.show_ui
+                print(f"UI text: {'ON' if self.show_ui else 'OFF'}")
+            
+            # Arrow keys to adjust viewport position (5px at a time)
+            elif event.key == pygame.K_UP:
+                self.move_offset(0, -5)
+            elif event.key == pygame.K_DOWN:
+                self.move_offset(0, 5)
+            elif event.key == pygame.K_LEFT:
+                self.move_offset(-5, 0)
+            elif event.key == pygame.K_RIGHT:
+                self.move_offset(5, 0)
+            
+            # V to start/stop video recording
+            elif event.key == pygame.K_v:
+                self.toggle_video_recording()
+            
+            # C to print cache memory and hit rates
+            elif event.key == pygame.K_c:
+                self.caches.dump()
+            
+            # - and = to zoom out and in between the Z levels
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.zoom_by(-self.zoom_step)
+            elif event.key in (pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.zoom_by(self.zoom_step)
+            
+            # R to reset position offsets
+            elif event.key == pygame.K_r:
+                self.viewport_x_offset = 0
+                self.viewport_y_offset = 0
+                print(f"Position offset reset to X=0, Y=0")
+                self.save_config()
+            
+            # Check for key combos
+            # Z+1 through Z+0 for zoom levels (Z+0 = zoom 10)
+            if pygame.K_z in self.keys_pressed and event.key == pygame.K_1:
+                self.change_zoom(0)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_2:
+                self.change_zoom(1)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_3:
+                self.change_zoom(2)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_4:
+                self.change_zoom(3)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_5:
+                self.change_zoom(4)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_6:
+                self.change_zoom(5)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_7:
+                self.change_zoom(6)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_8:
+                self.change_zoom(7)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_9:
+                self.change_zoom(8)
+            elif pygame.K_z in self.keys_pressed and event.key == pygame.K_0:
+                self.change_zoom(9)
             
-            elif event.type == pygame.KEYUP:
-                if event.key in self.keys_pressed:
-                    self.keys_pressed.remove(event.key)
+            # D+1 for viewport 1 (800x800)
+            elif pygame.K_d in self.keys_pressed and event.key == pygame.K_1:
+                self.change_viewport(0)
+            
+            # D+2 for viewport 2 (1200x800)
+            elif pygame.K_d in self.keys_pressed and event.key == pygame.K_2:
+                self.change_viewport(1)
+            
+            # D+3 for viewport 3 (1920x1080)
+            elif pygame.K_d in self.keys_pressed and event.key == pygame.K_3:
+                self.change_viewport(2)
+            
+            # D+4 through D+9 for the config's extra viewports
+            elif pygame.K_d in self.keys_pressed and pygame.K_4 <= event.key <= pygame.K_9:
+                self.change_viewport(event.key - pygame.K_1)
+            
+            # B+1 through B+9 for backgrounds
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_1:
+                self.change_background(1)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_2:
+                self.change_background(2)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_3:
+                self.change_background(3)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_4:
+                self.change_background(4)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_5:
+                self.change_background(5)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_6:
+                self.change_background(6)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_7:
+                self.change_background(7)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_8:
+                self.change_background(8)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_9:
+                self.change_background(9)
+            elif pygame.K_b in self.keys_pressed and event.key == pygame.K_0:
+                self.cycle_extra_background()
+            
+            # E+1 through E+9 toggle the effect plugins in those slots
+            elif pygame.K_e in self.keys_pressed and pygame.K_1 <= event.key <= pygame.K_9:
+                self.activate_effect(event.key - pygame.K_0)
+            
+            # P+1 through P+9 to recall scene profiles, Shift+P+1-9 to save
+            elif pygame.K_p in self.keys_pressed and pygame.K_1 <= event.key <= pygame.K_9:
+                slot = event.key - pygame.K_0
+                if event.mod & pygame.KMOD_SHIFT:
+                    self.save_profile(slot)
+                else:
+                    self.apply_profile(slot)
+        
+        elif event.type == pygame.KEYUP:
+            if event.key in self.keys_pressed:
+                self.keys_pressed.remove(event.key)
     
     def run(self):
         """Main application loop"""
@@ -1199,9 +1905,14 @@ class SamuraiPNGTuber:
         print("  Z+2-4: Mid-body zooms (progressive)")
         print("  Z+5-9: Face zooms (progressive, closer)")
         print("  Z+0: Maximum face zoom (closest)")
+        print("  - / =: Zoom out / in between levels")
         print("  D+1: Square viewport (800x800)")
         print("  D+2: Wide viewport (1200x800)")
         print("  D+3: Full HD viewport (1920x1080, OBS-optimized)")
+        for index, (width, height) in enumerate(self.viewport_presets[3:], 4):
+            print(f"  D+{index}: {width}x{height} viewport (config)")
+        if self.resizable:
+            print("  (or drag the window to any size)")
         print("  B+1: Black background")
         print("  B+2: Rainbow background")
         print("  B+3: Samus Ship 01 background")
@@ -1211,68 +1922,199 @@ class SamuraiPNGTuber:
         print("  B+7: Hellway background")
         print("  B+8: Tourian background")
         print("  B+9: CHAOS background (MATHEMATICAL MADNESS 🌀✨💫)")
+        print("  B+0: Cycle extra backgrounds (other images in bg/)")
         print("  E+1: Toggle RAGE effect (red tint + explosions)")
         print("  E+2: Toggle EMOJI PARTY effect (bouncing emojis)")
         print("  E+3: Toggle PSYCHEDELIC effect (8 auto-cycling neon patterns)")
+        for slot, plugin in sorted(self.effects.plugins.items()):
+            if slot > 3:
+                print(f"  E+{slot}: Toggle {plugin.title} effect (plugin)")
+        print("  (effects stack: several can be on at once)")
         print("  Arrow Keys: Fine-tune position (±5px)")
         print("  R: Reset position to center")
+        print("  P+1-9: Switch to scene profile (Shift+P+1-9 to save current scene)")
         print("  T: Toggle UI text overlay")
+        print("  V: Start/stop video recording (needs ffmpeg)")
+        print("  C: Print cache memory and hit rates")
         print("  ESC: Quit")
         print("\nSpeak into your microphone to activate the visor glow and talking animation!")
         print("Bobbing pattern changes every 3 seconds for variety!")
         print("=" * 40 + "\n")
         
         while self.running:
+            elapsed = self.clock.tick(self.target_fps) / 1000.0  # Frame limiter (--fps)
+            frame_start = time.perf_counter()
+            if self.recorder:
+                self.recorder.frame(elapsed)
             self.handle_events()
+            self.apply_pending_resize()
+            self.process_audio_levels()
+            commands = self.process_control_commands()
+            self.apply_asset_changes()
+            self.advance(elapsed)
             self.draw()
-            self.clock.tick(60)  # 60 FPS
+            if self.recorder:
+                self.recorder.checksum(self.canvas)
+            if self.control_server:
+                self.control_server.frame_done(self.frame_count, commands, self.frame_stats)
+            
+            # Background jobs in the time left before the next frame is due
+            left_ms = 1000 / self.target_fps - (time.perf_counter() - frame_start) * 1000
+            self.stage_times['jobs'] = self.jobs.run(left_ms)
         
         self.cleanup()
     
     def cleanup(self):
         """Clean up resources"""
-        if self.audio_stream:
-            self.audio_stream.stop_stream()
-            self.audio_stream.close()
-        if self.audio:
-            self.audio.terminate()
+        self.save_config()
+        self.config_store.close()
+        if self.recorder:
+            self.recorder.close()
+        self.stop_video_recording()
+        self.jobs.close()
+        if self.asset_watcher:
+            self.asset_watcher.close()
+        self.effects.close()
+        if self.control_server:
+            self.control_server.stop()
+        if self.frame_output:
+            self.frame_output.close()
+        self.audio_source.stop()
+        if self.alloc_tracker:
+            self.write_alloc_stats()
+            self.alloc_tracker.close()
+        if self.textures:
+            self.textures.close()
         pygame.quit()
         print("PNG-Tuber closed.")
+    
+    def write_alloc_stats(self):
+        """Write the allocation / GC report for the session as JSON"""
+        report = self.alloc_tracker.report()
+        print(f"Allocations: {report['peak_bytes_per_frame']:.0f} bytes/frame peak, "
+              f"{report['net_bytes_per_frame']:+.0f} bytes/frame net, "
+              f"{report['gc']['collections_per_frame']} GC collections/frame")
+        try:
+            with open(self.alloc_stats_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Allocation stats written to {self.alloc_stats_path}")
+        except OSError as e:
+            print(f"Warning: Could not write allocation stats: {e}")
 
-def list_audio_devices():
-    """List all available audio input devices"""
-    audio = pyaudio.PyAudio()
-    print("\n" + "=" * 60)
-    print("AVAILABLE AUDIO INPUT DEVICES:")
-    print("=" * 60)
+def replay_session(path, stats_path=None, profile_path=None, alloc_stats_path=None):
+    """Replay a recorded session headless and report frame-time statistics"""
+    reader = SessionReader(path)
+    app = SamuraiPNGTuber(seed=reader.seed, chaos_seed=reader.chaos_seed, headless=True,
+                          config_overrides=reader.state, persist_config=False, audio_source='silence',
+                          audio_process=False, renderer='surface', transparent=reader.state.get('transparent', False),
+                          alloc_stats_path=alloc_stats_path, video_dir=None, bake_patterns=False,
+                          watch_assets=False)
+    app.effects.over_budget = 'warn'  # Switching an effect off would depend on this machine's speed
+    print(f"▶️ Replaying {path} (seed {reader.seed}, chaos seed {reader.chaos_seed})")
     
-    device_count = audio.get_device_count()
-    input_devices = []
+    profiler = None
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
     
-    for i in range(device_count):
-        try:
-            device_info = audio.get_device_info_by_index(i)
-            # Only show input devices
-            if device_info['maxInputChannels'] > 0:
-                input_devices.append((i, device_info))
-                print(f"\nDevice Index: {i}")
-                print(f"  Name: {device_info['name']}")
-                print(f"  Channels: {device_info['maxInputChannels']}")
-                print(f"  Sample Rate: {int(device_info['defaultSampleRate'])} Hz")
-                print(f"  Host API: {audio.get_host_api_info_by_index(device_info['hostApi'])['name']}")
-        except Exception as e:
-            print(f"Error reading device {i}: {e}")
-    
-    print("\n" + "=" * 60)
-    print(f"Total input devices found: {len(input_devices)}")
-    print("=" * 60)
-    print("\nTo use a specific device, run:")
-    print("  python pngtuber.py --device <index>")
-    print("\nExample:")
-    print("  python pngtuber.py --device 3")
-    print()
-    
-    audio.terminate()
+    frame_times = []
+    stage_totals = {}
+    checked = 0
+    mismatches = []
+    for elapsed, events, checksum in reader.frames():
+        frame_start = time.perf_counter()
+        for record_type, timestamp, values in events:
+            if record_type in (KEY_DOWN, KEY_UP):
+                event_type = pygame.KEYDOWN if record_type == KEY_DOWN else pygame.KEYUP
+                app.handle_event(pygame.event.Event(event_type, key=values[0], mod=values[1]))
+            elif record_type == AUDIO:
+                app.apply_audio_level(values[0])
+            elif record_type == COMMAND:
+                command = values[0]
+                app.dispatch_command(command['cmd'], command['args'], command['kwargs'])
+        app.advance(elapsed)
+        app.draw()
+        frame_times.append((time.perf_counter() - frame_start) * 1000)
+        for name, ms in app.stage_times.items():
+            stage_totals[name] = stage_totals.get(name, 0.0) + ms
+        
+        if checksum is not None:
+            checked += 1
+            if frame_checksum(app.canvas) != checksum:
+                mismatches.append(app.frame_count)
+        if not app.running:
+            break
+    
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(profile_path)
+        print(f"Profile written to {profile_path}")
+    
+    app.cleanup()
+    
+    stats = frame_time_stats(frame_times)
+    stats['stages_mean_ms'] = {name: round(total / max(1, len(frame_times)), 3)
+                               for name, total in stage_totals.items()}
+    stats['compositor'] = app.compositor.stats()
+    stats['checksums_checked'] = checked
+    stats['checksum_mismatches'] = mismatches[:100]
+    
+    print(f"Replayed {stats['frames']} frames: mean {stats['mean_ms']}ms, p95 {stats['p95_ms']}ms, "
+          f"max {stats['max_ms']}ms")
+    if checked:
+        print(f"Frame checksums: {checked - len(mismatches)}/{checked} identical")
+    if stats_path:
+        with open(stats_path, 'w') as f:
+            json.dump(stats, f, indent=2)
+        print(f"Frame-time stats written to {stats_path}")
+    return stats
+
+
+def parse_viewport_size(value):
+    """(width, height) from [width, height] or "WxH", or None if it isn't a usable window size"""
+    try:
+        if isinstance(value, str):
+            value = value.lower().split('x')
+        width, height = (int(v) for v in value)
+    except (TypeError, ValueError):
+        return None
+    if not (64 <= width <= 8192 and 64 <= height <= 8192):
+        return None
+    return width, height
+
+def viewport_size_argument(text):
+    """argparse type for --size"""
+    size = parse_viewport_size(text)
+    if size is None:
+        raise argparse.ArgumentTypeError(f"expected WxH, 64 to 8192 pixels each (got {text!r})")
+    return size
+
+def frame_time_stats(frame_times):
+    """Summary and histogram of frame times in ms"""
+    ordered = sorted(frame_times) or [0.0]
+    buckets = [1, 2, 4, 8, 16.7, 33.3, 50, 100]
+    histogram = {}
+    for edge in buckets:
+        histogram[f"<={edge}ms"] = 0
+    histogram[f">{buckets[-1]}ms"] = 0
+    for ms in frame_times:
+        for edge in buckets:
+            if ms <= edge:
+                histogram[f"<={edge}ms"] += 1
+                break
+        else:
+            histogram[f">{buckets[-1]}ms"] += 1
+    
+    return {
+        'frames': len(frame_times),
+        'mean_ms': round(sum(ordered) / len(ordered), 3),
+        'p50_ms': round(ordered[len(ordered) // 2], 3),
+        'p95_ms': round(ordered[int(len(ordered) * 0.95)], 3),
+        'p99_ms': round(ordered[int(len(ordered) * 0.99)], 3),
+        'max_ms': round(ordered[-1], 3),
+        'histogram': histogram
+    }
 
 
 if __name__ == "__main__":
@@ -1282,6 +2124,52 @@ if __name__ == "__main__":
                        help='List all available audio input devices and exit')
     parser.add_argument('--device', type=int, default=None,
                        help='Audio input device index to use (see --list-devices)')
+    parser.add_argument('--audio-source', metavar='SOURCE', default='mic',
+                       help='Audio input: mic (default), silence, speech, tone, noise or wav:FILE')
+    parser.add_argument('--control-port', type=int, default=None,
+                       help='Start the local JSON-lines control server on this port (e.g. 8765)')
+    parser.add_argument('--frame-output', nargs='?', const='kentroid_samurai_frames', default=None,
+                       help='Publish frames to a shared-memory ring (default name: kentroid_samurai_frames)')
+    parser.add_argument('--frame-slots', type=int, default=3,
+                       help='Number of frame slots in the shared-memory ring (default: 3)')
+    parser.add_argument('--fps', type=int, default=None,
+                       help='Target frame rate, e.g. 30/60/120/144 (animation speed is the same at any rate)')
+    parser.add_argument('--record', metavar='FILE', default=None,
+                       help='Record seeds, key events and audio levels to a session log')
+    parser.add_argument('--record-checksums', action='store_true',
+                       help='Also store a checksum of every frame in the session log')
+    parser.add_argument('--replay', metavar='FILE', default=None,
+                       help='Replay a session log headless and report frame-time stats')
+    parser.add_argument('--stats', metavar='FILE', default=None,
+                       help='Write replay frame-time stats (histogram, percentiles) as JSON')
+    parser.add_argument('--profile', metavar='FILE', default=None,
+                       help='Write a cProfile/pstats dump of the replay')
+    parser.add_argument('--transparent', action='store_true',
+                       help='Render with no background into an RGBA framebuffer (use with --frame-output)')
+    parser.add_argument('--straight-alpha', action='store_true',
+                       help='Export straight instead of premultiplied alpha in transparent mode')
+    parser.add_argument('--alloc-stats', metavar='FILE', default=None,
+                       help='Trace allocations and GC pauses per draw stage and write a JSON report on exit')
+    parser.add_argument('--effect-scale', type=float, default=None, choices=[1.0, 0.5, 0.25],
+                       help='Internal resolution of the chaos/rainbow background and psychedelic overlay')
+    parser.add_argument('--video-dir', default='.',
+                       help='Folder for videos recorded with V (default: current folder)')
+    parser.add_argument('--video-buffers', type=int, default=8,
+                       help='Frames the video encoder may fall behind before frames are dropped (default: 8)')
+    parser.add_argument('--video-drop', choices=['newest', 'oldest'], default='newest',
+                       help='Frame to drop when the encoder falls behind (default: newest)')
+    parser.add_argument('--ffmpeg', default='ffmpeg',
+                       help='ffmpeg executable used for video recording (default: ffmpeg on PATH)')
+    parser.add_argument('--cache-budget-mb', type=int, default=None,
+                       help='Memory shared by all image caches, in MB (0 = no limit; default: config, 512)')
+    parser.add_argument('--job-budget-ms', type=float, default=None,
+                       help='Most idle time per frame spent on background rebuild jobs, in ms (default: config, 4)')
+    parser.add_argument('--renderer', choices=['surface', 'texture'], default=None,
+                       help='Composite with CPU blits (surface) or an experimental SDL2 texture renderer (default: config, surface)')
+    parser.add_argument('--size', type=viewport_size_argument, metavar='WxH', default=None,
+                       help='Window size, e.g. 2560x1440 or 1080x1920 (default: config viewport)')
+    parser.add_argument('--audio-process', action='store_true', default=None,
+                       help='Capture and analyse audio in a separate process (default: config, off)')
     
     args = parser.parse_args()
     
@@ -1290,9 +2178,25 @@ if __name__ == "__main__":
         list_audio_devices()
         sys.exit(0)
     
+    # Replay a recorded session headless and exit
+    if args.replay:
+        replay_session(args.replay, stats_path=args.stats, profile_path=args.profile,
+                       alloc_stats_path=args.alloc_stats)
+        sys.exit(0)
+    
     # Run the application
     try:
-        app = SamuraiPNGTuber(audio_device_index=args.device)
+        app = SamuraiPNGTuber(audio_device_index=args.device, audio_source=args.audio_source,
+                              control_port=args.control_port,
+                              frame_output=args.frame_output, frame_slots=args.frame_slots,
+                              transparent=args.transparent, premultiplied=not args.straight_alpha,
+                              target_fps=args.fps, record_path=args.record,
+                              record_checksums=args.record_checksums, effect_scale=args.effect_scale,
+                              alloc_stats_path=args.alloc_stats, video_dir=args.video_dir,
+                              video_buffers=args.video_buffers, video_drop=args.video_drop,
+                              ffmpeg=args.ffmpeg, cache_budget_mb=args.cache_budget_mb,
+                              job_budget_ms=args.job_budget_ms, audio_process=args.audio_process,
+                              renderer=args.renderer, viewport=args.size)
         app.run()
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,185 @@
+"""
+PSYCHEDELIC LOOPS - Baked playback of periodic Effect 3 patterns
+A pattern that repeats every N steps is rendered once for the whole loop on
+a background thread, run-length encoded in memory and decoded during
+playback. Until a loop is baked (or if it doesn't fit the memory cap) the
+pattern is drawn live as before. Baked loops live in a registered cache, so
+they count against the shared cache budget too.
+
+Frames are encoded as distinct rows (each row that differs from the one
+above it) plus runs of equal pixels across those rows, so stripes and
+checkerboards shrink to a few KB per frame and decode with two NumPy copies.
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from cache_registry import CacheRegistry, MB
+
+
+def encode_frame(surface):
+    """Run-length encode a 32-bit surface: (row_index, values, lengths, width)"""
+    rows = pygame.surfarray.pixels2d(surface).T  # (height, width) view
+    changed = np.ones(len(rows), dtype=bool)
+    np.any(rows[1:] != rows[:-1], axis=1, out=changed[1:])
+    distinct = rows[changed].reshape(-1)
+    row_index = (np.cumsum(changed) - 1).astype(np.uint16 if changed.sum() <= 65536 else np.int32)
+    del rows  # Unlock the surface
+
+    starts = np.flatnonzero(distinct[1:] != distinct[:-1]) + 1
+    values = distinct[np.concatenate(([0], starts))]
+    lengths = np.diff(np.concatenate(([0], starts, [len(distinct)]))).astype(np.int32)
+    return row_index, values, lengths, surface.get_width()
+
+
+def decode_frame(encoded, surface):
+    """Write an encoded frame into a surface of the same size and format"""
+    row_index, values, lengths, width = encoded
+    distinct = np.repeat(values, lengths).reshape(-1, width)
+    rows = pygame.surfarray.pixels2d(surface).T
+    np.take(distinct, row_index, axis=0, out=rows, mode='clip')
+    del rows  # Unlock the surface
+
+
+def encoded_size(encoded):
+    """Bytes held by an encoded frame"""
+    row_index, values, lengths, _ = encoded
+    return row_index.nbytes + values.nbytes + lengths.nbytes
+
+
+class PatternLoops:
+    def __init__(self, draw_pattern, loop_steps, hue_step, memory_mb=64, registry=None):
+        self.draw_pattern = draw_pattern  # draw_pattern(surface, index, time, hue, width, height, scale)
+        self.loop_steps = loop_steps  # Pattern index -> steps before the pattern repeats
+        self.hue_step = hue_step  # Hue degrees per step (a loop frame assumes hue = step * hue_step)
+        self.memory_cap = memory_mb * MB
+        self.duty = 0.25  # Fraction of the time the baker works; it sleeps the rest, leaving the GIL to rendering
+
+        # Baked loops by (pattern, canvas size, render scale)
+        registry = registry or CacheRegistry(None)
+        self.loops = registry.cache('pattern_loops', max_bytes=self.memory_cap)
+        self.pending = deque()
+        self.baking = None
+        self.failed = set()  # Loops that can't fit the memory cap (always drawn live)
+        self.lock = threading.Condition()
+        self.stopping = False
+        self.thread = None
+
+        # Playback surface per frame size (decoded into in place)
+        self.playback = {}
+
+        # Stats
+        self.baked_frames = 0
+        self.live_frames = 0
+
+    def frame(self, index, pattern_time, hue, size, canvas, scale):
+        """Baked image for this step (size pixels, top-left of the canvas) or None to draw live"""
+        if index not in self.loop_steps:
+            return None
+        if hue != (pattern_time * self.hue_step) % 360:
+            return None  # Hue no longer moves in step with time
+        frames = self.loops.get((index, canvas, scale))
+        if frames is None:
+            self.request(index, canvas, scale)
+            self.live_frames += 1
+            return None
+
+        encoded = frames[pattern_time % len(frames)]
+        frame_size = (encoded[3], len(encoded[0]))
+        if size[0] > frame_size[0] or size[1] > frame_size[1]:
+            self.live_frames += 1
+            return None
+        surface = self.playback.get(frame_size)
+        if surface is None:
+            surface = self.playback[frame_size] = pygame.Surface(frame_size, pygame.SRCALPHA)
+        decode_frame(encoded, surface)
+        self.baked_frames += 1
+        return surface.subsurface((0, 0, *size))
+
+    def ready(self, index, canvas, scale):
+        """True once the loop is baked"""
+        return (index, canvas, scale) in self.loops
+
+    def request(self, index, canvas, scale):
+        """Queue a pattern loop for baking (no-op if baked, queued or too big)"""
+        if index not in self.loop_steps:
+            return
+        key = (index, canvas, scale)
+        with self.lock:
+            if key in self.loops or key in self.failed or key == self.baking or key in self.pending:
+                return
+            self.pending.append(key)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.bake_loop, name="pattern-baker", daemon=True)
+                self.thread.start()
+            self.lock.notify()
+
+    def bake_loop(self):
+        """Baker thread: bake queued loops one at a time"""
+        while True:
+            with self.lock:
+                while not self.pending and not self.stopping:
+                    self.lock.wait()
+                if self.stopping:
+                    return
+                key = self.baking = self.pending.popleft()
+            self.bake(key)
+            with self.lock:
+                self.baking = None
+
+    def bake(self, key):
+        """Render and encode every frame of one loop into the cache (gives up if stopped or over the cap)"""
+        index, (width, height), scale = key
+        steps = self.loop_steps[index]
+        surface = pygame.Surface((max(1, int(width * scale)), max(1, int(height * scale))), pygame.SRCALPHA)
+        frames = []
+        loop_bytes = 0
+        work_ms = 0.0
+        start = time.perf_counter()
+        for step in range(steps):
+            if self.stopping:
+                return
+            frame_start = time.perf_counter()
+            surface.fill((0, 0, 0, 0))
+            self.draw_pattern(surface, index, step, (step * self.hue_step) % 360, width, height, scale)
+            encoded = encode_frame(surface)
+            frames.append(encoded)
+            loop_bytes += encoded_size(encoded)
+            if loop_bytes > self.memory_cap:
+                with self.lock:
+                    self.failed.add(key)
+                print(f"Warning: Psychedelic pattern {index} loop doesn't fit the "
+                      f"{self.memory_cap / MB:.0f} MB cap, drawing it live")
+                return
+            frame_ms = (time.perf_counter() - frame_start) * 1000
+            work_ms += frame_ms
+            time.sleep(frame_ms / 1000 * (1 - self.duty) / self.duty)
+
+        # Rebuild cost is the baking work, so the registry keeps loops that were expensive to make
+        self.loops.put(key, frames, work_ms, loop_bytes)
+        print(f"🌈 Baked psychedelic pattern {index} loop: {steps} frames at {surface.get_width()}x"
+              f"{surface.get_height()}, {loop_bytes / MB:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+    def close(self):
+        """Stop the baker thread (a loop being baked is discarded)"""
+        with self.lock:
+            self.stopping = True
+            self.lock.notify()
+        if self.thread:
+            self.thread.join()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'loops': len(self.loops),
+                'memory_mb': round(self.loops.bytes / MB, 2),
+                'baking': self.baking[0] if self.baking else None,
+                'queued': len(self.pending),
+                'too_big': len(self.failed),
+                'baked_frames': self.baked_frames,
+                'live_frames': self.live_frames
+            }
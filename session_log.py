@@ -0,0 +1,159 @@
+"""
+SESSION LOG - Compact binary recording of an avatar session
+Captures RNG seeds, starting scene, per-frame timing, key events,
+per-chunk audio levels and control commands so a session can be
+replayed headless frame-for-frame.
+
+File layout (little endian):
+    header: magic 'KSRL', version (H), avatar seed (Q), chaos seed (Q),
+            state length (I), starting state (JSON)
+    records: type (B), seconds since start (f), payload
+        FRAME     elapsed seconds passed to the simulation (d)
+        KEY_DOWN  key (i), mod (H)
+        KEY_UP    key (i), mod (H)
+        AUDIO     volume (d)
+        COMMAND   length (H), {"cmd", "args", "kwargs"} (JSON)
+        CHECKSUM  CRC32 of the finished frame (I)
+"""
+
+import json
+import struct
+import time
+import zlib
+
+
+MAGIC = b'KSRL'
+VERSION = 1
+HEADER = struct.Struct('<4sHQQI')
+RECORD = struct.Struct('<Bf')
+
+FRAME = 1
+KEY_DOWN = 2
+KEY_UP = 3
+AUDIO = 4
+COMMAND = 5
+CHECKSUM = 6
+
+PAYLOADS = {
+    FRAME: struct.Struct('<d'),
+    KEY_DOWN: struct.Struct('<iH'),
+    KEY_UP: struct.Struct('<iH'),
+    AUDIO: struct.Struct('<d'),
+    CHECKSUM: struct.Struct('<I'),
+}
+COMMAND_LENGTH = struct.Struct('<H')
+
+
+def frame_checksum(surface):
+    """CRC32 of a surface's pixels"""
+    view = surface.get_view('1')
+    checksum = zlib.crc32(view)
+    del view  # Unlock the surface
+    return checksum
+
+
+class SessionRecorder:
+    def __init__(self, path, seed, chaos_seed, state, checksums=False):
+        self.path = path
+        self.checksums = checksums  # Also store a CRC32 of every frame (costs ~1ms/frame at 1080p)
+        self.file = open(path, 'wb')
+        self.start = time.perf_counter()
+        self.records = 0
+
+        state_bytes = json.dumps(state).encode()
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, chaos_seed, len(state_bytes)))
+        self.file.write(state_bytes)
+        print(f"⏺️ Recording session to {path}")
+
+    def write(self, record_type, *values):
+        """Append one record"""
+        self.file.write(RECORD.pack(record_type, time.perf_counter() - self.start))
+        self.file.write(PAYLOADS[record_type].pack(*values))
+        self.records += 1
+
+    def frame(self, elapsed):
+        self.write(FRAME, elapsed)
+
+    def key(self, event_type_down, key, mod):
+        self.write(KEY_DOWN if event_type_down else KEY_UP, key, mod & 0xFFFF)
+
+    def audio(self, volume):
+        self.write(AUDIO, float(volume))
+
+    def command(self, name, args, kwargs):
+        payload = json.dumps({'cmd': name, 'args': list(args), 'kwargs': dict(kwargs)}).encode()
+        self.file.write(RECORD.pack(COMMAND, time.perf_counter() - self.start))
+        self.file.write(COMMAND_LENGTH.pack(len(payload)))
+        self.file.write(payload)
+        self.records += 1
+
+    def checksum(self, surface):
+        if self.checksums:
+            self.write(CHECKSUM, frame_checksum(surface))
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f"⏹️ Recorded {self.records} events to {self.path}")
+
+
+class SessionReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = f.read()
+
+        magic, version, self.seed, self.chaos_seed, state_length = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a session log (magic={magic!r}, version={version})")
+        offset = HEADER.size
+        self.state = json.loads(self.data[offset:offset + state_length])
+        self.records_offset = offset + state_length
+
+    def records(self):
+        """Yield (type, timestamp, values) for every complete record; a recording cut off
+        mid-record (the app was killed while writing) stops at the last complete one"""
+        data = self.data
+        offset = self.records_offset
+        count = 0
+        while offset < len(data):
+            start = offset
+            try:
+                record_type, timestamp = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                if record_type == COMMAND:
+                    (length,) = COMMAND_LENGTH.unpack_from(data, offset)
+                    offset += COMMAND_LENGTH.size
+                    if offset + length > len(data):
+                        raise struct.error("command cut off")
+                    values = (json.loads(data[offset:offset + length]),)
+                    offset += length
+                else:
+                    payload = PAYLOADS[record_type]
+                    values = payload.unpack_from(data, offset)
+                    offset += payload.size
+            except struct.error:
+                print(f"Warning: {self.path} is truncated at byte {start}; "
+                      f"stopping after {count} complete records")
+                return
+            count += 1
+            yield record_type, timestamp, values
+
+    def frames(self):
+        """Group records by frame: yield (elapsed, [(type, timestamp, values), ...], checksum)"""
+        elapsed = None
+        events = []
+        checksum = None
+        for record_type, timestamp, values in self.records():
+            if record_type == FRAME:
+                if elapsed is not None:
+                    yield elapsed, events, checksum
+                elapsed = values[0]
+                events = []
+                checksum = None
+            elif record_type == CHECKSUM:
+                checksum = values[0]
+            else:
+                events.append((record_type, timestamp, values))
+        if elapsed is not None:
+            yield elapsed, events, checksum
@@ -16,6 +16,11 @@ DATA_FILES = [
         'bg/hellway01.png',
         'bg/tourian01.png'
     ]),
+    ('plugins', [
+        'plugins/rage.py',
+        'plugins/emoji_party.py',
+        'plugins/psychedelic.py'
+    ]),
     ('emoji', [
         'emoji/chloe_kraid500x500.png',
         'emoji/chloe_rainbowmetroid500x500.png',
@@ -27,7 +32,7 @@ DATA_FILES = [
 OPTIONS = {
     'argv_emulation': False,  # Disabled - Carbon framework not available on modern macOS
     'packages': ['pygame', 'pyaudio', 'numpy', 'PIL'],
-    'includes': ['chaos_effect', 'colorsys', 'pkg_resources'],  # Include our chaos_effect module
+    'includes': ['chaos_effect', 'config_store', 'control_server', 'frame_output', 'session_log', 'compositor', 'avatar_layers', 'text_cache', 'alloc_tracker', 'audio_sources', 'sprite_pools', 'particle_swarm', 'voronoi_field', 'video_recorder', 'psychedelic_loops', 'cache_registry', 'job_scheduler', 'asset_watcher', 'effect_plugins', 'audio_process', 'texture_backend', 'mipmaps', 'colorsys', 'pkg_resources'],  # Include our local modules
     'iconfile': 'AppIcon.icns',  # Samurai Samus app icon
     'excludes': ['matplotlib', 'scipy'],  # Exclude unused heavy packages
     'site_packages': True,  # Include all site-packages to catch namespace packages
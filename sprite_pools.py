@@ -0,0 +1,164 @@
+"""
+SPRITE POOLS - Fixed-capacity storage for effect sprites
+Explosions (E+1) and emojis (E+2) live in preallocated NumPy columns
+instead of lists of dicts: spawning and expiry are O(1) and allocate
+nothing per sprite, and emoji motion/bounce runs as one vectorized step.
+"""
+
+import numpy as np
+
+
+class ExplosionPool:
+    """Ring buffer of explosions. Every explosion plays the same frames at the
+    same speed, so they always expire oldest-first."""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.frame = np.zeros(capacity)
+        self.scale = np.ones(capacity)
+        self.start = 0  # Index of the oldest live explosion
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, scale):
+        """Add an explosion (the oldest is dropped when full)"""
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+        i = (self.start + self.count) % self.capacity
+        self.x[i] = x
+        self.y[i] = y
+        self.frame[i] = 0.0
+        self.scale[i] = scale
+        self.count += 1
+
+    def segments(self):
+        """Live index ranges in age order (two when the ring wraps)"""
+        end = self.start + self.count
+        if end <= self.capacity:
+            return ((self.start, end),)
+        return ((self.start, self.capacity), (0, end - self.capacity))
+
+    def step(self, frame_step, frame_count):
+        """Advance every explosion and expire the ones that finished"""
+        for start, end in self.segments():
+            self.frame[start:end] += frame_step
+        while self.count and self.frame[self.start] >= frame_count:
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+
+    def live(self):
+        """(x, y, frame, scale) for every live explosion, oldest first"""
+        for start, end in self.segments():
+            yield from zip(self.x[start:end].tolist(), self.y[start:end].tolist(),
+                           self.frame[start:end].tolist(), self.scale[start:end].tolist())
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+
+class EmojiPool:
+    """Dense columns of bouncing emojis (removal swaps the last emoji into the gap)"""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.rotation = np.zeros(capacity)
+        self.prev_rotation = np.zeros(capacity)
+        self.rotation_speed = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.half = np.zeros(capacity, dtype=np.int32)  # size // 2, for bounce tests
+        self.image = np.zeros(capacity, dtype=np.int32)  # Index into the emoji images
+        self.flip_x = np.zeros(capacity, dtype=bool)
+        self.flip_y = np.zeros(capacity, dtype=bool)
+        self.columns = (self.x, self.y, self.vx, self.vy, self.prev_x, self.prev_y, self.rotation,
+                        self.prev_rotation, self.rotation_speed, self.size, self.half, self.image,
+                        self.flip_x, self.flip_y)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, image, x, y, vx, vy, size, rotation_speed, flip_x, flip_y):
+        """Add an emoji; returns False when the pool is full"""
+        if self.count == self.capacity:
+            return False
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.rotation[i] = self.prev_rotation[i] = 0.0
+        self.rotation_speed[i] = rotation_speed
+        self.size[i] = size
+        self.half[i] = size // 2
+        self.image[i] = image
+        self.flip_x[i] = flip_x
+        self.flip_y[i] = flip_y
+        self.count += 1
+        return True
+
+    def remove(self, i):
+        """Remove emoji i by moving the last emoji into its slot"""
+        last = self.count - 1
+        if i != last:
+            for column in self.columns:
+                column[i] = column[last]
+        self.count = last
+
+    def step(self, width, height):
+        """Move every emoji one step, bouncing off the edges"""
+        n = self.count
+        if not n:
+            return
+        x, y = self.x[:n], self.y[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+        half = self.half[:n]
+
+        # Remember the previous step for interpolated drawing
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        self.prev_rotation[:n] = self.rotation[:n]
+
+        x += vx
+        y += vy
+
+        # Bounce off edges
+        hit = (x - half < 0) | (x + half > width)
+        vx[hit] *= -1
+        x[hit] = np.maximum(half[hit], np.minimum(width - half[hit], x[hit]))
+        hit = (y - half < 0) | (y + half > height)
+        vy[hit] *= -1
+        y[hit] = np.maximum(half[hit], np.minimum(height - half[hit], y[hit]))
+
+        rotation = self.rotation[:n]
+        rotation += self.rotation_speed[:n]
+        np.mod(rotation, 360, out=rotation)
+
+    def interpolated(self, alpha):
+        """(image, size, flip_x, flip_y, x, y, rotation) for every emoji, between the last two steps"""
+        n = self.count
+        x = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
+        y = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha
+        rotation = self.prev_rotation[:n] + self.rotation_speed[:n] * alpha
+        return zip(self.image[:n].tolist(), self.size[:n].tolist(), self.flip_x[:n].tolist(),
+                   self.flip_y[:n].tolist(), x.tolist(), y.tolist(), rotation.tolist())
+
+    def rescale(self, sx, sy):
+        """Scale every position (e.g. to keep emojis in place on a resized viewport)"""
+        n = self.count
+        for column, factor in ((self.x, sx), (self.y, sy), (self.prev_x, sx), (self.prev_y, sy)):
+            column[:n] *= factor
+
+    def clear(self):
+        self.count = 0
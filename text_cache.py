@@ -0,0 +1,98 @@
+"""
+TEXT CACHE - Cached text rendering for UI overlays
+Fonts are built once per size, rendered text is kept per (text, color, size)
+in a registered cache (entry limit plus the shared memory budget), and lines
+with numbers are always drawn as cached static parts plus a per-glyph atlas,
+so a changing value (FPS, volume, counts) never re-renders its whole line and
+the line's layout doesn't shift when the value settles.
+"""
+
+import re
+import time
+
+import pygame
+
+from cache_registry import CacheRegistry
+
+
+# Numeric fields ("60.0", "-5", "1234") are drawn glyph by glyph from the atlas
+NUMBER = re.compile(r'[+-]?\d[\d.]*')
+
+
+class TextCache:
+    def __init__(self, max_entries=256, antialias=True, registry=None):
+        self.max_entries = max_entries  # Rendered text segments kept (lowest priority evicted)
+        self.antialias = antialias
+        registry = registry or CacheRegistry(None)
+
+        self.fonts = {}  # size -> Font
+        self.segments = registry.cache('text', max_entries=max_entries)  # (text, color, size) -> Surface
+        self.glyphs = registry.cache('glyphs')  # (char, color, size) -> Surface
+
+    def font(self, size):
+        """Default font at the given size (loaded once)"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, color, size):
+        """Rendered surface for text (cached)"""
+        key = (text, tuple(color), size)
+        surface = self.segments.get(key)
+        if surface is None:
+            start = time.perf_counter()
+            surface = self.font(size).render(text, self.antialias, color)
+            self.segments.put(key, surface, (time.perf_counter() - start) * 1000)
+        return surface
+
+    def glyph(self, char, color, size):
+        """Atlas surface for one character (cached)"""
+        key = (char, tuple(color), size)
+        surface = self.glyphs.get(key)
+        if surface is None:
+            start = time.perf_counter()
+            surface = self.font(size).render(char, self.antialias, color)
+            self.glyphs.put(key, surface, (time.perf_counter() - start) * 1000)
+        return surface
+
+    def draw(self, target, text, pos, color, size):
+        """Blit text at pos: lines without numbers as one cached surface, lines
+        with numbers as cached static parts plus numbers from the glyph atlas"""
+        x, y = pos
+        if not NUMBER.search(text):
+            surface = self.render(text, color, size)
+            target.blit(surface, pos)
+            return x + surface.get_width()
+
+        start = 0
+        for match in NUMBER.finditer(text):
+            if match.start() > start:
+                surface = self.render(text[start:match.start()], color, size)
+                target.blit(surface, (x, y))
+                x += surface.get_width()
+            for char in match.group():
+                surface = self.glyph(char, color, size)
+                target.blit(surface, (x, y))
+                x += surface.get_width()
+            start = match.end()
+        if start < len(text):
+            surface = self.render(text[start:], color, size)
+            target.blit(surface, (x, y))
+            x += surface.get_width()
+        return x
+
+    def clear(self):
+        """Drop rendered text (fonts are kept)"""
+        self.segments.clear()
+        self.glyphs.clear()
+
+    def stats(self):
+        segments = self.segments.stats()
+        return {
+            'segments': segments['entries'],
+            'glyphs': len(self.glyphs),
+            'hit_rate': segments['hit_rate'],
+            'evictions': segments['evictions']
+        }
@@ -0,0 +1,237 @@
+"""
+TEXTURE BACKEND - Compositing on an SDL2 Renderer instead of CPU blits
+With --renderer texture the scene goes to a pygame._sdl2.video Renderer.
+Static images (the character at each zoom, background images at each
+viewport size, explosion frames, emojis) are uploaded once as textures,
+and the renderer scales, rotates, flips and alpha-blends them as it draws.
+Layers that are still drawn with pygame (rainbow and chaos backgrounds,
+the psychedelic filter, the UI text) are drawn into a surface and uploaded
+into a streaming texture, only when their cache key changes, and reduced
+render scales are upscaled by the renderer.
+
+Experimental: with the software driver this path is slower than the
+surface renderer in every scene (see README and benchmarks.py renderers).
+
+The 'software' driver works without a GPU (SDL dummy video driver), so the
+backend runs headless in tests and benchmarks. The surface compositor stays
+the default and the fallback when no renderer can be created.
+"""
+
+import os
+import time
+
+import pygame
+
+try:
+    from pygame._sdl2 import video
+except ImportError:
+    video = None
+
+from cache_registry import surface_bytes
+
+
+def renderer_drivers():
+    """Names of the SDL render drivers available on this machine"""
+    if video is None:
+        return []
+    return [info.name for info in video.get_drivers()]
+
+
+def open_texture_backend(title, size, driver=None, registry=None, resizable=False):
+    """TextureBackend for a new window, or None (with a warning) if no renderer can be created"""
+    if video is None:
+        print("Warning: pygame._sdl2 is not available - using the surface renderer")
+        return None
+    try:
+        return TextureBackend(title, size, driver, registry, resizable)
+    except Exception as e:
+        print(f"Warning: Could not create the {driver or 'default'} renderer: {e} - using the surface renderer")
+        return None
+
+
+class TextureBackend:
+    name = 'texture'
+
+    def __init__(self, title, size, driver=None, registry=None, resizable=False):
+        index = -1  # SDL picks (accelerated when there is a GPU)
+        if driver:
+            drivers = renderer_drivers()
+            if driver not in drivers:
+                raise ValueError(f"unknown render driver {driver!r} (available: {', '.join(drivers)})")
+            index = drivers.index(driver)
+        os.environ.setdefault('SDL_RENDER_SCALE_QUALITY', '1')  # Linear filtering when the renderer scales
+        self.window = video.Window(title, size=size, resizable=resizable)
+        self.renderer = video.Renderer(self.window, index=index, vsync=False)
+        self.driver = driver or 'default'
+
+        # Static images uploaded once: source surface -> texture, sharing the cache memory budget
+        self.textures = registry.cache('textures') if registry else None
+        self.local_textures = {}  # Without a registry
+        self.streams = {}  # name -> streaming texture re-uploaded from a surface
+        self.forgotten = []  # Source surfaces dropped by their owners (textures released at the next clear)
+        self.disc = None  # White disc, tinted and scaled for filled circles
+
+        # Stats
+        self.uploads = 0
+        self.upload_ms = 0.0
+        self.stream_uploads = 0
+
+        print(f"🖼️ Texture renderer: {self.driver} driver, {size[0]}x{size[1]}")
+
+    def texture(self, surface):
+        """Texture of a static image, uploaded the first time it is drawn"""
+        cache = self.textures
+        texture = cache.get(surface) if cache is not None else self.local_textures.get(surface)
+        if texture is None:
+            start = time.perf_counter()
+            texture = video.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = 1 if surface.get_flags() & pygame.SRCALPHA else 0  # SDL_BLENDMODE_BLEND / NONE
+            cost_ms = (time.perf_counter() - start) * 1000
+            self.uploads += 1
+            self.upload_ms += cost_ms
+            if cache is not None:
+                cache.put(surface, texture, cost_ms, surface_bytes(surface))
+            else:
+                self.local_textures[surface] = texture
+        return texture
+
+    def forget(self, surface):
+        """The source surface was dropped (safe from any thread): release its texture on the render thread
+        at the next clear, instead of letting the texture cache pin the old surface until eviction"""
+        self.forgotten.append(surface)
+
+    def release_forgotten(self):
+        while self.forgotten:
+            surface = self.forgotten.pop()
+            if self.textures is not None:
+                self.textures.discard(surface)
+            else:
+                self.local_textures.pop(surface, None)
+
+    def stream(self, name, surface, blend=True):
+        """Streaming texture named name, updated with surface's pixels"""
+        texture = self.streams.get(name)
+        if texture is None or texture.get_rect().size != surface.get_size():
+            texture = video.Texture(self.renderer, surface.get_size(), streaming=True)
+            texture.blend_mode = 1 if blend else 0
+            self.streams[name] = texture
+        start = time.perf_counter()
+        texture.update(surface)
+        self.upload_ms += (time.perf_counter() - start) * 1000
+        self.stream_uploads += 1
+        return texture
+
+    def draw(self, texture, rect, angle=0.0, flip_x=False, flip_y=False, color=(255, 255, 255), alpha=255):
+        """Draw texture stretched to rect, rotated counterclockwise by angle degrees around its centre
+        (the same direction as pygame.transform.rotate)"""
+        texture.color = color
+        texture.alpha = alpha
+        texture.draw(dstrect=rect, angle=-angle, flip_x=flip_x, flip_y=flip_y)
+
+    def clear(self, color=(0, 0, 0)):
+        self.release_forgotten()
+        self.renderer.draw_color = (*color, 255)
+        self.renderer.clear()
+
+    def fill(self, color, alpha=255):
+        """Blend a colour over the whole frame"""
+        self.renderer.draw_blend_mode = 1
+        self.renderer.draw_color = (*color, alpha)
+        self.renderer.fill_rect(pygame.Rect((0, 0), self.window.size))
+
+    def circle(self, color, center, radius, alpha=255):
+        """Filled circle (a white disc texture, tinted and scaled)"""
+        if self.disc is None:
+            disc = pygame.Surface((512, 512), pygame.SRCALPHA)
+            pygame.draw.circle(disc, (255, 255, 255), (256, 256), 256)
+            self.disc = video.Texture.from_surface(self.renderer, disc)
+            self.disc.blend_mode = 1
+        rect = pygame.Rect(0, 0, radius * 2, radius * 2)
+        rect.center = center
+        self.draw(self.disc, rect, color=color, alpha=alpha)
+
+    def resize(self, width, height):
+        self.window.size = (width, height)
+        self.streams.clear()
+
+    def read_pixels(self, surface):
+        """Copy the frame drawn so far into surface (frame output, video recording)"""
+        self.renderer.to_surface(surface)
+
+    def present(self):
+        self.renderer.present()
+
+    def close(self):
+        self.streams.clear()
+        self.local_textures.clear()
+        if self.textures is not None:
+            self.textures.clear()
+        self.disc = None
+        self.window.destroy()
+
+    def stats(self):
+        return {
+            'driver': self.driver,
+            'uploads': self.uploads,
+            'stream_uploads': self.stream_uploads,
+            'upload_ms': round(self.upload_ms, 3)
+        }
+
+
+class TextureCompositor:
+    """Compositor drop-in that draws every frame with a TextureBackend"""
+
+    def __init__(self, layers, backend):
+        self.layers = layers
+        self.backend = backend
+        self.stage_times = {}
+        self.alloc_tracker = None
+
+    def compose(self, host, canvas=None):
+        """Draw all visible layers with the renderer, bottom to top"""
+        self.stage_times = {}
+        self.backend.clear()
+        for layer in self.layers:
+            if not layer.visible(host):
+                continue
+            start = time.perf_counter()
+            if not layer.render_textures(host, self.backend):
+                self.draw_through_surface(host, layer, layer.cache_key(host))
+            layer.record_time((time.perf_counter() - start) * 1000)
+            self.stage_times[layer.name] = layer.last_ms
+            if self.alloc_tracker:
+                self.alloc_tracker.mark(layer.name)
+
+    def draw_through_surface(self, host, layer, key):
+        """Draw a layer with pygame into its own surface (at its render scale) and upload it,
+        or reuse last frame's texture if its cache key hasn't changed"""
+        width, height = layer.render_size(host)
+        if key is not None and key == layer.texture_key and layer.texture is not None:
+            layer.hits += 1
+        else:
+            layer.misses += 1
+            scale = layer.scale_for(host)
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            surface = layer.texture_surface
+            if surface is None or surface.get_size() != size:
+                surface = pygame.Surface(size, 0 if layer.opaque else pygame.SRCALPHA, 32)
+                layer.texture_surface = surface
+            if not layer.opaque:
+                surface.fill((0, 0, 0, 0))
+            layer.pixels_filled = size[0] * size[1]
+            layer.render(host, surface)
+            layer.texture = self.backend.stream(layer.name, surface, blend=not layer.opaque)
+            layer.texture_key = key
+        layer.texture.color = (255, 255, 255)
+        layer.texture.alpha = 255
+        layer.texture.draw(dstrect=pygame.Rect(layer.surface_pos, (width, height)))
+
+    def invalidate(self):
+        for layer in self.layers:
+            layer.invalidate()
+
+    def stats(self):
+        return {
+            'backend': self.backend.stats(),
+            'layers': {layer.name: layer.stats() for layer in self.layers}
+        }
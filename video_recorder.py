@@ -0,0 +1,192 @@
+"""
+VIDEO RECORDER - Local recording without OBS
+The render thread copies each finished frame into one of a fixed pool of
+preallocated buffers (a single memcpy) and queues it; a background thread
+writes queued frames to an ffmpeg subprocess as raw video over a pipe.
+
+The queue is bounded by the pool size. When the encoder falls behind and
+every buffer is in use, the drop policy decides which frame is lost:
+
+    newest  drop the frame being submitted (the queue keeps its order)
+    oldest  drop the oldest frame still waiting (the video stays current)
+
+Dropped frames are counted and simply missing from the video, so a file
+with drops plays back slightly short. Frames are tagged with the target
+frame rate, so a render loop slower than its target plays back fast.
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from frame_output import surface_pixel_format
+
+
+DROP_POLICIES = ('newest', 'oldest')
+
+# Surface memory byte order -> ffmpeg raw pixel format
+FFMPEG_PIXEL_FORMATS = {
+    b'BGRX': 'bgr0', b'BGRA': 'bgra', b'RGBX': 'rgb0', b'RGBA': 'rgba',
+    b'XRGB': '0rgb', b'ARGB': 'argb', b'XBGR': '0bgr', b'ABGR': 'abgr',
+}
+
+
+def ffmpeg_available(ffmpeg='ffmpeg'):
+    """True if the ffmpeg executable can be found"""
+    return shutil.which(ffmpeg) is not None
+
+
+class VideoRecorder:
+    def __init__(self, path, width, height, fps=60, pixel_format=b'BGRX', buffers=8, drop='newest',
+                 ffmpeg='ffmpeg', encoder_args=None):
+        if drop not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop} (use {' or '.join(DROP_POLICIES)})")
+        if pixel_format not in FFMPEG_PIXEL_FORMATS:
+            raise ValueError(f"Unsupported pixel format: {pixel_format!r}")
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.drop = drop
+        self.encoder_args = encoder_args or ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20',
+                                             '-pix_fmt', 'yuv420p']
+
+        # Frame buffer pool: free buffers and frames queued for the encoder (never more than the pool)
+        self.capacity = buffers
+        self.free = deque(np.empty((height, width * 4), dtype=np.uint8) for _ in range(buffers))
+        self.queued = deque()
+        self.lock = threading.Condition()
+        self.stopping = False
+
+        # Stats
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.max_depth = 0
+        self.last_copy_ms = 0.0
+        self.started = time.perf_counter()
+        self.error = None
+
+        command = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+                   '-f', 'rawvideo', '-pix_fmt', FFMPEG_PIXEL_FORMATS[pixel_format],
+                   '-s', f"{width}x{height}", '-r', str(fps), '-i', '-',
+                   *self.encoder_args, str(path)]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.thread = threading.Thread(target=self.encode_loop, name="video-encoder", daemon=True)
+        self.thread.start()
+        print(f"🔴 Recording {width}x{height}@{fps} to {path} ({buffers} buffers, drop {drop})")
+
+    def submit(self, surface):
+        """Render thread: copy a finished frame into a free buffer and queue it (never blocks on the encoder)"""
+        start = time.perf_counter()
+        self.frames_submitted += 1
+        if self.error:
+            self.frames_dropped += 1  # Encoder is gone
+            return False
+        with self.lock:
+            if self.free:
+                buffer = self.free.popleft()
+            elif self.drop == 'oldest' and self.queued:
+                buffer = self.queued.popleft()  # Overwrite the oldest waiting frame
+                self.frames_dropped += 1
+            else:
+                self.frames_dropped += 1
+                return False
+
+        # Copy outside the lock: the buffer belongs to this thread until it is queued
+        view = surface.get_view('1')
+        src = np.asarray(view).view(np.uint8).reshape(self.height, -1)
+        np.copyto(buffer, src[:, :self.width * 4])
+        del src, view  # Unlock the surface
+
+        with self.lock:
+            self.queued.append(buffer)
+            self.max_depth = max(self.max_depth, len(self.queued))
+            self.lock.notify()
+        self.last_copy_ms = (time.perf_counter() - start) * 1000
+        return True
+
+    def encode_loop(self):
+        """Encoder thread: hand queued frames to ffmpeg and return their buffers to the pool"""
+        while True:
+            with self.lock:
+                while not self.queued and not self.stopping:
+                    self.lock.wait()
+                if not self.queued:
+                    break
+                buffer = self.queued.popleft()
+            try:
+                self.process.stdin.write(memoryview(buffer).cast('B'))
+                self.frames_written += 1
+            except (BrokenPipeError, OSError) as e:
+                self.error = f"ffmpeg stopped accepting frames: {e}"
+                with self.lock:
+                    self.free.append(buffer)
+                    self.stopping = True
+                    self.free.extend(self.queued)
+                    self.queued.clear()
+                break
+            with self.lock:
+                self.free.append(buffer)
+
+    def depth(self):
+        """Frames waiting for the encoder"""
+        return len(self.queued)
+
+    def elapsed(self):
+        """Seconds since recording started"""
+        return time.perf_counter() - self.started
+
+    def close(self):
+        """Encode the frames still queued, finish the file and wait for ffmpeg"""
+        with self.lock:
+            self.stopping = True
+            self.lock.notify()
+        self.thread.join()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+        errors = self.process.stderr.read().decode(errors='replace').strip()
+        self.process.stderr.close()
+        if self.process.returncode != 0 and not self.error:
+            self.error = errors or f"ffmpeg exited with code {self.process.returncode}"
+        if self.error:
+            print(f"Warning: Video recording failed: {self.error}")
+        print(f"⏹️ Recorded {self.frames_written} frames to {self.path} "
+              f"({self.frames_dropped} dropped, max queue {self.max_depth}/{self.capacity})")
+        return self.stats()
+
+    def stats(self):
+        return {
+            'path': str(self.path),
+            'submitted': self.frames_submitted,
+            'written': self.frames_written,
+            'dropped': self.frames_dropped,
+            'queue_depth': len(self.queued),
+            'queue_max': self.max_depth,
+            'queue_capacity': self.capacity,
+            'copy_ms': round(self.last_copy_ms, 3),
+            'error': self.error
+        }
+
+
+def start_recording(path, surface, fps=60, buffers=8, drop='newest', ffmpeg='ffmpeg'):
+    """Recorder for frames shaped like surface; None (with a warning) if recording is unavailable"""
+    if not ffmpeg_available(ffmpeg):
+        print("Warning: Could not start video recording: ffmpeg was not found on PATH")
+        return None
+    if surface.get_bytesize() != 4:
+        print("Warning: Could not start video recording: the display is not 32-bit")
+        return None
+    width, height = surface.get_size()
+    try:
+        return VideoRecorder(path, width, height, fps, surface_pixel_format(surface), buffers, drop, ffmpeg)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not start video recording: {e}")
+        return None
@@ -0,0 +1,264 @@
+"""
+VORONOI FIELD - Many-seed Voronoi diagram for the chaos background
+Labels every cell of a NumPy grid (one cell per `resolution` pixels) with its
+nearest seed using jump flooding. Seeds only move a pixel or two per step,
+so each update starts from the previous labels and runs a couple of short
+refinement passes; a full flood only runs when seeds jump too far.
+"""
+
+import math
+
+import numpy as np
+import pygame
+
+
+# Neighbor offsets of one jump-flooding pass (the center is the current label)
+JFA_OFFSETS = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+
+
+def hues_to_rgb(hue, saturation, value):
+    """RGB (0-1 floats, shape (n, 3)) for an array of hues in degrees"""
+    h = hue / 60.0
+    k = np.stack([(5 + h) % 6, (3 + h) % 6, (1 + h) % 6], axis=1)
+    return value - value * saturation * np.clip(np.minimum(k, 4 - k), 0, 1)
+
+
+def jump_steps(reach):
+    """Jump-flooding step sizes (powers of two, largest first) that together cover reach cells"""
+    steps = []
+    step = 1 << max(0, int(reach).bit_length() - 1)
+    if step < reach:
+        step *= 2
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    return steps
+
+
+class VoronoiField:
+    def __init__(self, width, height, seed_count=256, resolution=4, edges=False,
+                 edge_color=(255, 255, 255), seed=None):
+        self.width = width
+        self.height = height
+        self.seed_count = seed_count
+        self.resolution = resolution  # Pixels per grid cell (1 = full resolution)
+        self.edges = edges  # Highlight the borders between cells
+        self.edge_color = edge_color
+        self.rng = np.random.default_rng(seed)
+
+        # Refine from the previous labels while no seed moved more than this many grid cells
+        self.max_drift = 4
+
+        self.shade_levels = 32  # Distance shading steps per seed color
+        self.build_grid()
+
+        # Stats
+        self.full_floods = 0
+        self.refinements = 0
+        self.reuses = 0
+
+        self.regenerate()
+
+    def build_grid(self):
+        """Grid arrays for the current size (labels are rebuilt on the next update)"""
+        resolution = self.resolution
+        # Grid cell centers in simulation coordinates, (columns, rows) like pygame.surfarray
+        self.columns = max(1, int(math.ceil(self.width / resolution)))
+        self.rows = max(1, int(math.ceil(self.height / resolution)))
+        self.px = ((np.arange(self.columns, dtype=np.float32) + 0.5) * resolution)[:, None]
+        self.py = ((np.arange(self.rows, dtype=np.float32) + 0.5) * resolution)[None, :]
+
+        self.labels = None  # Nearest seed of every grid cell (seed_count = none yet)
+        self.resampled = False  # Labels carried over from the previous grid size
+        self.distances = np.zeros((self.columns, self.rows), dtype=np.float32)  # Squared distance to it
+        self.candidate_distances = np.zeros_like(self.distances)
+        self.closer = np.zeros(self.distances.shape, dtype=bool)
+        self.border = np.zeros(self.distances.shape, dtype=bool)
+        self.label_x = None  # Seed positions the labels were computed for
+        self.label_y = None
+        self.image = pygame.Surface((self.columns, self.rows), 0, 32)
+        self.scaled = None  # Image scaled to the last target size
+
+    def resize(self, width, height):
+        """New area size: seeds keep their relative positions, the grid is rebuilt and the old labels
+        are resampled onto it, so the next update refines them instead of flooding from scratch"""
+        old_labels, label_x, label_y = self.labels, self.label_x, self.label_y
+        sx = width / self.width
+        sy = height / self.height
+        self.x *= sx
+        self.y *= sy
+        self.width = width
+        self.height = height
+        self.build_grid()
+        if old_labels is not None:
+            # Nearest old cell of every new one
+            columns = np.arange(self.columns) * old_labels.shape[0] // self.columns
+            rows = np.arange(self.rows) * old_labels.shape[1] // self.rows
+            self.labels = old_labels[np.ix_(columns, rows)]
+            self.label_x = label_x * sx
+            self.label_y = label_y * sy
+            self.resampled = True
+
+    def regenerate(self):
+        """New random seeds (labels are rebuilt on the next update)"""
+        n = self.seed_count
+        self.x = self.rng.uniform(0, self.width, n)
+        self.y = self.rng.uniform(0, self.height, n)
+        self.vx = self.rng.uniform(-2, 2, n)
+        self.vy = self.rng.uniform(-2, 2, n)
+        self.hue = self.rng.uniform(0, 360, n)
+        self.labels = None
+
+    def step(self):
+        """Move the seeds one step (bouncing off the edges) and cycle their hues"""
+        self.x += self.vx
+        self.y += self.vy
+        hit = (self.x < 0) | (self.x > self.width)
+        self.vx[hit] *= -1
+        hit = (self.y < 0) | (self.y > self.height)
+        self.vy[hit] *= -1
+        np.clip(self.x, 0, self.width, out=self.x)
+        np.clip(self.y, 0, self.height, out=self.y)
+        self.hue += 0.5
+        np.mod(self.hue, 360, out=self.hue)
+
+    def seed_cells(self):
+        """Grid column / row of every seed"""
+        cx = np.minimum((self.x / self.resolution).astype(np.int64), self.columns - 1)
+        cy = np.minimum((self.y / self.resolution).astype(np.int64), self.rows - 1)
+        return cx, cy
+
+    def measure(self, px, py, labels, sx, sy, out):
+        """Squared distance from grid cells (at px, py) to the seeds they are labelled with"""
+        dx = px - np.take(sx, labels)
+        dy = py - np.take(sy, labels)
+        np.multiply(dx, dx, out=out)
+        dy *= dy
+        out += dy
+
+    def flood(self, steps):
+        """Jump-flooding passes: each cell takes the nearest seed seen at +-step cells (yields after each offset)"""
+        # Label seed_count (unlabelled) is a sentinel seed infinitely far away
+        sx, sy = self.seed_arrays()
+        columns, rows = self.columns, self.rows
+        self.measure(self.px, self.py, self.labels, sx, sy, self.distances)
+        for step in steps:
+            for dx, dy in JFA_OFFSETS:
+                ox, oy = dx * step, dy * step
+                if abs(ox) >= columns or abs(oy) >= rows:
+                    continue
+                # Cells whose neighbor at (+ox, +oy) is on the grid, and those neighbors
+                inside = (slice(max(0, -ox), columns - max(0, ox)), slice(max(0, -oy), rows - max(0, oy)))
+                candidate = self.labels[max(0, ox):columns + min(0, ox), max(0, oy):rows + min(0, oy)]
+                labels = self.labels[inside]
+                distances = self.distances[inside]
+                candidate_distances = self.candidate_distances[inside]
+                closer = self.closer[inside]
+                self.measure(self.px[inside[0]], self.py[:, inside[1]], candidate, sx, sy, candidate_distances)
+                np.less(candidate_distances, distances, out=closer)
+                np.copyto(labels, candidate, where=closer)
+                np.copyto(distances, candidate_distances, where=closer)
+                yield
+
+    def seed_arrays(self):
+        """Seed coordinates for measure(), plus label seed_count: a sentinel infinitely far away"""
+        sx = np.append(self.x, np.inf).astype(np.float32)
+        sy = np.append(self.y, np.inf).astype(np.float32)
+        return sx, sy
+
+    def borders(self):
+        """Cells with a neighbor (left/right/up/down) in a different Voronoi cell"""
+        labels = self.labels
+        border = self.border
+        border.fill(False)
+        differ = labels[:-1, :] != labels[1:, :]
+        border[:-1, :] |= differ
+        border[1:, :] |= differ
+        differ = labels[:, :-1] != labels[:, 1:]
+        border[:, :-1] |= differ
+        border[:, 1:] |= differ
+        return border
+
+    def stamp_seeds(self):
+        """Every seed claims its own grid cell, so shrunken cells can grow back"""
+        cx, cy = self.seed_cells()
+        self.labels[cx, cy] = np.arange(self.seed_count, dtype=np.int32)
+
+    def update(self):
+        """Bring the labels up to date with the seed positions"""
+        for _ in self.update_steps():
+            pass
+
+    def update_steps(self):
+        """update() one flooding pass per yield, so a full flood can be spread over several frames"""
+        if self.labels is not None:
+            drift = max(np.abs(self.x - self.label_x).max(), np.abs(self.y - self.label_y).max())
+            if self.resampled:
+                # Borders move when the aspect ratio changes: refine as if the seeds had drifted max_drift cells
+                drift = max(drift, self.max_drift * self.resolution)
+                self.resampled = False
+            if drift == 0:
+                self.reuses += 1
+                return
+            cells = int(math.ceil(drift / self.resolution))
+            if cells <= self.max_drift:
+                # Seeds moved a little: refine the previous labels with jumps covering the drift
+                self.stamp_seeds()
+                yield from self.flood(jump_steps(cells))
+                self.label_x[:] = self.x
+                self.label_y[:] = self.y
+                self.refinements += 1
+                return
+
+        # Full flood from the seeds alone: steps of half the grid size down to 1, plus a final 1 ("JFA+1")
+        self.labels = np.full((self.columns, self.rows), self.seed_count, dtype=np.int32)
+        self.stamp_seeds()
+        yield from self.flood(jump_steps(max(self.columns, self.rows) // 2) + [1])
+        self.label_x = self.x.copy()
+        self.label_y = self.y.copy()
+        self.full_floods += 1
+
+    def render(self):
+        """Color the grid: seed hue, darker near the seed, optional bright borders"""
+        self.update()
+
+        # Packed pixel colors for every (seed, shade level): value 0.3 near the seed to 0.6 far away
+        levels = self.shade_levels
+        values = 0.3 + 0.3 * np.arange(levels) / (levels - 1)
+        rgb = (hues_to_rgb(self.hue, 0.6, 1.0)[:, None, :] * values[None, :, None] * 255).astype(np.uint32)
+        red, green, blue = self.image.get_shifts()[:3]
+        table = (rgb[:, :, 0] << red | rgb[:, :, 1] << green | rgb[:, :, 2] << blue).reshape(-1)
+
+        level = np.minimum(self.distances * (levels / 50000), levels - 1).astype(np.int32)
+        level += self.labels * levels
+        pixels = pygame.surfarray.pixels2d(self.image)
+        pixels[...] = np.take(table, level)
+        if self.edges:
+            r, g, b = self.edge_color
+            pixels[self.borders()] = r << red | g << green | b << blue
+        del pixels  # Unlock the surface
+        return self.image
+
+    def draw(self, surface):
+        """Render and draw the field over the whole surface (nearest-neighbor upscale)"""
+        image = self.render()
+        size = surface.get_size()
+        if size == image.get_size():
+            surface.blit(image, (0, 0))
+            return
+        if not surface.get_flags() & pygame.SRCALPHA and surface.get_masks() == image.get_masks():
+            pygame.transform.scale(image, size, surface)  # Straight into the target when formats match
+            return
+        if self.scaled is None or self.scaled.get_size() != size:
+            self.scaled = pygame.Surface(size, 0, image)
+        pygame.transform.scale(image, size, self.scaled)
+        surface.blit(self.scaled, (0, 0))
+
+    def stats(self):
+        return {
+            'seeds': self.seed_count,
+            'grid': [self.columns, self.rows],
+            'full_floods': self.full_floods,
+            'refinements': self.refinements,
+            'reuses': self.reuses
+        }